@@ -1,8 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import time
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import Select, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-
-from app.core.rbac import require_permission
+from starlette.concurrency import run_in_threadpool
+
+from app.core.auth_jwt import invalidate_user_sessions
+from app.core.effective_permissions import apply_policy_change
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.invalidation import EventKind, InvalidationEvent, publish_after_commit
+from app.core.permissions import Action
+from app.core.policy_journal import (
+    PolicyEntity,
+    PolicyOp,
+    get_policy_change_notifier,
+    journal_covers,
+    read_policy_changes,
+    record_policy_change,
+)
+from app.core.policy_snapshot import build_policy_snapshot
+from app.core.policy_version import get_policy_version
+from app.core.rbac import (
+    permitted_users_count_query,
+    permitted_users_query,
+    require_permission,
+)
+from app.core.responses import OrjsonResponse
+from app.core.settings import get_settings
 from app.db.session import get_db
 from app.models.access_role_rule import AccessRoleRule
 from app.models.business_element import BusinessElement
@@ -13,6 +39,9 @@ from app.schemas.rbac_schema import (
     ElementCreate,
     ElementOut,
     ElementUpdate,
+    PermittedUsersOut,
+    PolicySimulationOut,
+    PolicySimulationRequest,
     RoleCreate,
     RoleOut,
     RoleUpdate,
@@ -22,6 +51,48 @@ from app.schemas.rbac_schema import (
 
 admin_router = APIRouter(prefix="/admin", tags=["admin"])
 
+_ROLE_COLUMNS = (Role.id, Role.name)
+_ELEMENT_COLUMNS = (BusinessElement.id, BusinessElement.code, BusinessElement.title)
+_RULE_COLUMNS = (
+    AccessRoleRule.id,
+    AccessRoleRule.role_id,
+    AccessRoleRule.element_id,
+    AccessRoleRule.read_permission,
+    AccessRoleRule.read_all_permission,
+    AccessRoleRule.create_permission,
+    AccessRoleRule.update_permission,
+    AccessRoleRule.update_all_permission,
+    AccessRoleRule.delete_permission,
+    AccessRoleRule.delete_all_permission,
+)
+
+
+def _rows_response(db: Session, query: Select, etag: str) -> OrjsonResponse:
+    result = db.execute(query)
+    keys = list(result.keys())
+    rows = [dict(zip(keys, row)) for row in result]
+    return OrjsonResponse(rows, headers={"ETag": etag})
+
+
+def _payload(obj: object, columns: tuple[Any, ...]) -> dict[str, Any]:
+    return {column.key: getattr(obj, column.key) for column in columns}
+
+
+def _policy_changed(
+    db: Session,
+    actor: User,
+    entity: PolicyEntity,
+    op: PolicyOp,
+    payload: dict[str, Any],
+    user_id: int | None = None,
+) -> None:
+    version = record_policy_change(db, entity, op, payload, actor_id=actor.id)
+    apply_policy_change(db, entity, payload)
+    kind: EventKind = "role_changed" if user_id is None else "user_roles_changed"
+    publish_after_commit(
+        db, InvalidationEvent(kind, user_id=user_id, policy_version=version)
+    )
+
 
 # ROLES
 @admin_router.get(
@@ -29,23 +100,32 @@ admin_router = APIRouter(prefix="/admin", tags=["admin"])
     response_model=list[RoleOut],
     dependencies=[Depends(require_permission("rbac_roles", "read"))],
 )
-def list_roles(db: Session = Depends(get_db)):
-    return db.query(Role).order_by(Role.id).all()
+def list_roles(request: Request, db: Session = Depends(get_db)):
+    etag = make_etag("roles", get_policy_version(db))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    return _rows_response(db, select(*_ROLE_COLUMNS).order_by(Role.id), etag)
 
 
 @admin_router.post(
     "/roles",
     response_model=RoleOut,
     status_code=status.HTTP_201_CREATED,
-    dependencies=[Depends(require_permission("rbac_roles", "create"))],
 )
-def create_role(payload: RoleCreate, db: Session = Depends(get_db)):
+def create_role(
+    payload: RoleCreate,
+    db: Session = Depends(get_db),
+    actor: User = Depends(require_permission("rbac_roles", "create")),
+):
     role = Role(name=payload.name.strip())
     db.add(role)
     try:
         db.flush()
     except IntegrityError:
         raise HTTPException(status_code=409, detail="role already exists")
+
+    _policy_changed(db, actor, "role", "upsert", _payload(role, _ROLE_COLUMNS))
     return role
 
 
@@ -64,9 +144,12 @@ def get_role(role_id: int, db: Session = Depends(get_db)):
 @admin_router.delete(
     "/roles/{role_id}",
     status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(require_permission("rbac_roles", "delete"))],
 )
-def delete_role(role_id: int, db: Session = Depends(get_db)):
+def delete_role(
+    role_id: int,
+    db: Session = Depends(get_db),
+    actor: User = Depends(require_permission("rbac_roles", "delete")),
+):
     role = db.get(Role, role_id)
     if not role:
         raise HTTPException(status_code=404, detail="role not found")
@@ -77,15 +160,20 @@ def delete_role(role_id: int, db: Session = Depends(get_db)):
         db.flush()
     except IntegrityError:
         raise HTTPException(status_code=409, detail="role is used")
-    return None
+
+    _policy_changed(db, actor, "role", "delete", {"id": role_id})
 
 
 @admin_router.patch(
     "/roles/{role_id}",
     response_model=RoleOut,
-    dependencies=[Depends(require_permission("rbac_roles", "update"))],
 )
-def update_role(role_id: int, payload: RoleUpdate, db: Session = Depends(get_db)):
+def update_role(
+    role_id: int,
+    payload: RoleUpdate,
+    db: Session = Depends(get_db),
+    actor: User = Depends(require_permission("rbac_roles", "update")),
+):
     role = db.get(Role, role_id)
     if not role:
         raise HTTPException(status_code=404, detail="role not found")
@@ -96,6 +184,8 @@ def update_role(role_id: int, payload: RoleUpdate, db: Session = Depends(get_db)
         db.flush()
     except IntegrityError:
         raise HTTPException(status_code=409, detail="role already exists")
+
+    _policy_changed(db, actor, "role", "upsert", _payload(role, _ROLE_COLUMNS))
     return role
 
 
@@ -107,23 +197,33 @@ def update_role(role_id: int, payload: RoleUpdate, db: Session = Depends(get_db)
     response_model=list[ElementOut],
     dependencies=[Depends(require_permission("rbac_rules", "read"))],
 )
-def list_elements(db: Session = Depends(get_db)):
-    return db.query(BusinessElement).order_by(BusinessElement.id).all()
+def list_elements(request: Request, db: Session = Depends(get_db)):
+    etag = make_etag("elements", get_policy_version(db))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    query = select(*_ELEMENT_COLUMNS).order_by(BusinessElement.id)
+    return _rows_response(db, query, etag)
 
 
 @admin_router.post(
     "/elements",
     response_model=ElementOut,
     status_code=status.HTTP_201_CREATED,
-    dependencies=[Depends(require_permission("rbac_rules", "create"))],
 )
-def create_element(payload: ElementCreate, db: Session = Depends(get_db)):
+def create_element(
+    payload: ElementCreate,
+    db: Session = Depends(get_db),
+    actor: User = Depends(require_permission("rbac_rules", "create")),
+):
     element = BusinessElement(code=payload.code.strip(), title=payload.title)
     db.add(element)
     try:
         db.flush()
     except IntegrityError:
         raise HTTPException(status_code=409, detail="element code already exists")
+
+    _policy_changed(db, actor, "element", "upsert", _payload(element, _ELEMENT_COLUMNS))
     return element
 
 
@@ -142,9 +242,12 @@ def get_element(element_id: int, db: Session = Depends(get_db)):
 @admin_router.delete(
     "/elements/{element_id}",
     status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(require_permission("rbac_rules", "delete"))],
 )
-def delete_element(element_id: int, db: Session = Depends(get_db)):
+def delete_element(
+    element_id: int,
+    db: Session = Depends(get_db),
+    actor: User = Depends(require_permission("rbac_rules", "delete")),
+):
     element = db.get(BusinessElement, element_id)
     if not element:
         raise HTTPException(status_code=404, detail="element not found")
@@ -154,16 +257,19 @@ def delete_element(element_id: int, db: Session = Depends(get_db)):
         db.flush()
     except IntegrityError:
         raise HTTPException(status_code=409, detail="element is used in rules")
-    return None
+
+    _policy_changed(db, actor, "element", "delete", {"id": element_id})
 
 
 @admin_router.patch(
     "/elements/{element_id}",
     response_model=ElementOut,
-    dependencies=[Depends(require_permission("rbac_rules", "update"))],
 )
 def update_element(
-    element_id: int, payload: ElementUpdate, db: Session = Depends(get_db)
+    element_id: int,
+    payload: ElementUpdate,
+    db: Session = Depends(get_db),
+    actor: User = Depends(require_permission("rbac_rules", "update")),
 ):
     element = db.get(BusinessElement, element_id)
     if not element:
@@ -174,9 +280,48 @@ def update_element(
 
     db.add(element)
     db.flush()
+    _policy_changed(db, actor, "element", "upsert", _payload(element, _ELEMENT_COLUMNS))
     return element
 
 
+@admin_router.get(
+    "/elements/{element_id}/users",
+    response_model=PermittedUsersOut,
+    dependencies=[
+        Depends(require_permission("rbac_rules", "read")),
+        Depends(require_permission("rbac_user_roles", "read")),
+    ],
+)
+def list_permitted_users(
+    element_id: int,
+    action: Action,
+    scope: Literal["all", "own"] = "all",
+    after: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    element_exists = db.execute(
+        select(BusinessElement.id).where(BusinessElement.id == element_id)
+    ).first()
+    if not element_exists:
+        raise HTTPException(status_code=404, detail="element not found")
+
+    query = permitted_users_query(element_id, action, scope, after, limit)
+    users = [row._asdict() for row in db.execute(query)]
+    total = None
+    if after == 0:
+        total = db.execute(
+            permitted_users_count_query(element_id, action, scope)
+        ).scalar_one()
+    return OrjsonResponse(
+        {
+            "total": total,
+            "next_after": users[-1]["id"] if len(users) == limit else None,
+            "users": users,
+        }
+    )
+
+
 # RULES
 
 
@@ -186,16 +331,21 @@ def update_element(
     dependencies=[Depends(require_permission("rbac_rules", "read"))],
 )
 def list_rules(
+    request: Request,
     db: Session = Depends(get_db),
     role_id: int | None = None,
     element_id: int | None = None,
 ):
-    rules = db.query(AccessRoleRule)
+    etag = make_etag("rules", get_policy_version(db), role_id, element_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    rules = select(*_RULE_COLUMNS)
     if role_id is not None:
-        rules = rules.filter(AccessRoleRule.role_id == role_id)
+        rules = rules.where(AccessRoleRule.role_id == role_id)
     if element_id is not None:
-        rules = rules.filter(AccessRoleRule.element_id == element_id)
-    return rules.order_by(AccessRoleRule.id).all()
+        rules = rules.where(AccessRoleRule.element_id == element_id)
+    return _rows_response(db, rules.order_by(AccessRoleRule.id), etag)
 
 
 @admin_router.get(
@@ -213,9 +363,12 @@ def get_rule(rule_id: int, db: Session = Depends(get_db)):
 @admin_router.put(
     "/rules",
     response_model=RuleOut,
-    dependencies=[Depends(require_permission("rbac_rules", "update"))],
 )
-def upsert_rule(payload: RuleUpsert, db: Session = Depends(get_db)):
+def upsert_rule(
+    payload: RuleUpsert,
+    db: Session = Depends(get_db),
+    actor: User = Depends(require_permission("rbac_rules", "update")),
+):
     role = db.get(Role, payload.role_id)
     if not role:
         raise HTTPException(status_code=404, detail="role not found")
@@ -245,6 +398,7 @@ def upsert_rule(payload: RuleUpsert, db: Session = Depends(get_db)):
     rule.delete_all_permission = payload.delete_all_permission
 
     db.flush()
+    _policy_changed(db, actor, "rule", "upsert", _payload(rule, _RULE_COLUMNS))
     return rule
 
 
@@ -256,25 +410,34 @@ def upsert_rule(payload: RuleUpsert, db: Session = Depends(get_db)):
     response_model=list[RoleOut],
     dependencies=[Depends(require_permission("rbac_user_roles", "read"))],
 )
-def list_user_roles(user_id: int, db: Session = Depends(get_db)):
-    user = db.get(User, user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="user not found")
+def list_user_roles(user_id: int, request: Request, db: Session = Depends(get_db)):
+    etag = make_etag("user_roles", get_policy_version(db), user_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
 
-    role_ids = db.query(UserRole.role_id).filter(UserRole.user_id == user_id).all()
-    role_ids = [r[0] for r in role_ids]
-    if not role_ids:
-        return []
+    user_exists = db.execute(select(User.id).where(User.id == user_id)).first()
+    if not user_exists:
+        raise HTTPException(status_code=404, detail="user not found")
 
-    return db.query(Role).filter(Role.id.in_(role_ids)).order_by(Role.id).all()
+    query = (
+        select(*_ROLE_COLUMNS)
+        .join(UserRole, UserRole.role_id == Role.id)
+        .where(UserRole.user_id == user_id)
+        .order_by(Role.id)
+    )
+    return _rows_response(db, query, etag)
 
 
 @admin_router.post(
     "/users/{user_id}/roles/{role_id}",
     status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(require_permission("rbac_user_roles", "create"))],
 )
-def add_role_to_user(user_id: int, role_id: int, db: Session = Depends(get_db)):
+def add_role_to_user(
+    user_id: int,
+    role_id: int,
+    db: Session = Depends(get_db),
+    actor: User = Depends(require_permission("rbac_user_roles", "create")),
+):
     user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="user not found")
@@ -289,27 +452,163 @@ def add_role_to_user(user_id: int, role_id: int, db: Session = Depends(get_db)):
         .first()
     )
     if exists:
-        return None
+        return
 
     db.add(UserRole(user_id=user_id, role_id=role_id))
     db.flush()
-    return None
+    _policy_changed(
+        db,
+        actor,
+        "user_role",
+        "upsert",
+        {"user_id": user_id, "role_id": role_id},
+        user_id,
+    )
+    return
 
 
 @admin_router.delete(
     "/users/{user_id}/roles/{role_id}",
     status_code=status.HTTP_204_NO_CONTENT,
-    dependencies=[Depends(require_permission("rbac_user_roles", "delete"))],
 )
-def remove_role_from_user(user_id: int, role_id: int, db: Session = Depends(get_db)):
+def remove_role_from_user(
+    user_id: int,
+    role_id: int,
+    db: Session = Depends(get_db),
+    actor: User = Depends(require_permission("rbac_user_roles", "delete")),
+):
     link = (
         db.query(UserRole)
         .filter(UserRole.user_id == user_id, UserRole.role_id == role_id)
         .first()
     )
     if not link:
-        return None
+        return
 
     db.delete(link)
     db.flush()
-    return None
+    _policy_changed(
+        db,
+        actor,
+        "user_role",
+        "delete",
+        {"user_id": user_id, "role_id": role_id},
+        user_id,
+    )
+    return
+
+
+# POLICY
+
+
+@admin_router.get(
+    "/policy/version",
+    dependencies=[Depends(require_permission("rbac_rules", "read"))],
+)
+def policy_version(db: Session = Depends(get_db)):
+    return {"version": get_policy_version(db)}
+
+
+@admin_router.get(
+    "/policy/snapshot",
+    response_class=Response,
+    dependencies=[
+        Depends(require_permission("rbac_rules", "read")),
+        Depends(require_permission("rbac_user_roles", "read")),
+    ],
+)
+def policy_snapshot(request: Request, db: Session = Depends(get_db)):
+    etag = make_etag("snapshot", get_policy_version(db))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    version, data = build_policy_snapshot(db)
+    return Response(
+        data,
+        media_type="application/octet-stream",
+        headers={"ETag": make_etag("snapshot", version)},
+    )
+
+
+def _policy_changes_page(
+    db: Session, since: int, version: int, limit: int
+) -> OrjsonResponse:
+    if not journal_covers(db, since, version):
+        return OrjsonResponse({"version": version, "reset": True, "changes": []})
+
+    changes = read_policy_changes(db, since, limit)
+    last = changes[-1]["seq"] if changes else since
+    return OrjsonResponse(
+        {
+            "version": last,
+            "reset": False,
+            "has_more": last < version,
+            "changes": changes,
+        }
+    )
+
+
+@admin_router.get(
+    "/policy/changes",
+    dependencies=[Depends(require_permission("rbac_rules", "read"))],
+)
+async def policy_changes(
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=500, ge=1, le=5000),
+    wait: float = Query(default=0, ge=0),
+    db: Session = Depends(get_db),
+):
+    settings = get_settings()
+    deadline = time.monotonic() + min(wait, settings.policy_changes_max_wait_seconds)
+    notifier = get_policy_change_notifier()
+
+    version = await run_in_threadpool(get_policy_version, db)
+    while version == since:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        await run_in_threadpool(db.rollback)
+        await notifier.wait(since, min(remaining, settings.policy_changes_poll_seconds))
+        version = await run_in_threadpool(get_policy_version, db)
+
+    return await run_in_threadpool(_policy_changes_page, db, since, version, limit)
+
+
+@admin_router.post(
+    "/policy/simulate",
+    response_model=PolicySimulationOut,
+    dependencies=[
+        Depends(require_permission("rbac_rules", "read")),
+        Depends(require_permission("rbac_user_roles", "read")),
+    ],
+)
+def simulate_policy(payload: PolicySimulationRequest, db: Session = Depends(get_db)):
+    from app.core.policy_simulation import simulate_policy_change
+
+    try:
+        result = simulate_policy_change(
+            db,
+            payload.rules,
+            [(link.user_id, link.role_id) for link in payload.add_user_roles],
+            [(link.user_id, link.role_id) for link in payload.remove_user_roles],
+            payload.sample_size,
+        )
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    return OrjsonResponse(result)
+
+
+# USER SESSIONS
+
+
+@admin_router.post(
+    "/users/{user_id}/logout-all",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(require_permission("rbac_user_roles", "update"))],
+)
+def logout_user_everywhere(user_id: int, db: Session = Depends(get_db)):
+    user = db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="user not found")
+
+    invalidate_user_sessions(db, user)
@@ -1,23 +1,37 @@
-from datetime import datetime, timezone
+import math
+from datetime import UTC, datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPAuthorizationCredentials
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.core.auth_jwt import (
-    bearer_scheme,
-    get_current_user,
-    _get_bearer_token,
+    AuthContext,
+    get_auth_context,
+    invalidate_user_sessions,
     raise_not_authenticated,
 )
-from app.core.jwt import create_access_token, decode_access_token
+from app.core.introspection import introspect_tokens, introspection_max_age
+from app.core.invalidation import InvalidationEvent, publish_after_commit
+from app.core.jwt import create_access_token
 from app.core.password import hash_password, verify_password
+from app.core.rbac import require_permission
+from app.core.refresh_tokens import (
+    issue_refresh_token,
+    revoke_refresh_family,
+    rotate_refresh_token,
+)
+from app.core.settings import get_settings
+from app.core.throttle import get_login_throttle
+from app.core.token_cache import token_digest
 from app.db.session import get_db
 from app.models.revoked_token import RevokedToken
 from app.models.user import User
 from app.schemas.auth_schema import (
+    IntrospectRequest,
+    IntrospectResponse,
     LoginRequest,
+    RefreshRequest,
     RegisterRequest,
     TokenResponse,
     UserOut,
@@ -26,6 +40,19 @@ from app.schemas.auth_schema import (
 auth_router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def _token_response(user: User, refresh_token: str, session_id: str) -> dict:
+    settings = get_settings()
+    access_token = create_access_token(
+        user.id, session_id=session_id, token_version=user.token_version
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": settings.jwt_access_ttl_minutes * 60,
+        "refresh_token": refresh_token,
+    }
+
+
 @auth_router.post(
     "/register", response_model=UserOut, status_code=status.HTTP_201_CREATED
 )
@@ -56,9 +83,19 @@ def register(payload: RegisterRequest, db: Session = Depends(get_db)):
 
 
 @auth_router.post("/login", response_model=TokenResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
+def login(payload: LoginRequest, request: Request, db: Session = Depends(get_db)):
     email = payload.email.strip().lower()
 
+    throttle = get_login_throttle()
+    if throttle is not None:
+        retry_after = throttle.check(email, throttle.client_address(request))
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="too many login attempts",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
     user = db.query(User).filter(User.email == email).first()
     if not user or not user.is_active:
         raise HTTPException(
@@ -70,36 +107,79 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)):
             status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid credentials"
         )
 
-    token = create_access_token(user.id)
-    return {"access_token": token, "token_type": "bearer"}
+    refresh_token, refresh = issue_refresh_token(db, user.id)
+    return _token_response(user, refresh_token, refresh.family_id)
+
+
+@auth_router.post("/refresh", response_model=TokenResponse)
+def refresh(payload: RefreshRequest, db: Session = Depends(get_db)):
+    try:
+        refresh_token, refresh = rotate_refresh_token(db, payload.refresh_token)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid refresh token"
+        )
+
+    user = db.get(User, refresh.user_id)
+    if user is None:
+        raise_not_authenticated()
+    return _token_response(user, refresh_token, refresh.family_id)
 
 
 @auth_router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
 def logout(
     db: Session = Depends(get_db),
-    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
-    user: User = Depends(get_current_user),
+    auth: AuthContext = Depends(get_auth_context),
 ):
-    token = _get_bearer_token(credentials)
-
-    try:
-        payload = decode_access_token(token)
-    except Exception:
-        raise_not_authenticated()
-
-    jti = payload.get("jti")
-    exp = payload.get("exp")
+    jti = auth.claims.get("jti")
+    exp = auth.claims.get("exp")
     if not jti or not exp:
         raise_not_authenticated()
 
-    expires_at = datetime.fromtimestamp(int(exp), tz=timezone.utc)
+    session_id = auth.claims.get("sid")
+    if session_id:
+        revoke_refresh_family(db, str(session_id))
+
+    if get_settings().jwt_revocation_check:
+        expires_at = datetime.fromtimestamp(int(exp), tz=UTC)
+        revoked = RevokedToken(jti=str(jti), user_id=auth.user.id, expire_at=expires_at)
+        try:
+            with db.begin_nested():
+                db.add(revoked)
+        except IntegrityError:
+            pass
+
+    publish_after_commit(
+        db,
+        InvalidationEvent(
+            "token_revoked",
+            user_id=auth.user.id,
+            token_digest=token_digest(auth.token).hex(),
+        ),
+    )
 
-    revoked = RevokedToken(jti=str(jti), user_id=user.id, expire_at=expires_at)
-    db.add(revoked)
 
-    try:
-        db.flush()
-    except IntegrityError:
-        db.rollback()
+@auth_router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+def logout_all(
+    db: Session = Depends(get_db),
+    auth: AuthContext = Depends(get_auth_context),
+):
+    invalidate_user_sessions(db, auth.user)
+
 
-    return None
+@auth_router.post(
+    "/introspect",
+    response_model=IntrospectResponse,
+    response_model_exclude_none=True,
+    dependencies=[Depends(require_permission("auth_introspection", "read"))],
+)
+def introspect(
+    payload: IntrospectRequest, response: Response, db: Session = Depends(get_db)
+):
+    results = introspect_tokens(db, payload.tokens)
+
+    max_age = introspection_max_age(
+        results, get_settings().introspection_max_age_seconds
+    )
+    response.headers["Cache-Control"] = f"private, max-age={max_age}"
+    return {"results": results}
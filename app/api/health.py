@@ -1,5 +1,8 @@
 from fastapi import APIRouter
+
+from app.core.audit import get_decision_auditor
 from app.core.settings import get_settings
+from app.core.throttle import get_login_throttle
 
 health_router = APIRouter()
 
@@ -8,3 +11,19 @@ health_router = APIRouter()
 def health():
     settings = get_settings()
     return {"status": "ok", "env": settings.app_env}
+
+
+@health_router.get("/health/throttle")
+def throttle_stats():
+    throttle = get_login_throttle()
+    if throttle is None:
+        return {"enabled": False}
+    return {"enabled": True, **throttle.stats()}
+
+
+@health_router.get("/health/audit")
+def audit_stats():
+    auditor = get_decision_auditor()
+    if auditor is None:
+        return {"enabled": False}
+    return {"enabled": True, **auditor.stats()}
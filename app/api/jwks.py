@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Request
+
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.keys import get_key_ring
+from app.core.responses import OrjsonResponse
+from app.core.settings import get_settings
+
+jwks_router = APIRouter(tags=["auth"])
+
+
+@jwks_router.get("/.well-known/jwks.json")
+def jwks(request: Request):
+    key_ring = get_key_ring()
+    body = key_ring.jwks() if key_ring else {"keys": []}
+
+    etag = make_etag("jwks", *(key["kid"] for key in body["keys"]))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    max_age = get_settings().jwks_max_age_seconds
+    return OrjsonResponse(
+        body,
+        headers={"ETag": etag, "Cache-Control": f"public, max-age={max_age}"},
+    )
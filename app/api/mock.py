@@ -1,20 +1,25 @@
+from functools import lru_cache
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.core.auth_jwt import get_current_user
-from app.core.rbac import has_all_permission, has_permission
+from app.core.mock_store import (
+    MemoryResourceStore,
+    ResourceStore,
+    SeedFn,
+    SqlResourceStore,
+)
+from app.core.rbac import get_access_scope, has_permission
+from app.core.settings import get_settings
 from app.db.session import get_db
+from app.models.mock_order import MockOrder
+from app.models.mock_product import MockProduct
 from app.models.user import User
 from app.schemas.mock_schema import OrderOut, ProductOut, ProductPatch
 
 mock_router = APIRouter(prefix="/mock", tags=["mock"])
-_PRODUCTS: dict[int, list[dict]] = {}
-
-
-def _get_products_for_user(user_id: int) -> list[dict]:
-    if user_id not in _PRODUCTS:
-        _PRODUCTS[user_id] = _build_products(user_id)
-    return _PRODUCTS[user_id]
+_MEMORY_STORES: dict[str, MemoryResourceStore] = {}
 
 
 def _build_products(current_user_id: int) -> list[dict]:
@@ -35,25 +40,47 @@ def _build_orders(current_user_id: int) -> list[dict]:
     return items
 
 
+def _memory_store(name: str, seed: SeedFn) -> MemoryResourceStore:
+    store = _MEMORY_STORES.get(name)
+    if store is None:
+        settings = get_settings()
+        store = MemoryResourceStore(seed, settings.mock_store_max_partitions)
+        _MEMORY_STORES[name] = store
+    return store
+
+
+@lru_cache(maxsize=1)
+def mock_store_backend() -> str:
+    return get_settings().mock_store_backend
+
+
+def get_products_store(db: Session = Depends(get_db)) -> ResourceStore:
+    if mock_store_backend() == "sql":
+        return SqlResourceStore(
+            db, MockProduct, ["id", "title", "owner_id"], _build_products
+        )
+    return _memory_store("products", _build_products)
+
+
+def get_orders_store(db: Session = Depends(get_db)) -> ResourceStore:
+    if mock_store_backend() == "sql":
+        return SqlResourceStore(
+            db, MockOrder, ["id", "status", "owner_id"], _build_orders
+        )
+    return _memory_store("orders", _build_orders)
+
+
 @mock_router.get("/products", response_model=list[ProductOut])
 def list_products(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
+    store: ResourceStore = Depends(get_products_store),
 ):
-    items = _get_products_for_user(user.id)
-
-    if has_all_permission(db, user, "products", "read"):
-        return items
-
-    if not has_permission(db, user, "products", "read", owner_id=user.id):
+    scope = get_access_scope(db, user, "products", "read")
+    if scope.kind == "none":
         raise HTTPException(status_code=403, detail="forbidden")
 
-    result = []
-    for item in items:
-        if item["owner_id"] == user.id:
-            result.append(item)
-
-    return result
+    return store.list_items(user.id, scope)
 
 
 @mock_router.patch("/products/{product_id}", response_model=ProductOut)
@@ -62,15 +89,9 @@ def patch_product(
     payload: ProductPatch,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
+    store: ResourceStore = Depends(get_products_store),
 ):
-    items = _get_products_for_user(user.id)
-
-    found_item = None
-    for item in items:
-        if item["id"] == product_id:
-            found_item = item
-            break
-
+    found_item = store.get_item(user.id, product_id)
     if found_item is None:
         raise HTTPException(status_code=404, detail="not found")
 
@@ -78,26 +99,17 @@ def patch_product(
     if not ok:
         raise HTTPException(status_code=403, detail="forbidden")
 
-    found_item["title"] = payload.title
-    return found_item
+    return store.update_item(user.id, product_id, {"title": payload.title})
 
 
 @mock_router.get("/orders", response_model=list[OrderOut])
 def list_orders(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
+    store: ResourceStore = Depends(get_orders_store),
 ):
-    items = _build_orders(user.id)
-
-    if has_all_permission(db, user, "orders", "read"):
-        return items
-
-    if not has_permission(db, user, "orders", "read", owner_id=user.id):
+    scope = get_access_scope(db, user, "orders", "read")
+    if scope.kind == "none":
         raise HTTPException(status_code=403, detail="forbidden")
 
-    result = []
-    for item in items:
-        if item["owner_id"] == user.id:
-            result.append(item)
-
-    return result
+    return store.list_items(user.id, scope)
@@ -1,20 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.core.auth_jwt import get_current_user
+from app.core.auth_jwt import get_current_user, invalidate_user_sessions
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.permissions import ACTIONS, mask_scope
+from app.core.policy_version import get_policy_version
+from app.core.rbac import get_permission_map
+from app.core.responses import OrjsonResponse
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.auth_schema import UpdateProfileRequest, UserOut
+from app.schemas.rbac_schema import PermissionMapOut
 
 users_router = APIRouter(prefix="/users", tags=["users"])
 
 
 @users_router.get("/me", response_model=UserOut)
-def read_me(user: User = Depends(get_current_user)):
+def read_me(
+    request: Request, response: Response, user: User = Depends(get_current_user)
+):
+    etag = make_etag("me", user.id, user.version_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    response.headers["ETag"] = etag
     return user
 
 
+@users_router.get("/me/permissions", response_model=PermissionMapOut)
+def read_my_permissions(
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    version = get_policy_version(db)
+    etag = make_etag("my_permissions", version, user.id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    permissions = {}
+    for code, mask in get_permission_map(db, user.id).items():
+        scopes = {action: mask_scope(mask, action) for action in ACTIONS}
+        permissions[code] = {
+            action: scope for action, scope in scopes.items() if scope != "none"
+        }
+    return OrjsonResponse(
+        {"version": version, "permissions": permissions},
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"},
+    )
+
+
 @users_router.patch("/me", response_model=UserOut)
 def update_me(
     payload: UpdateProfileRequest,
@@ -30,6 +66,7 @@ def update_me(
             raise HTTPException(status_code=400, detail="email must not be empty")
         current_user.email = email
 
+    current_user.version_id = User.version_id + 1
     db.add(current_user)
     try:
         db.flush()
@@ -45,8 +82,7 @@ def delete_me(
     current_user: User = Depends(get_current_user),
 ):
     current_user.is_active = False
-
-    db.add(current_user)
-    db.flush()
+    current_user.version_id = User.version_id + 1
+    invalidate_user_sessions(db, current_user)
 
     return current_user
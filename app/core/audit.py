@@ -0,0 +1,276 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Protocol
+
+import orjson
+from sqlalchemy import Engine, insert
+
+from app.core.settings import get_settings
+from app.db.session import get_engine
+from app.models.authz_decision import AuthzDecision
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Decision:
+    created_at: float
+    user_id: int
+    resource: str
+    action: str
+    allowed: bool
+    owner_id: int | None = None
+
+
+class AuditSink(Protocol):
+    def write(self, batch: Sequence[Decision]) -> None: ...
+
+
+class SqlAuditSink:
+    def __init__(self, engine: Engine) -> None:
+        self._engine = engine
+
+    def write(self, batch: Sequence[Decision]) -> None:
+        rows = [
+            {
+                **asdict(decision),
+                "created_at": datetime.fromtimestamp(decision.created_at, UTC),
+            }
+            for decision in batch
+        ]
+        with self._engine.begin() as conn:
+            conn.execute(insert(AuthzDecision), rows)
+
+
+class NdjsonAuditSink:
+    def __init__(self, directory: str, max_bytes: int, name: str = "decisions") -> None:
+        self._dir = Path(directory)
+        self._name = name
+        self._path = self._dir / f"{name}.ndjson"
+        self._max_bytes = max_bytes
+
+    def _rotate(self) -> None:
+        if self._path.exists() and self._path.stat().st_size >= self._max_bytes:
+            stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+            self._path.rename(
+                self._dir / f"{self._name}-{stamp}-{time.time_ns() % 10**9}.ndjson"
+            )
+
+    def write(self, batch: Sequence[Decision]) -> None:
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._rotate()
+        payload = b"".join(
+            orjson.dumps(decision, option=orjson.OPT_APPEND_NEWLINE)
+            for decision in batch
+        )
+        with open(self._path, "ab") as f:
+            f.write(payload)
+
+
+class DecisionAuditor:
+    def __init__(
+        self,
+        sink: AuditSink,
+        queue_size: int,
+        batch_size: int,
+        flush_interval_seconds: float,
+        allow_sample_rate: float,
+        spill: AuditSink | None = None,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.sink = sink
+        self.spill = spill
+        self._queue_size = queue_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval_seconds
+        self._allow_sample_rate = allow_sample_rate
+        self._rng = rng or random.Random()
+        self._allows: deque[Decision] = deque()
+        self._denies: deque[Decision] = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._write_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self.counters = {
+            "recorded": 0,
+            "sampled_out": 0,
+            "dropped": 0,
+            "spilled": 0,
+            "spill_errors": 0,
+            "written": 0,
+            "write_errors": 0,
+        }
+
+    def record(self, decision: Decision) -> None:
+        if decision.allowed and self._rng.random() >= self._allow_sample_rate:
+            with self._lock:
+                self.counters["sampled_out"] += 1
+            return
+
+        self._ensure_started()
+        overflow: list[Decision] = []
+        with self._lock:
+            self.counters["recorded"] += 1
+            queue = self._allows if decision.allowed else self._denies
+            if len(queue) >= self._queue_size:
+                if decision.allowed:
+                    queue.popleft()
+                    self.counters["dropped"] += 1
+                else:
+                    overflow.append(queue.popleft())
+            queue.append(decision)
+            pending = len(self._allows) + len(self._denies)
+
+        if overflow:
+            self._spill(overflow)
+        if pending >= self._batch_size:
+            self._wakeup.set()
+
+    def _spill(self, denies: list[Decision]) -> None:
+        if self.spill is not None:
+            try:
+                with self._spill_lock:
+                    self.spill.write(denies)
+            except Exception:
+                logger.exception("failed to spill %d audit denies", len(denies))
+                with self._lock:
+                    self.counters["spill_errors"] += 1
+            else:
+                with self._lock:
+                    self.counters["spilled"] += len(denies)
+                return
+        with self._lock:
+            self._denies.extendleft(reversed(denies))
+
+    def _take_batch(self) -> tuple[list[Decision], list[Decision]]:
+        with self._lock:
+            denies = [
+                self._denies.popleft()
+                for _ in range(min(len(self._denies), self._batch_size))
+            ]
+            room = self._batch_size - len(denies)
+            allows = [
+                self._allows.popleft() for _ in range(min(len(self._allows), room))
+            ]
+        return denies, allows
+
+    def _write_batch(self) -> bool:
+        with self._write_lock:
+            denies, allows = self._take_batch()
+            if not denies and not allows:
+                return False
+            try:
+                self.sink.write(denies + allows)
+            except Exception:
+                with self._lock:
+                    self._denies.extendleft(reversed(denies))
+                    excess = max(len(self._denies) - self._queue_size, 0)
+                    overflow = [self._denies.popleft() for _ in range(excess)]
+                    self.counters["write_errors"] += 1
+                    self.counters["dropped"] += len(allows)
+                logger.exception(
+                    "failed to write %d audit decisions: requeued %d, spilled %d, "
+                    "dropped %d",
+                    len(denies) + len(allows),
+                    len(denies) - len(overflow),
+                    len(overflow),
+                    len(allows),
+                )
+                if overflow:
+                    self._spill(overflow)
+                return False
+            with self._lock:
+                self.counters["written"] += len(denies) + len(allows)
+            return True
+
+    def flush(self) -> None:
+        while self._write_batch():
+            pass
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None or self._closed:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def close(self) -> None:
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                **self.counters,
+                "queued": len(self._allows) + len(self._denies),
+            }
+
+
+@lru_cache(maxsize=1)
+def get_decision_auditor() -> DecisionAuditor | None:
+    settings = get_settings()
+
+    sink: AuditSink
+    spill = NdjsonAuditSink(
+        settings.audit_ndjson_dir, settings.audit_ndjson_max_bytes, "denies-overflow"
+    )
+    if settings.audit_backend == "sql":
+        sink = SqlAuditSink(get_engine())
+    elif settings.audit_backend == "ndjson":
+        sink = NdjsonAuditSink(
+            settings.audit_ndjson_dir, settings.audit_ndjson_max_bytes
+        )
+    else:
+        return None
+
+    return DecisionAuditor(
+        sink,
+        queue_size=settings.audit_queue_size,
+        batch_size=settings.audit_batch_size,
+        flush_interval_seconds=settings.audit_flush_interval_seconds,
+        allow_sample_rate=settings.audit_allow_sample_rate,
+        spill=spill,
+    )
+
+
+def audit_decision(
+    user_id: int,
+    resource: str,
+    action: str,
+    allowed: bool,
+    owner_id: int | None = None,
+) -> None:
+    auditor = get_decision_auditor()
+    if auditor is None:
+        return
+    auditor.record(
+        Decision(
+            created_at=time.time(),
+            user_id=user_id,
+            resource=resource,
+            action=action,
+            allowed=allowed,
+            owner_id=owner_id,
+        )
+    )
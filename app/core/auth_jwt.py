@@ -1,10 +1,14 @@
-from typing import NoReturn
+from dataclasses import dataclass
+from typing import Any, NoReturn
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
+from app.core.invalidation import InvalidationEvent, publish_after_commit
 from app.core.jwt import decode_access_token
+from app.core.refresh_tokens import revoke_user_refresh_tokens
+from app.core.settings import get_settings
 from app.db.session import get_db
 from app.models.revoked_token import RevokedToken
 from app.models.user import User
@@ -12,6 +16,13 @@ from app.models.user import User
 bearer_scheme = HTTPBearer(auto_error=False)
 
 
+@dataclass(frozen=True)
+class AuthContext:
+    user: User
+    claims: dict[str, Any]
+    token: str
+
+
 def raise_not_authenticated() -> NoReturn:
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -30,10 +41,10 @@ def _get_bearer_token(credentials: HTTPAuthorizationCredentials | None) -> str:
     return token
 
 
-def get_current_user(
+def get_auth_context(
     db: Session = Depends(get_db),
     credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
-) -> User:
+) -> AuthContext:
     token = _get_bearer_token(credentials)
 
     try:
@@ -46,12 +57,29 @@ def get_current_user(
     if not jti:
         raise_not_authenticated()
 
-    revoked = db.query(RevokedToken).filter(RevokedToken.jti == str(jti)).first()
-    if revoked:
-        raise_not_authenticated()
+    if get_settings().jwt_revocation_check:
+        revoked = db.query(RevokedToken).filter(RevokedToken.jti == str(jti)).first()
+        if revoked:
+            raise_not_authenticated()
 
     user = db.get(User, user_id)
     if not user or not user.is_active:
         raise_not_authenticated()
 
-    return user
+    if int(payload.get("ver", 0)) != user.token_version:
+        raise_not_authenticated()
+
+    return AuthContext(user=user, claims=payload, token=token)
+
+
+def invalidate_user_sessions(db: Session, user: User) -> None:
+    user.token_version += 1
+    revoke_user_refresh_tokens(db, user.id)
+    db.flush()
+    publish_after_commit(
+        db, InvalidationEvent("user_sessions_revoked", user_id=user.id)
+    )
+
+
+def get_current_user(auth: AuthContext = Depends(get_auth_context)) -> User:
+    return auth.user
@@ -0,0 +1,153 @@
+import argparse
+import sys
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    Connection,
+    Select,
+    case,
+    delete,
+    func,
+    insert,
+    select,
+)
+from sqlalchemy.orm import Session
+
+from app.core.permissions import RULE_FLAGS
+from app.core.settings import get_settings
+from app.db.session import get_sessionmaker
+from app.models.access_role_rule import AccessRoleRule
+from app.models.business_element import BusinessElement
+from app.models.effective_permission import EffectivePermission
+from app.models.user_role import UserRole
+
+
+@lru_cache(maxsize=1)
+def materialized_permissions_enabled() -> bool:
+    return get_settings().rbac_evaluator == "materialized"
+
+
+def aggregated_mask() -> ColumnElement[int]:
+    bits = [
+        func.max(case((getattr(AccessRoleRule, column), bit), else_=0))
+        for column, bit in RULE_FLAGS.items()
+    ]
+    return sum(bits[1:], bits[0])
+
+
+def effective_permissions_query(
+    user_ids: Sequence[int] | Select | None = None, element_id: int | None = None
+) -> Select:
+    mask = aggregated_mask()
+    query = (
+        select(UserRole.user_id, AccessRoleRule.element_id, mask.label("mask"))
+        .join(AccessRoleRule, AccessRoleRule.role_id == UserRole.role_id)
+        .group_by(UserRole.user_id, AccessRoleRule.element_id)
+        .having(mask > 0)
+    )
+    if user_ids is not None:
+        query = query.where(UserRole.user_id.in_(user_ids))
+    if element_id is not None:
+        query = query.where(AccessRoleRule.element_id == element_id)
+    return query
+
+
+def refresh_effective_permissions(
+    db: Session | Connection,
+    user_ids: Sequence[int] | Select | None = None,
+    element_id: int | None = None,
+) -> None:
+    stale = delete(EffectivePermission)
+    if user_ids is not None:
+        stale = stale.where(EffectivePermission.user_id.in_(user_ids))
+    if element_id is not None:
+        stale = stale.where(EffectivePermission.element_id == element_id)
+    db.execute(stale)
+    db.execute(
+        insert(EffectivePermission).from_select(
+            ["user_id", "element_id", "mask"],
+            effective_permissions_query(user_ids, element_id),
+        )
+    )
+
+
+def apply_policy_change(
+    db: Session | Connection, entity: str, payload: dict[str, Any]
+) -> None:
+    if entity == "rule":
+        role_users = select(UserRole.user_id).where(
+            UserRole.role_id == payload["role_id"]
+        )
+        refresh_effective_permissions(db, role_users, payload["element_id"])
+    elif entity == "user_role":
+        refresh_effective_permissions(db, [payload["user_id"]])
+    elif entity == "element":
+        refresh_effective_permissions(db, element_id=payload["id"])
+
+
+def materialized_permission_mask(
+    db: Session | Connection, user_id: int, resource: str
+) -> int:
+    mask = db.execute(
+        select(EffectivePermission.mask)
+        .join(BusinessElement, BusinessElement.id == EffectivePermission.element_id)
+        .where(EffectivePermission.user_id == user_id, BusinessElement.code == resource)
+    ).scalar()
+    return int(mask or 0)
+
+
+def find_inconsistencies(
+    db: Session | Connection,
+) -> list[tuple[int, int, int, int]]:
+    stored = {
+        (row.user_id, row.element_id): row.mask
+        for row in db.execute(
+            select(
+                EffectivePermission.user_id,
+                EffectivePermission.element_id,
+                EffectivePermission.mask,
+            )
+        )
+    }
+    expected = {
+        (row.user_id, row.element_id): row.mask
+        for row in db.execute(effective_permissions_query())
+    }
+    issues = []
+    for user_id, element_id in sorted(stored.keys() | expected.keys()):
+        have = stored.get((user_id, element_id), 0)
+        want = expected.get((user_id, element_id), 0)
+        if have != want:
+            issues.append((user_id, element_id, have, want))
+    return issues
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Rebuild or check the materialized effective_permissions table"
+    )
+    parser.add_argument("command", choices=["rebuild", "check"])
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        with get_sessionmaker().begin() as db:
+            refresh_effective_permissions(db)
+            count = db.execute(select(func.count()).select_from(EffectivePermission))
+            print(f"effective_permissions rebuilt: {count.scalar_one()} rows")
+        return
+
+    with get_sessionmaker()() as db:
+        issues = find_inconsistencies(db)
+    for user_id, element_id, stored, expected in issues[:50]:
+        print(
+            f"user {user_id} element {element_id}: stored {stored}, expected {expected}"
+        )
+    print(f"{len(issues)} inconsistent rows")
+    sys.exit(1 if issues else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import time
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.jwt import decode_access_token
+from app.models.revoked_token import RevokedToken
+from app.models.role import Role
+from app.models.user import User
+from app.models.user_role import UserRole
+
+
+def introspect_tokens(db: Session, tokens: list[str]) -> list[dict[str, Any]]:
+    claims_list: list[dict[str, Any] | None] = []
+    for token in tokens:
+        try:
+            claims = decode_access_token(token)
+            int(claims.get("sub", ""))
+        except (ValueError, TypeError):
+            claims = None
+        if claims is not None and not claims.get("jti"):
+            claims = None
+        claims_list.append(claims)
+
+    valid = [claims for claims in claims_list if claims is not None]
+    if not valid:
+        return [{"active": False} for _ in tokens]
+
+    jtis = {str(claims["jti"]) for claims in valid}
+    user_ids = {int(claims["sub"]) for claims in valid}
+
+    revoked = set(
+        db.execute(select(RevokedToken.jti).where(RevokedToken.jti.in_(jtis)))
+        .scalars()
+        .all()
+    )
+    users = {
+        row.id: row
+        for row in db.execute(
+            select(User.id, User.email, User.is_active, User.token_version).where(
+                User.id.in_(user_ids)
+            )
+        )
+    }
+    roles: dict[int, list[str]] = {}
+    role_rows = db.execute(
+        select(UserRole.user_id, Role.name)
+        .join(Role, Role.id == UserRole.role_id)
+        .where(UserRole.user_id.in_(user_ids))
+        .order_by(Role.name)
+    )
+    for user_id, role_name in role_rows:
+        roles.setdefault(user_id, []).append(role_name)
+
+    results: list[dict[str, Any]] = []
+    for claims in claims_list:
+        if claims is None or str(claims["jti"]) in revoked:
+            results.append({"active": False})
+            continue
+
+        user_id = int(claims["sub"])
+        user = users.get(user_id)
+        if user is None or not user.is_active:
+            results.append({"active": False})
+            continue
+        if int(claims.get("ver", 0)) != user.token_version:
+            results.append({"active": False})
+            continue
+
+        results.append(
+            {
+                "active": True,
+                "sub": str(user_id),
+                "email": user.email,
+                "token_type": claims.get("type", "access"),
+                "jti": str(claims["jti"]),
+                "iat": claims.get("iat"),
+                "exp": claims["exp"],
+                "roles": roles.get(user_id, []),
+            }
+        )
+    return results
+
+
+def introspection_max_age(results: list[dict[str, Any]], cap_seconds: int) -> int:
+    now = int(time.time())
+    max_age = cap_seconds
+    for result in results:
+        if result["active"]:
+            max_age = min(max_age, int(result["exp"]) - now)
+    return max(max_age, 0)
@@ -0,0 +1,315 @@
+import logging
+import os
+import re
+import select
+import socket
+import threading
+import uuid
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Literal, Protocol
+
+import orjson
+from sqlalchemy import Engine, event, text
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.core.policy_version import get_policy_version
+from app.core.settings import get_settings
+from app.db.session import get_engine
+
+logger = logging.getLogger(__name__)
+
+EventKind = Literal[
+    "role_changed",
+    "user_roles_changed",
+    "token_revoked",
+    "user_sessions_revoked",
+    "flush_all",
+]
+Handler = Callable[["InvalidationEvent"], None]
+Deliver = Callable[[bytes], None]
+
+_PENDING_KEY = "pending_invalidations"
+_CHANNEL_RE = re.compile(r"^[a-z_][a-z0-9_]{0,62}$")
+_FLUSH_ALL = orjson.dumps({"kind": "flush_all"})
+
+
+@dataclass(frozen=True)
+class InvalidationEvent:
+    kind: EventKind
+    user_id: int | None = None
+    token_digest: str | None = None
+    policy_version: int | None = None
+
+
+class InvalidationBackend(Protocol):
+    def start(self, deliver: Deliver) -> None: ...
+
+    def publish(self, payload: bytes) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class LocalInvalidationBackend:
+    def start(self, deliver: Deliver) -> None:
+        return None
+
+    def publish(self, payload: bytes) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+def check_socket_dir(path: Path) -> None:
+    stat = os.stat(path)
+    if hasattr(os, "geteuid") and stat.st_uid != os.geteuid():
+        raise RuntimeError(
+            f"invalidation socket dir {path} is not owned by the service user"
+        )
+    if stat.st_mode & 0o077:
+        raise RuntimeError(
+            f"invalidation socket dir {path} is accessible to other users"
+        )
+
+
+class UnixSocketInvalidationBackend:
+    def __init__(self, directory: str, name: str) -> None:
+        self._dir = Path(directory)
+        self._path = self._dir / f"{name}.sock"
+        self._receiver: socket.socket | None = None
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+        self._lock = threading.Lock()
+
+    def start(self, deliver: Deliver) -> None:
+        self._dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        check_socket_dir(self._dir)
+        self._path.unlink(missing_ok=True)
+        receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        receiver.bind(str(self._path))
+        self._receiver = receiver
+        threading.Thread(
+            target=self._listen, args=(receiver, deliver), daemon=True
+        ).start()
+
+    def _listen(self, receiver: socket.socket, deliver: Deliver) -> None:
+        while True:
+            try:
+                payload = receiver.recv(65536)
+            except OSError:
+                return
+            deliver(payload)
+
+    def publish(self, payload: bytes) -> None:
+        with self._lock:
+            for peer in self._dir.glob("*.sock"):
+                if peer == self._path:
+                    continue
+                try:
+                    self._sender.sendto(payload, str(peer))
+                except (ConnectionRefusedError, FileNotFoundError):
+                    peer.unlink(missing_ok=True)
+                except BlockingIOError:
+                    logger.warning("invalidation peer %s is not draining", peer.name)
+
+    def close(self) -> None:
+        if self._receiver is not None:
+            self._receiver.close()
+            self._receiver = None
+            self._path.unlink(missing_ok=True)
+        self._sender.close()
+
+
+class PostgresInvalidationBackend:
+    def __init__(
+        self,
+        engine: Engine,
+        channel: str,
+        reconnect_delay_seconds: float = 1.0,
+        max_reconnect_delay_seconds: float = 30.0,
+    ) -> None:
+        if not _CHANNEL_RE.match(channel):
+            raise ValueError(f"invalid notification channel: {channel!r}")
+        self._engine = engine
+        self._channel = channel
+        self._reconnect_delay = reconnect_delay_seconds
+        self._max_reconnect_delay = max_reconnect_delay_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self, deliver: Deliver) -> None:
+        self._thread = threading.Thread(
+            target=self._listen, args=(deliver,), daemon=True
+        )
+        self._thread.start()
+
+    def _listen(self, deliver: Deliver) -> None:
+        delay = self._reconnect_delay
+        missed = False
+        while not self._stop.is_set():
+            try:
+                self._listen_once(deliver, missed)
+                return
+            except Exception:
+                logger.warning(
+                    "invalidation listener on %s disconnected, reconnecting in %.1fs",
+                    self._channel,
+                    delay,
+                    exc_info=True,
+                )
+            missed = True
+            self._stop.wait(delay)
+            delay = min(delay * 2, self._max_reconnect_delay)
+
+    def _listen_once(self, deliver: Deliver, missed: bool) -> None:
+        raw = self._engine.raw_connection()
+        try:
+            conn: Any = raw.driver_connection
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {self._channel}")
+            if missed:
+                logger.warning("invalidation listener on %s reconnected", self._channel)
+                deliver(_FLUSH_ALL)
+            while not self._stop.is_set():
+                if not select.select([conn], [], [], 1.0)[0]:
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    deliver(conn.notifies.pop(0).payload.encode("utf-8"))
+        finally:
+            raw.invalidate()
+
+    def publish(self, payload: bytes) -> None:
+        with self._engine.begin() as conn:
+            conn.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": self._channel, "payload": payload.decode("utf-8")},
+            )
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+class InvalidationBus:
+    def __init__(
+        self,
+        backend: InvalidationBackend,
+        origin: str | None = None,
+        current_version: Callable[[], int] | None = None,
+    ) -> None:
+        self.backend = backend
+        self.origin = origin or uuid.uuid4().hex
+        self._current_version = current_version
+        self._handlers: list[Handler] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, handler: Handler) -> None:
+        with self._lock:
+            if handler not in self._handlers:
+                self._handlers.append(handler)
+
+    def start(self) -> None:
+        self.backend.start(self._receive)
+
+    def close(self) -> None:
+        self.backend.close()
+
+    def _dispatch(self, event: InvalidationEvent) -> None:
+        with self._lock:
+            handlers = list(self._handlers)
+        for handler in handlers:
+            try:
+                handler(event)
+            except Exception:
+                logger.exception("invalidation handler failed for %s", event.kind)
+
+    def _check_version(self, event: InvalidationEvent) -> InvalidationEvent | None:
+        version = event.policy_version
+        if version is None or self._current_version is None:
+            return event
+        try:
+            current = self._current_version()
+        except Exception:
+            logger.exception("failed to check invalidation policy version")
+            return replace(event, policy_version=None)
+        if version > current:
+            logger.warning(
+                "dropping %s event with policy version %d above current %d",
+                event.kind,
+                version,
+                current,
+            )
+            return None
+        return event
+
+    def _receive(self, payload: bytes) -> None:
+        try:
+            data = orjson.loads(payload)
+            if data.pop("origin", None) == self.origin:
+                return
+            event = InvalidationEvent(**data)
+        except (ValueError, TypeError, AttributeError):
+            logger.warning("dropping malformed invalidation message")
+            return
+        checked = self._check_version(event)
+        if checked is not None:
+            self._dispatch(checked)
+
+    def publish(self, event: InvalidationEvent) -> None:
+        self._dispatch(event)
+        payload = orjson.dumps({"origin": self.origin, **asdict(event)})
+        try:
+            self.backend.publish(payload)
+        except Exception:
+            logger.exception("failed to publish invalidation event %s", event.kind)
+
+
+def _database_policy_version() -> int:
+    with get_engine().connect() as conn:
+        return get_policy_version(conn)
+
+
+@lru_cache(maxsize=1)
+def get_invalidation_bus() -> InvalidationBus:
+    settings = get_settings()
+    origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    backend: InvalidationBackend
+    if settings.invalidation_backend == "unix":
+        backend = UnixSocketInvalidationBackend(
+            settings.invalidation_socket_dir, origin
+        )
+    elif settings.invalidation_backend == "postgres":
+        backend = PostgresInvalidationBackend(
+            get_engine(), settings.invalidation_channel
+        )
+    else:
+        return InvalidationBus(LocalInvalidationBackend(), origin)
+    return InvalidationBus(backend, origin, _database_policy_version)
+
+
+def publish_after_commit(db: Session, event: InvalidationEvent) -> None:
+    db.info.setdefault(_PENDING_KEY, []).append(event)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    bus = get_invalidation_bus()
+    for item in pending:
+        bus.publish(item)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending(session: Session, previous_transaction: SessionTransaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
@@ -1,17 +1,41 @@
 import uuid
-from datetime import datetime, timezone, timedelta
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
 from typing import Any
 
 import jwt
 
-
+from app.core.invalidation import InvalidationEvent
+from app.core.keys import get_key_ring
 from app.core.settings import get_settings
+from app.core.token_cache import TokenCache
+
+
+@lru_cache(maxsize=1)
+def get_token_cache() -> TokenCache:
+    settings = get_settings()
+    return TokenCache(
+        max_size=settings.token_cache_size,
+        ttl_seconds=settings.token_cache_ttl_seconds,
+    )
+
+
+def evict_cached_tokens(event: InvalidationEvent) -> None:
+    cache = get_token_cache()
+    if event.kind == "token_revoked" and event.token_digest:
+        cache.discard_digest(bytes.fromhex(event.token_digest))
+    elif event.kind == "user_sessions_revoked" and event.user_id is not None:
+        cache.discard_subject(str(event.user_id))
+    elif event.kind == "flush_all":
+        cache.clear()
 
 
-def create_access_token(user_id: int) -> str:
+def create_access_token(
+    user_id: int, session_id: str | None = None, token_version: int = 0
+) -> str:
     settings = get_settings()
 
-    now = datetime.now(timezone.utc)
+    now = datetime.now(UTC)
     exp = now + timedelta(minutes=settings.jwt_access_ttl_minutes)
 
     payload = {
@@ -20,21 +44,50 @@ def create_access_token(user_id: int) -> str:
         "exp": int(exp.timestamp()),
         "jti": str(uuid.uuid4()),
         "type": "access",
+        "ver": token_version,
     }
-    token = jwt.encode(payload, settings.jwt_secret, algorithm="HS256")
+    if session_id:
+        payload["sid"] = session_id
+    key_ring = get_key_ring()
+    if key_ring is None:
+        return jwt.encode(payload, settings.jwt_secret, algorithm="HS256")
 
-    return token
+    signing_key = key_ring.active
+    return jwt.encode(
+        payload,
+        signing_key.private_key,
+        algorithm=signing_key.algorithm,
+        headers={"kid": signing_key.kid},
+    )
+
+
+def _verification_key(token: str) -> tuple[Any, str]:
+    key_ring = get_key_ring()
+    if key_ring is None:
+        return get_settings().jwt_secret, "HS256"
+
+    kid = jwt.get_unverified_header(token).get("kid")
+    signing_key = key_ring.get(str(kid)) if kid else None
+    if signing_key is None:
+        raise jwt.InvalidTokenError("unknown signing key")
+    return signing_key.public_key, key_ring.algorithm
 
 
 def decode_access_token(token: str) -> dict[str, Any]:
-    settings = get_settings()
+    cache = get_token_cache()
+    cached = cache.get(token)
+    if cached is not None:
+        return cached
+
     try:
+        key, algorithm = _verification_key(token)
         payload = jwt.decode(
             token,
-            settings.jwt_secret,
-            algorithms=["HS256"],
+            key,
+            algorithms=[algorithm],
             options={"require": ["sub", "exp"]},
         )
+        cache.put(token, payload)
         return payload
     except jwt.ExpiredSignatureError as e:
         raise ValueError("token expired") from e
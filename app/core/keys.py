@@ -0,0 +1,120 @@
+import argparse
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+from app.core.settings import get_settings
+
+ASYMMETRIC_ALGORITHMS = ("EdDSA", "RS256")
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    private_key: Any
+    public_key: Any
+
+    def to_jwk(self) -> dict[str, Any]:
+        if self.algorithm == "EdDSA":
+            jwk = dict(OKPAlgorithm.to_jwk(self.public_key, as_dict=True))
+        else:
+            jwk = dict(RSAAlgorithm.to_jwk(self.public_key, as_dict=True))
+        jwk.update({"kid": self.kid, "alg": self.algorithm, "use": "sig"})
+        return jwk
+
+
+class KeyRing:
+    def __init__(self, algorithm: str, keys: dict[str, SigningKey], active_kid: str):
+        if active_kid not in keys:
+            raise RuntimeError(f"active signing key {active_kid!r} is not loaded")
+        self.algorithm = algorithm
+        self.active = keys[active_kid]
+        self._keys = keys
+
+    def get(self, kid: str) -> SigningKey | None:
+        return self._keys.get(kid)
+
+    def jwks(self) -> dict[str, list[dict[str, Any]]]:
+        return {"keys": [key.to_jwk() for key in self._keys.values()]}
+
+
+def _load_private_key(path: Path, algorithm: str) -> Any:
+    key = serialization.load_pem_private_key(path.read_bytes(), password=None)
+    expected = ed25519.Ed25519PrivateKey if algorithm == "EdDSA" else rsa.RSAPrivateKey
+    if not isinstance(key, expected):
+        raise TypeError(f"{path.name} is not a valid {algorithm} private key")
+    return key
+
+
+def load_key_ring(algorithm: str, keys_dir: str, active_kid: str | None) -> KeyRing:
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        raise RuntimeError(f"unsupported jwt algorithm: {algorithm}")
+
+    keys: dict[str, SigningKey] = {}
+    for path in sorted(Path(keys_dir).glob("*.pem")):
+        private_key = _load_private_key(path, algorithm)
+        keys[path.stem] = SigningKey(
+            kid=path.stem,
+            algorithm=algorithm,
+            private_key=private_key,
+            public_key=private_key.public_key(),
+        )
+    if not keys:
+        raise RuntimeError(f"no *.pem signing keys found in {keys_dir}")
+
+    return KeyRing(algorithm, keys, active_kid or max(keys))
+
+
+@lru_cache(maxsize=1)
+def get_key_ring() -> KeyRing | None:
+    settings = get_settings()
+    if settings.jwt_algorithm == "HS256":
+        return None
+    if not settings.jwt_keys_dir:
+        raise RuntimeError("JWT_KEYS_DIR is required for asymmetric jwt algorithms")
+    return load_key_ring(
+        settings.jwt_algorithm, settings.jwt_keys_dir, settings.jwt_active_kid
+    )
+
+
+def generate_private_key_pem(algorithm: str) -> bytes:
+    key: Any
+    if algorithm == "EdDSA":
+        key = ed25519.Ed25519PrivateKey.generate()
+    elif algorithm == "RS256":
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        raise ValueError(f"unsupported jwt algorithm: {algorithm}")
+
+    return key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a JWT signing key")
+    parser.add_argument("--algorithm", choices=ASYMMETRIC_ALGORITHMS, default="EdDSA")
+    parser.add_argument("--kid", required=True)
+    parser.add_argument("--dir", required=True)
+    args = parser.parse_args(argv)
+
+    path = Path(args.dir) / f"{args.kid}.pem"
+    if path.exists():
+        parser.error(f"{path} already exists")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(generate_private_key_pem(args.algorithm))
+    path.chmod(0o600)
+    print(f"Key written to {path}")
+
+
+if __name__ == "__main__":
+    main()
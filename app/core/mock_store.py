@@ -0,0 +1,145 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Protocol
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.rbac import AccessScope
+from app.db.base import Base
+
+Item = dict[str, Any]
+SeedFn = Callable[[int], list[Item]]
+
+
+class ResourceStore(Protocol):
+    def list_items(self, partition_id: int, scope: AccessScope) -> list[Item]: ...
+
+    def get_item(self, partition_id: int, item_id: int) -> Item | None: ...
+
+    def update_item(
+        self, partition_id: int, item_id: int, fields: dict[str, Any]
+    ) -> Item | None: ...
+
+
+class _Partition:
+    def __init__(self, items: list[Item]) -> None:
+        self.by_id: dict[int, Item] = {}
+        self.by_owner: dict[int, list[Item]] = {}
+        for item in items:
+            self.by_id[item["id"]] = item
+            self.by_owner.setdefault(item["owner_id"], []).append(item)
+
+
+class MemoryResourceStore:
+    def __init__(self, seed: SeedFn, max_partitions: int) -> None:
+        if max_partitions < 1:
+            raise ValueError("max_partitions must be positive")
+        self._seed = seed
+        self._max_partitions = max_partitions
+        self._partitions: OrderedDict[int, _Partition] = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._partitions)
+
+    def _partition(self, partition_id: int) -> _Partition:
+        partition = self._partitions.get(partition_id)
+        if partition is not None:
+            self._partitions.move_to_end(partition_id)
+            return partition
+
+        partition = _Partition(self._seed(partition_id))
+        self._partitions[partition_id] = partition
+        while len(self._partitions) > self._max_partitions:
+            self._partitions.popitem(last=False)
+            self.evictions += 1
+        return partition
+
+    def list_items(self, partition_id: int, scope: AccessScope) -> list[Item]:
+        if scope.kind == "none":
+            return []
+        with self._lock:
+            partition = self._partition(partition_id)
+            if scope.kind == "all":
+                return list(partition.by_id.values())
+            return list(partition.by_owner.get(scope.user_id, []))
+
+    def get_item(self, partition_id: int, item_id: int) -> Item | None:
+        with self._lock:
+            return self._partition(partition_id).by_id.get(item_id)
+
+    def update_item(
+        self, partition_id: int, item_id: int, fields: dict[str, Any]
+    ) -> Item | None:
+        with self._lock:
+            item = self._partition(partition_id).by_id.get(item_id)
+            if item is None:
+                return None
+            item.update(fields)
+            return item
+
+    def clear(self) -> None:
+        with self._lock:
+            self._partitions.clear()
+
+
+class SqlResourceStore:
+    def __init__(
+        self, db: Session, model: type[Base], columns: list[str], seed: SeedFn
+    ) -> None:
+        self._db = db
+        self._model = model
+        self._columns = columns
+        self._seed = seed
+
+    def _to_item(self, row: Any) -> Item:
+        return {column: getattr(row, column) for column in self._columns}
+
+    def _ensure_partition(self, partition_id: int) -> None:
+        model: Any = self._model
+        exists = self._db.execute(
+            select(model.id).where(model.partition_id == partition_id).limit(1)
+        ).first()
+        if exists:
+            return
+
+        try:
+            with self._db.begin_nested():
+                for item in self._seed(partition_id):
+                    self._db.add(model(partition_id=partition_id, **item))
+        except IntegrityError:
+            pass
+
+    def list_items(self, partition_id: int, scope: AccessScope) -> list[Item]:
+        if scope.kind == "none":
+            return []
+        self._ensure_partition(partition_id)
+        model: Any = self._model
+        query = select(model).where(
+            model.partition_id == partition_id, scope.where(model.owner_id)
+        )
+        rows = self._db.execute(query.order_by(model.id)).scalars()
+        return [self._to_item(row) for row in rows]
+
+    def get_item(self, partition_id: int, item_id: int) -> Item | None:
+        self._ensure_partition(partition_id)
+        row = self._db.get(self._model, (partition_id, item_id))
+        if row is None:
+            return None
+        return self._to_item(row)
+
+    def update_item(
+        self, partition_id: int, item_id: int, fields: dict[str, Any]
+    ) -> Item | None:
+        self._ensure_partition(partition_id)
+        row = self._db.get(self._model, (partition_id, item_id))
+        if row is None:
+            return None
+        for key, value in fields.items():
+            setattr(row, key, value)
+        self._db.flush()
+        return self._to_item(row)
@@ -0,0 +1,65 @@
+from typing import Any, Literal
+
+Action = Literal["read", "create", "update", "delete"]
+ScopeKind = Literal["all", "own", "none"]
+
+ACTIONS: tuple[Action, ...] = ("read", "create", "update", "delete")
+
+READ = 1
+READ_ALL = 2
+CREATE = 4
+UPDATE = 8
+UPDATE_ALL = 16
+DELETE = 32
+DELETE_ALL = 64
+
+RULE_FLAGS: dict[str, int] = {
+    "read_permission": READ,
+    "read_all_permission": READ_ALL,
+    "create_permission": CREATE,
+    "update_permission": UPDATE,
+    "update_all_permission": UPDATE_ALL,
+    "delete_permission": DELETE,
+    "delete_all_permission": DELETE_ALL,
+}
+
+OWN_BITS: dict[str, int] = {"read": READ, "update": UPDATE, "delete": DELETE}
+ALL_BITS: dict[str, int] = {
+    "read": READ_ALL,
+    "create": CREATE,
+    "update": UPDATE_ALL,
+    "delete": DELETE_ALL,
+}
+
+
+def rule_mask(rule: Any) -> int:
+    mask = 0
+    for column, bit in RULE_FLAGS.items():
+        if getattr(rule, column):
+            mask |= bit
+    return mask
+
+
+def mask_allows(mask: int, action: str, is_owner: bool) -> bool:
+    if mask & ALL_BITS.get(action, 0):
+        return True
+    return is_owner and bool(mask & OWN_BITS.get(action, 0))
+
+
+def mask_allows_all(mask: int, action: str) -> bool:
+    return action in OWN_BITS and bool(mask & ALL_BITS[action])
+
+
+def scope_bits(action: str, scope: str) -> int:
+    bits = ALL_BITS[action]
+    if scope == "own":
+        bits |= OWN_BITS.get(action, 0)
+    return bits
+
+
+def mask_scope(mask: int, action: str) -> ScopeKind:
+    if mask & ALL_BITS.get(action, 0):
+        return "all"
+    if mask & OWN_BITS.get(action, 0):
+        return "own"
+    return "none"
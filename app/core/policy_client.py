@@ -0,0 +1,194 @@
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Callable
+from pathlib import Path
+from typing import Protocol, Self
+
+import jwt
+
+from app.core.permissions import (
+    Action,
+    ScopeKind,
+    mask_allows,
+    mask_allows_all,
+    mask_scope,
+)
+from app.core.snapshot_format import PolicySnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotSource(Protocol):
+    def fetch(self, etag: str | None) -> tuple[str | None, bytes | None]: ...
+
+
+class RefreshTokenProvider:
+    def __init__(
+        self,
+        base_url: str,
+        refresh_token: str,
+        timeout: float = 5.0,
+        leeway_seconds: float = 30.0,
+    ) -> None:
+        self.url = base_url.rstrip("/") + "/auth/refresh"
+        self._refresh_token = refresh_token
+        self._timeout = timeout
+        self._leeway = leeway_seconds
+        self._access_token: str | None = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self) -> str:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({"refresh_token": self._refresh_token}).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self._timeout) as response:
+            tokens = json.loads(response.read())
+        claims = jwt.decode(tokens["access_token"], options={"verify_signature": False})
+        self._access_token = tokens["access_token"]
+        self._refresh_token = tokens["refresh_token"]
+        self._expires_at = float(claims["exp"])
+        return self._access_token
+
+    def __call__(self) -> str:
+        with self._lock:
+            if (
+                self._access_token is None
+                or time.time() + self._leeway >= self._expires_at
+            ):
+                return self.refresh()
+            return self._access_token
+
+
+class HttpSnapshotSource:
+    def __init__(
+        self, base_url: str, token: str | Callable[[], str], timeout: float = 5.0
+    ) -> None:
+        self.url = base_url.rstrip("/") + "/admin/policy/snapshot"
+        self._token = token
+        self._timeout = timeout
+
+    def fetch(self, etag: str | None) -> tuple[str | None, bytes | None]:
+        token = self._token if isinstance(self._token, str) else self._token()
+        request = urllib.request.Request(
+            self.url, headers={"Authorization": f"Bearer {token}"}
+        )
+        if etag is not None:
+            request.add_header("If-None-Match", etag)
+        try:
+            with urllib.request.urlopen(request, timeout=self._timeout) as response:
+                return response.headers.get("ETag"), response.read()
+        except urllib.error.HTTPError as exc:
+            if exc.code == 304:
+                return etag, None
+            raise
+
+
+class FileSnapshotSource:
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def fetch(self, etag: str | None) -> tuple[str | None, bytes | None]:
+        stat = os.stat(self.path)
+        current = f"{stat.st_ino}:{stat.st_mtime_ns}"
+        if current == etag:
+            return etag, None
+        return current, self.path.read_bytes()
+
+
+class PolicyClient:
+    def __init__(
+        self,
+        source: SnapshotSource,
+        refresh_interval_seconds: float = 5.0,
+        max_age_seconds: float | None = None,
+    ) -> None:
+        self.source = source
+        self._refresh_interval = refresh_interval_seconds
+        self._max_age = max_age_seconds
+        self._snapshot: PolicySnapshot | None = None
+        self._etag: str | None = None
+        self._fetched_at = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        with self._lock:
+            etag, data = self.source.fetch(self._etag)
+            if data is not None:
+                self._snapshot = PolicySnapshot.from_bytes(data)
+                self._etag = etag
+            self._fetched_at = time.monotonic()
+            return data is not None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._refresh_interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("failed to refresh policy snapshot")
+
+    def start(self) -> Self:
+        if self._snapshot is None:
+            self.refresh()
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @property
+    def version(self) -> int | None:
+        return None if self._snapshot is None else self._snapshot.version
+
+    @property
+    def snapshot(self) -> PolicySnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise RuntimeError("policy snapshot is not loaded")
+        if (
+            self._max_age is not None
+            and time.monotonic() - self._fetched_at > self._max_age
+        ):
+            raise RuntimeError("policy snapshot is stale")
+        return snapshot
+
+    def mask(self, user_id: int, resource: str) -> int:
+        return self.snapshot.mask(user_id, resource)
+
+    def has_permission(
+        self,
+        user_id: int,
+        resource: str,
+        action: Action,
+        owner_id: int | None = None,
+    ) -> bool:
+        is_owner = owner_id is not None and user_id == owner_id
+        return mask_allows(self.mask(user_id, resource), action, is_owner)
+
+    def has_all_permission(self, user_id: int, resource: str, action: Action) -> bool:
+        return mask_allows_all(self.mask(user_id, resource), action)
+
+    def access_scope(self, user_id: int, resource: str, action: Action) -> ScopeKind:
+        return mask_scope(self.mask(user_id, resource), action)
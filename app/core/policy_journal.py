@@ -0,0 +1,108 @@
+import asyncio
+import threading
+from functools import lru_cache
+from typing import Any, Literal
+
+from sqlalchemy import Connection, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.invalidation import InvalidationEvent
+from app.core.policy_version import bump_policy_version
+from app.models.policy_change import PolicyChange
+
+PolicyEntity = Literal["role", "element", "rule", "user_role"]
+PolicyOp = Literal["upsert", "delete"]
+
+
+def record_policy_change(
+    db: Session | Connection,
+    entity: PolicyEntity,
+    op: PolicyOp,
+    payload: dict[str, Any],
+    actor_id: int | None = None,
+) -> int:
+    seq = bump_policy_version(db)
+    db.execute(
+        insert(PolicyChange).values(
+            seq=seq, entity=entity, op=op, payload=payload, actor_id=actor_id
+        )
+    )
+    return seq
+
+
+def read_policy_changes(
+    db: Session | Connection, since: int, limit: int
+) -> list[dict[str, Any]]:
+    rows = db.execute(
+        select(
+            PolicyChange.seq,
+            PolicyChange.entity,
+            PolicyChange.op,
+            PolicyChange.payload,
+        )
+        .where(PolicyChange.seq > since)
+        .order_by(PolicyChange.seq)
+        .limit(limit)
+    )
+    return [row._asdict() for row in rows]
+
+
+def journal_covers(db: Session | Connection, since: int, version: int) -> bool:
+    if since > version:
+        return False
+    if since == version:
+        return True
+    recorded = db.execute(
+        select(func.count()).where(
+            PolicyChange.seq > since, PolicyChange.seq <= version
+        )
+    ).scalar_one()
+    return recorded == version - since
+
+
+def _wake(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class PolicyChangeNotifier:
+    def __init__(self) -> None:
+        self._version = 0
+        self._lock = threading.Lock()
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = []
+
+    def handle_event(self, event: InvalidationEvent) -> None:
+        if event.policy_version is None:
+            return
+        with self._lock:
+            if event.policy_version <= self._version:
+                return
+            self._version = event.policy_version
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                pass
+
+    async def wait(self, since: int, timeout: float) -> bool:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+        with self._lock:
+            if self._version > since:
+                return True
+            self._waiters.append((loop, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+
+
+@lru_cache(maxsize=1)
+def get_policy_change_notifier() -> PolicyChangeNotifier:
+    return PolicyChangeNotifier()
@@ -0,0 +1,213 @@
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.permissions import ACTIONS, ALL_BITS, OWN_BITS, rule_mask
+from app.models.access_role_rule import AccessRoleRule
+from app.models.business_element import BusinessElement
+from app.models.role import Role
+from app.models.user import User
+from app.models.user_role import UserRole
+
+
+def _role_masks(
+    db: Session, role_index: dict[int, int], element_index: dict[int, int]
+) -> np.ndarray:
+    masks = np.zeros((len(role_index), len(element_index)), dtype=np.uint8)
+    rules = db.execute(
+        select(
+            AccessRoleRule.role_id,
+            AccessRoleRule.element_id,
+            AccessRoleRule.read_permission,
+            AccessRoleRule.read_all_permission,
+            AccessRoleRule.create_permission,
+            AccessRoleRule.update_permission,
+            AccessRoleRule.update_all_permission,
+            AccessRoleRule.delete_permission,
+            AccessRoleRule.delete_all_permission,
+        )
+    )
+    for rule in rules:
+        masks[role_index[rule.role_id], element_index[rule.element_id]] = rule_mask(
+            rule
+        )
+    return masks
+
+
+def _links(db: Session, role_index: dict[int, int]) -> tuple[np.ndarray, np.ndarray]:
+    rows = db.execute(select(UserRole.user_id, UserRole.role_id)).all()
+    users = np.fromiter(
+        (user_id for user_id, _ in rows), dtype=np.int64, count=len(rows)
+    )
+    roles = np.fromiter(
+        (role_index[role_id] for _, role_id in rows), dtype=np.int64, count=len(rows)
+    )
+    return users, roles
+
+
+def _link_keys(users: np.ndarray, roles: np.ndarray) -> np.ndarray:
+    return (users << 32) | roles
+
+
+def _effective(
+    users: np.ndarray, roles: np.ndarray, role_masks: np.ndarray, user_count: int
+) -> np.ndarray:
+    effective = np.zeros((user_count, role_masks.shape[1]), dtype=np.uint8)
+    if len(users) == 0 or role_masks.shape[1] == 0:
+        return effective
+    order = np.argsort(users, kind="stable")
+    users, roles = users[order], roles[order]
+    starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+    effective[users[starts]] = np.bitwise_or.reduceat(role_masks[roles], starts, axis=0)
+    return effective
+
+
+def _scopes(masks: np.ndarray, action: str) -> np.ndarray:
+    scopes = np.where(masks & OWN_BITS.get(action, 0), 1, 0)
+    return np.where(masks & ALL_BITS[action], 2, scopes)
+
+
+def simulate_policy_change(
+    db: Session,
+    rules: Sequence[Any],
+    add_user_roles: Sequence[tuple[int, int]],
+    remove_user_roles: Sequence[tuple[int, int]],
+    sample_size: int,
+) -> dict[str, Any]:
+    elements = db.execute(
+        select(BusinessElement.id, BusinessElement.code).order_by(BusinessElement.id)
+    ).all()
+    codes = [code for _, code in elements]
+    element_index = {element_id: i for i, (element_id, _) in enumerate(elements)}
+    role_ids = list(db.execute(select(Role.id).order_by(Role.id)).scalars())
+    role_index = {role_id: i for i, role_id in enumerate(role_ids)}
+
+    for rule in rules:
+        if rule.role_id not in role_index:
+            raise LookupError("role not found")
+        if rule.element_id not in element_index:
+            raise LookupError("element not found")
+    for _, role_id in [*add_user_roles, *remove_user_roles]:
+        if role_id not in role_index:
+            raise LookupError("role not found")
+    added_users = {user_id for user_id, _ in add_user_roles}
+    if added_users:
+        found = set(
+            db.execute(select(User.id).where(User.id.in_(added_users))).scalars()
+        )
+        if found != added_users:
+            raise LookupError("user not found")
+
+    before_masks = _role_masks(db, role_index, element_index)
+    after_masks = before_masks.copy()
+    changed_elements = set()
+    for rule in rules:
+        element = element_index[rule.element_id]
+        after_masks[role_index[rule.role_id], element] = rule_mask(rule)
+        changed_elements.add(element)
+
+    before_users, before_roles = _links(db, role_index)
+    after_users, after_roles = before_users, before_roles
+    if remove_user_roles:
+        removed = _link_keys(
+            np.array([user_id for user_id, _ in remove_user_roles], dtype=np.int64),
+            np.array([role_index[r] for _, r in remove_user_roles], dtype=np.int64),
+        )
+        keep = ~np.isin(_link_keys(after_users, after_roles), removed)
+        after_users, after_roles = after_users[keep], after_roles[keep]
+    if add_user_roles:
+        keys = np.unique(
+            np.concatenate(
+                [
+                    _link_keys(after_users, after_roles),
+                    _link_keys(
+                        np.array([u for u, _ in add_user_roles], dtype=np.int64),
+                        np.array(
+                            [role_index[r] for _, r in add_user_roles], dtype=np.int64
+                        ),
+                    ),
+                ]
+            )
+        )
+        after_users, after_roles = keys >> 32, keys & 0xFFFFFFFF
+
+    user_ids = np.unique(np.concatenate([before_users, after_users]))
+    before_idx = np.searchsorted(user_ids, before_users)
+    after_idx = np.searchsorted(user_ids, after_users)
+
+    relinked = np.unique(
+        np.array(
+            [user_id for user_id, _ in [*add_user_roles, *remove_user_roles]],
+            dtype=np.int64,
+        )
+    )
+    relinked_idx = np.searchsorted(user_ids, relinked[np.isin(relinked, user_ids)])
+
+    blocks = []
+    columns = np.array(sorted(changed_elements), dtype=np.int64)
+    if len(columns):
+        blocks.append(
+            (
+                np.arange(len(user_ids)),
+                columns,
+                _effective(
+                    before_idx, before_roles, before_masks[:, columns], len(user_ids)
+                ),
+                _effective(
+                    after_idx, after_roles, after_masks[:, columns], len(user_ids)
+                ),
+            )
+        )
+    if len(relinked_idx):
+        rest = np.setdiff1d(np.arange(len(elements)), columns)
+        row_of = np.full(len(user_ids), -1, dtype=np.int64)
+        row_of[relinked_idx] = np.arange(len(relinked_idx))
+        in_before = row_of[before_idx] >= 0
+        in_after = row_of[after_idx] >= 0
+        blocks.append(
+            (
+                relinked_idx,
+                rest,
+                _effective(
+                    row_of[before_idx][in_before],
+                    before_roles[in_before],
+                    before_masks[:, rest],
+                    len(relinked_idx),
+                ),
+                _effective(
+                    row_of[after_idx][in_after],
+                    after_roles[in_after],
+                    after_masks[:, rest],
+                    len(relinked_idx),
+                ),
+            )
+        )
+
+    changes = []
+    for rows, block_columns, before, after in blocks:
+        for position, element in enumerate(block_columns):
+            for action in ACTIONS:
+                was = _scopes(before[:, position], action)
+                now = _scopes(after[:, position], action)
+                gained = np.flatnonzero(now > was)
+                lost = np.flatnonzero(now < was)
+                if not len(gained) and not len(lost):
+                    continue
+                changes.append(
+                    {
+                        "resource": codes[element],
+                        "action": action,
+                        "gained": len(gained),
+                        "lost": len(lost),
+                        "gained_sample": user_ids[rows[gained[:sample_size]]].tolist(),
+                        "lost_sample": user_ids[rows[lost[:sample_size]]].tolist(),
+                    }
+                )
+
+    changes.sort(
+        key=lambda change: (change["resource"], ACTIONS.index(change["action"]))
+    )
+    return {"users": len(user_ids), "changes": changes}
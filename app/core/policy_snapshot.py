@@ -0,0 +1,208 @@
+import argparse
+import os
+import sys
+import threading
+import time
+from collections.abc import Sequence
+from functools import lru_cache
+from pathlib import Path
+
+from sqlalchemy import Connection, select
+from sqlalchemy.orm import Session
+
+from app.core.invalidation import InvalidationEvent
+from app.core.permissions import rule_mask
+from app.core.policy_version import get_policy_version
+from app.core.settings import get_settings
+from app.core.snapshot_format import (
+    PolicySnapshot,
+    pack_policy_snapshot,
+    read_snapshot_version,
+)
+from app.db.session import get_sessionmaker
+from app.models.access_role_rule import AccessRoleRule
+from app.models.business_element import BusinessElement
+from app.models.role import Role
+from app.models.user_role import UserRole
+
+
+def build_policy_snapshot(db: Session | Connection) -> tuple[int, bytes]:
+    version = get_policy_version(db)
+
+    codes = list(
+        db.execute(
+            select(BusinessElement.id, BusinessElement.code).order_by(
+                BusinessElement.id
+            )
+        )
+    )
+    element_index = {element_id: i for i, (element_id, _) in enumerate(codes)}
+    role_ids = list(db.execute(select(Role.id).order_by(Role.id)).scalars())
+    role_index = {role_id: i for i, role_id in enumerate(role_ids)}
+
+    masks = bytearray(len(role_ids) * len(codes))
+    rules = db.execute(
+        select(
+            AccessRoleRule.role_id,
+            AccessRoleRule.element_id,
+            AccessRoleRule.read_permission,
+            AccessRoleRule.read_all_permission,
+            AccessRoleRule.create_permission,
+            AccessRoleRule.update_permission,
+            AccessRoleRule.update_all_permission,
+            AccessRoleRule.delete_permission,
+            AccessRoleRule.delete_all_permission,
+        )
+    )
+    for rule in rules:
+        role = role_index.get(rule.role_id)
+        element = element_index.get(rule.element_id)
+        if role is not None and element is not None:
+            masks[role * len(codes) + element] |= rule_mask(rule)
+
+    links = db.execute(
+        select(UserRole.user_id, UserRole.role_id).order_by(
+            UserRole.user_id, UserRole.role_id
+        )
+    ).all()
+    user_slots = max((user_id for user_id, _ in links), default=-1) + 1
+    indptr = [0] * (user_slots + 1)
+    indices = []
+    for user_id, role_id in links:
+        role = role_index.get(role_id)
+        if role is None:
+            continue
+        indices.append(role)
+        indptr[user_id + 1] += 1
+    for i in range(user_slots):
+        indptr[i + 1] += indptr[i]
+
+    return version, pack_policy_snapshot(
+        version, [code for _, code in codes], len(role_ids), masks, indptr, indices
+    )
+
+
+def write_policy_snapshot(db: Session | Connection, path: str | Path) -> int:
+    path = Path(path)
+    version, data = build_policy_snapshot(db)
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return version
+
+
+def check_snapshot_file(path: str | Path, stat: os.stat_result) -> None:
+    if hasattr(os, "geteuid") and stat.st_uid != os.geteuid():
+        raise RuntimeError(f"policy snapshot {path} is not owned by the service user")
+    if stat.st_mode & 0o022:
+        raise RuntimeError(f"policy snapshot {path} is group- or world-writable")
+
+
+class PolicySnapshotStore:
+    def __init__(self, path: str | Path, check_interval_seconds: float) -> None:
+        self.path = Path(path)
+        self._check_interval = check_interval_seconds
+        self._snapshot: PolicySnapshot | None = None
+        self._file_id: tuple[int, int] | None = None
+        self._checked_at = 0.0
+        self._required_version = 0
+        self._stale = True
+        self._lock = threading.Lock()
+        self._required_lock = threading.Lock()
+
+    def _load(self) -> PolicySnapshot | None:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        file_id = (stat.st_ino, stat.st_mtime_ns)
+        if file_id != self._file_id or self._snapshot is None:
+            check_snapshot_file(self.path, stat)
+            self._snapshot = PolicySnapshot(self.path)
+            self._file_id = file_id
+        self._checked_at = time.monotonic()
+        return self._snapshot
+
+    def _refresh(self, db: Session | Connection, min_version: int) -> None:
+        for _ in range(3):
+            if read_snapshot_version(self.path) >= min_version:
+                return
+            write_policy_snapshot(db, self.path)
+
+    def snapshot(self, db: Session | Connection) -> PolicySnapshot:
+        current = self._snapshot
+        if (
+            current is not None
+            and not self._stale
+            and current.version >= self._required_version
+            and time.monotonic() - self._checked_at < self._check_interval
+        ):
+            return current
+
+        with self._lock:
+            if self._stale:
+                self._stale = False
+                self.require(get_policy_version(db))
+            self._refresh(db, self._required_version)
+            loaded = self._load()
+            if loaded is None:
+                raise RuntimeError(f"policy snapshot {self.path} is missing")
+            return loaded
+
+    def require(self, min_version: int | None) -> None:
+        with self._required_lock:
+            if min_version is None:
+                self._stale = True
+            elif min_version > self._required_version:
+                self._required_version = min_version
+
+    def handle_event(self, event: InvalidationEvent) -> None:
+        if event.kind in ("role_changed", "user_roles_changed", "flush_all"):
+            self.require(event.policy_version)
+
+
+@lru_cache(maxsize=1)
+def get_policy_snapshot_store() -> PolicySnapshotStore | None:
+    settings = get_settings()
+    if settings.rbac_evaluator != "snapshot":
+        return None
+    return PolicySnapshotStore(
+        settings.policy_snapshot_path, settings.policy_snapshot_check_seconds
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Write the shared policy snapshot")
+    parser.add_argument("--path", default=None, help="'-' writes to stdout")
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="load an existing snapshot, check it and print its contents",
+    )
+    args = parser.parse_args(argv)
+
+    path = args.path or get_settings().policy_snapshot_path
+    if args.verify:
+        started = time.perf_counter()
+        snapshot = PolicySnapshot(path)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(
+            f"Policy snapshot v{snapshot.version}: {len(snapshot.resources)} elements, "
+            f"{snapshot.role_count} roles, {snapshot.user_slots} user slots, "
+            f"{snapshot.size} bytes, loaded in {elapsed_ms:.2f} ms"
+        )
+        return
+
+    with get_sessionmaker()() as db:
+        if path == "-":
+            sys.stdout.buffer.write(build_policy_snapshot(db)[1])
+            return
+        version = write_policy_snapshot(db, path)
+    print(f"Policy snapshot v{version} written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+from sqlalchemy import Connection, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.policy_version import PolicyVersion
+
+POLICY_VERSION_ROW_ID = 1
+
+
+def get_policy_version(db: Session | Connection) -> int:
+    version = db.execute(
+        select(PolicyVersion.version).where(PolicyVersion.id == POLICY_VERSION_ROW_ID)
+    ).scalar()
+    return int(version or 0)
+
+
+def bump_policy_version(db: Session | Connection) -> int:
+    stmt = (
+        update(PolicyVersion)
+        .where(PolicyVersion.id == POLICY_VERSION_ROW_ID)
+        .values(version=PolicyVersion.version + 1)
+        .returning(PolicyVersion.version)
+    )
+    version = db.execute(stmt).scalar()
+    if version is not None:
+        return int(version)
+
+    try:
+        with db.begin_nested():
+            db.execute(
+                insert(PolicyVersion).values(id=POLICY_VERSION_ROW_ID, version=1)
+            )
+        return 1
+    except IntegrityError:
+        return int(db.execute(stmt).scalar_one())
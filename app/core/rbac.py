@@ -1,16 +1,61 @@
-from typing import Literal
+from dataclasses import dataclass
 
 from fastapi import Depends, HTTPException, status
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    and_,
+    exists,
+    false,
+    func,
+    or_,
+    select,
+    true,
+)
 from sqlalchemy.orm import Session
 
+from app.core.audit import audit_decision
 from app.core.auth_jwt import get_current_user
+from app.core.effective_permissions import (
+    aggregated_mask,
+    materialized_permission_mask,
+    materialized_permissions_enabled,
+)
+from app.core.permissions import (
+    RULE_FLAGS,
+    Action,
+    ScopeKind,
+    mask_allows,
+    mask_allows_all,
+    mask_scope,
+    rule_mask,
+    scope_bits,
+)
+from app.core.policy_snapshot import get_policy_snapshot_store
 from app.db.session import get_db
 from app.models.access_role_rule import AccessRoleRule
 from app.models.business_element import BusinessElement
+from app.models.effective_permission import EffectivePermission
 from app.models.user import User
 from app.models.user_role import UserRole
 
-Action = Literal["read", "create", "update", "delete"]
+
+@dataclass(frozen=True)
+class AccessScope:
+    kind: ScopeKind
+    user_id: int
+
+    def allows(self, owner_id: int) -> bool:
+        if self.kind == "all":
+            return True
+        return self.kind == "own" and owner_id == self.user_id
+
+    def where(self, owner_column: ColumnElement[int]) -> ColumnElement[bool]:
+        if self.kind == "all":
+            return true()
+        if self.kind == "own":
+            return owner_column == self.user_id
+        return false()
 
 
 def _raise_forbidden() -> None:
@@ -20,86 +65,162 @@ def _raise_forbidden() -> None:
     )
 
 
-def has_permission(
-    db: Session, user: User, resource: str, action: Action, owner_id: int | None = None
-) -> bool:
-    element = db.query(BusinessElement).filter(BusinessElement.code == resource).first()
-    if not element:
-        return False
-
-    roles_id_rows = db.query(UserRole).filter(UserRole.user_id == user.id).all()
-    roles_id = [row.role_id for row in roles_id_rows]
-    if not roles_id:
-        return False
-
-    rules = (
-        db.query(AccessRoleRule)
-        .filter(
-            AccessRoleRule.role_id.in_(roles_id),
-            AccessRoleRule.element_id == element.id,
+def get_permission_mask(db: Session, user_id: int, resource: str) -> int:
+    snapshot_store = get_policy_snapshot_store()
+    if snapshot_store is not None:
+        return snapshot_store.snapshot(db).mask(user_id, resource)
+    if materialized_permissions_enabled():
+        return materialized_permission_mask(db, user_id, resource)
+    return query_permission_mask(db, user_id, resource)
+
+
+def permission_rules_query(user_id: int, resource: str) -> Select:
+    return (
+        select(
+            AccessRoleRule.read_permission,
+            AccessRoleRule.read_all_permission,
+            AccessRoleRule.create_permission,
+            AccessRoleRule.update_permission,
+            AccessRoleRule.update_all_permission,
+            AccessRoleRule.delete_permission,
+            AccessRoleRule.delete_all_permission,
         )
-        .all()
+        .join(BusinessElement, BusinessElement.id == AccessRoleRule.element_id)
+        .join(UserRole, UserRole.role_id == AccessRoleRule.role_id)
+        .where(UserRole.user_id == user_id, BusinessElement.code == resource)
     )
-    if not rules:
-        return False
 
-    is_owner = owner_id is not None and user.id == owner_id
 
+def query_permission_mask(db: Session, user_id: int, resource: str) -> int:
+    rules = db.execute(permission_rules_query(user_id, resource)).all()
+
+    mask = 0
     for rule in rules:
-        if action == "create" and rule.create_permission:
-            return True
+        mask |= rule_mask(rule)
+    return mask
+
+
+def permission_map_query(user_id: int) -> Select:
+    if materialized_permissions_enabled():
+        return (
+            select(BusinessElement.code, func.coalesce(EffectivePermission.mask, 0))
+            .outerjoin(
+                EffectivePermission,
+                and_(
+                    EffectivePermission.element_id == BusinessElement.id,
+                    EffectivePermission.user_id == user_id,
+                ),
+            )
+            .order_by(BusinessElement.code)
+        )
+
+    masks = (
+        select(AccessRoleRule.element_id, aggregated_mask().label("mask"))
+        .join(UserRole, UserRole.role_id == AccessRoleRule.role_id)
+        .where(UserRole.user_id == user_id)
+        .group_by(AccessRoleRule.element_id)
+        .subquery()
+    )
+    return (
+        select(BusinessElement.code, func.coalesce(masks.c.mask, 0))
+        .outerjoin(masks, masks.c.element_id == BusinessElement.id)
+        .order_by(BusinessElement.code)
+    )
 
-        if action == "read":
-            if rule.read_all_permission:
-                return True
-            if is_owner and rule.read_permission:
-                return True
 
-        if action == "delete":
-            if rule.delete_all_permission:
-                return True
-            if is_owner and rule.delete_permission:
-                return True
+def get_permission_map(db: Session, user_id: int) -> dict[str, int]:
+    snapshot_store = get_policy_snapshot_store()
+    if snapshot_store is not None:
+        snapshot = snapshot_store.snapshot(db)
+        return {
+            code: snapshot.mask(user_id, code) for code in sorted(snapshot.resources)
+        }
+    return {code: int(mask) for code, mask in db.execute(permission_map_query(user_id))}
+
+
+def _element_rules_granting(element_id: int, bits: int) -> ColumnElement[bool]:
+    return and_(
+        AccessRoleRule.element_id == element_id,
+        or_(
+            *(
+                getattr(AccessRoleRule, column)
+                for column, bit in RULE_FLAGS.items()
+                if bit & bits
+            )
+        ),
+    )
 
-        if action == "update":
-            if rule.update_all_permission:
-                return True
-            if is_owner and rule.update_permission:
-                return True
 
-    return False
+def _effective_permissions_granting(element_id: int, bits: int) -> ColumnElement[bool]:
+    return and_(
+        EffectivePermission.element_id == element_id,
+        EffectivePermission.mask.op("&")(bits) != 0,
+    )
 
 
-def has_all_permission(db: Session, user: User, resource: str, action: Action) -> bool:
-    element = db.query(BusinessElement).filter(BusinessElement.code == resource).first()
-    if not element:
-        return False
-
-    roles_id_rows = db.query(UserRole).filter(UserRole.user_id == user.id).all()
-    roles_id = [row.role_id for row in roles_id_rows]
-    if not roles_id:
-        return False
-
-    rules = (
-        db.query(AccessRoleRule)
-        .filter(
-            AccessRoleRule.role_id.in_(roles_id),
-            AccessRoleRule.element_id == element.id,
+def permitted_users_query(
+    element_id: int, action: Action, scope: ScopeKind, after: int, limit: int
+) -> Select:
+    bits = scope_bits(action, scope)
+    if materialized_permissions_enabled():
+        granted = exists().where(
+            EffectivePermission.user_id == User.id,
+            _effective_permissions_granting(element_id, bits),
         )
-        .all()
+    else:
+        granted = exists().where(
+            UserRole.user_id == User.id,
+            AccessRoleRule.role_id == UserRole.role_id,
+            _element_rules_granting(element_id, bits),
+        )
+    return (
+        select(User.id, User.email, User.is_active)
+        .where(User.id > after, granted)
+        .order_by(User.id)
+        .limit(limit)
     )
-    if not rules:
-        return False
 
-    for rule in rules:
-        if action == "read" and rule.read_all_permission:
-            return True
-        if action == "update" and rule.update_all_permission:
-            return True
-        if action == "delete" and rule.delete_all_permission:
-            return True
 
-    return False
+def permitted_users_count_query(
+    element_id: int, action: Action, scope: ScopeKind
+) -> Select:
+    bits = scope_bits(action, scope)
+    if materialized_permissions_enabled():
+        return (
+            select(func.count())
+            .select_from(EffectivePermission)
+            .where(_effective_permissions_granting(element_id, bits))
+        )
+    return (
+        select(func.count(UserRole.user_id.distinct()))
+        .join(AccessRoleRule, AccessRoleRule.role_id == UserRole.role_id)
+        .where(_element_rules_granting(element_id, bits))
+    )
+
+
+def has_permission(
+    db: Session, user: User, resource: str, action: Action, owner_id: int | None = None
+) -> bool:
+    mask = get_permission_mask(db, user.id, resource)
+    is_owner = owner_id is not None and user.id == owner_id
+    allowed = mask_allows(mask, action, is_owner)
+    audit_decision(user.id, resource, action, allowed, owner_id)
+    return allowed
+
+
+def has_all_permission(db: Session, user: User, resource: str, action: Action) -> bool:
+    allowed = mask_allows_all(get_permission_mask(db, user.id, resource), action)
+    audit_decision(user.id, resource, f"{action}_all", allowed)
+    return allowed
+
+
+def get_access_scope(
+    db: Session, user: User, resource: str, action: Action
+) -> AccessScope:
+    mask = get_permission_mask(db, user.id, resource)
+    kind = mask_scope(mask, action)
+    audit_decision(user.id, resource, action, kind != "none")
+    return AccessScope(kind=kind, user_id=user.id)
 
 
 def require_permission(resource: str, action: Action):
@@ -0,0 +1,81 @@
+import hashlib
+import secrets
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.settings import get_settings
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+
+def hash_refresh_token(raw: str) -> str:
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def issue_refresh_token(
+    db: Session, user_id: int, family_id: str | None = None
+) -> tuple[str, RefreshToken]:
+    settings = get_settings()
+    raw = secrets.token_urlsafe(32)
+    now = datetime.now(UTC)
+
+    token = RefreshToken(
+        token_hash=hash_refresh_token(raw),
+        user_id=user_id,
+        family_id=family_id or str(uuid.uuid4()),
+        expires_at=now + timedelta(days=settings.jwt_refresh_ttl_days),
+    )
+    db.add(token)
+    db.flush()
+    return raw, token
+
+
+def revoke_refresh_family(db: Session, family_id: str) -> None:
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(UTC))
+    )
+
+
+def revoke_user_refresh_tokens(db: Session, user_id: int) -> None:
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(UTC))
+    )
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value
+
+
+def rotate_refresh_token(db: Session, raw: str) -> tuple[str, RefreshToken]:
+    token = db.execute(
+        select(RefreshToken)
+        .where(RefreshToken.token_hash == hash_refresh_token(raw))
+        .with_for_update()
+    ).scalar_one_or_none()
+    if token is None:
+        raise ValueError("invalid refresh token")
+
+    if token.revoked_at is not None:
+        revoke_refresh_family(db, token.family_id)
+        db.commit()
+        raise ValueError("refresh token reused")
+
+    now = datetime.now(UTC)
+    if _as_utc(token.expires_at) <= now:
+        raise ValueError("refresh token expired")
+
+    user = db.get(User, token.user_id)
+    if not user or not user.is_active:
+        raise ValueError("invalid refresh token")
+
+    token.revoked_at = now
+    return issue_refresh_token(db, token.user_id, family_id=token.family_id)
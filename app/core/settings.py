@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,10 +14,83 @@ class Settings(BaseSettings):
     app_env: str = Field(default="test", alias="APP_ENV")
 
     database_url: str | None = Field(default=None, alias="DATABASE_URL")
+    db_auto_migrate: bool = Field(default=True, alias="DB_AUTO_MIGRATE")
 
     jwt_secret: str = Field(default="something_token", alias="JWT_SECRET")
     jwt_access_ttl_minutes: int = Field(default=30, alias="JWT_ACCESS_TTL_MINUTES")
+    jwt_refresh_ttl_days: int = Field(default=30, alias="JWT_REFRESH_TTL_DAYS")
+    jwt_revocation_check: bool = Field(default=True, alias="JWT_REVOCATION_CHECK")
+    login_throttle_enabled: bool = Field(default=True, alias="LOGIN_THROTTLE_ENABLED")
+    login_throttle_backend: str = Field(
+        default="memory", alias="LOGIN_THROTTLE_BACKEND"
+    )
+    login_throttle_max_keys: int = Field(
+        default=100_000, alias="LOGIN_THROTTLE_MAX_KEYS"
+    )
+    login_account_rate_per_minute: float = Field(
+        default=5, alias="LOGIN_ACCOUNT_RATE_PER_MINUTE"
+    )
+    login_account_burst: float = Field(default=10, alias="LOGIN_ACCOUNT_BURST")
+    login_client_rate_per_minute: float = Field(
+        default=60, alias="LOGIN_CLIENT_RATE_PER_MINUTE"
+    )
+    login_client_burst: float = Field(default=100, alias="LOGIN_CLIENT_BURST")
+    trusted_proxies: str = Field(default="", alias="TRUSTED_PROXIES")
+
+    jwt_algorithm: str = Field(default="HS256", alias="JWT_ALGORITHM")
+    jwt_keys_dir: str | None = Field(default=None, alias="JWT_KEYS_DIR")
+    jwt_active_kid: str | None = Field(default=None, alias="JWT_ACTIVE_KID")
+    jwks_max_age_seconds: int = Field(default=300, alias="JWKS_MAX_AGE_SECONDS")
+    introspection_max_age_seconds: int = Field(
+        default=30, alias="INTROSPECTION_MAX_AGE_SECONDS"
+    )
+
+    token_cache_size: int = Field(default=10_000, alias="TOKEN_CACHE_SIZE")
+    token_cache_ttl_seconds: int = Field(default=300, alias="TOKEN_CACHE_TTL_SECONDS")
+
+    rbac_evaluator: str = Field(default="db", alias="RBAC_EVALUATOR")
+    policy_snapshot_path: str = Field(
+        default="var/rbac/policy.snapshot", alias="POLICY_SNAPSHOT_PATH"
+    )
+    policy_snapshot_check_seconds: float = Field(
+        default=1.0, alias="POLICY_SNAPSHOT_CHECK_SECONDS"
+    )
+
+    policy_changes_max_wait_seconds: float = Field(
+        default=30.0, alias="POLICY_CHANGES_MAX_WAIT_SECONDS"
+    )
+    policy_changes_poll_seconds: float = Field(
+        default=1.0, alias="POLICY_CHANGES_POLL_SECONDS"
+    )
+
+    invalidation_backend: str = Field(default="memory", alias="INVALIDATION_BACKEND")
+    invalidation_socket_dir: str = Field(
+        default="var/rbac/invalidation", alias="INVALIDATION_SOCKET_DIR"
+    )
+    invalidation_channel: str = Field(
+        default="rbac_invalidation", alias="INVALIDATION_CHANNEL"
+    )
+
+    audit_backend: str = Field(default="off", alias="AUDIT_BACKEND")
+    audit_ndjson_dir: str = Field(default="/tmp/rbac-audit", alias="AUDIT_NDJSON_DIR")
+    audit_ndjson_max_bytes: int = Field(
+        default=64 * 1024 * 1024, alias="AUDIT_NDJSON_MAX_BYTES"
+    )
+    audit_queue_size: int = Field(default=10_000, alias="AUDIT_QUEUE_SIZE")
+    audit_batch_size: int = Field(default=500, alias="AUDIT_BATCH_SIZE")
+    audit_flush_interval_seconds: float = Field(
+        default=1.0, alias="AUDIT_FLUSH_INTERVAL_SECONDS"
+    )
+    audit_allow_sample_rate: float = Field(
+        default=0.01, alias="AUDIT_ALLOW_SAMPLE_RATE"
+    )
+
+    mock_store_backend: str = Field(default="memory", alias="MOCK_STORE_BACKEND")
+    mock_store_max_partitions: int = Field(
+        default=10_000, alias="MOCK_STORE_MAX_PARTITIONS"
+    )
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     return Settings()
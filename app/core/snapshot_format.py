@@ -0,0 +1,144 @@
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+
+MAGIC = b"RBACSNP2"
+_HEADER = struct.Struct("<8sQIIII")
+_FOOTER = struct.Struct("<I")
+_NATIVE_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _pad(buffer: bytearray) -> None:
+    buffer.extend(b"\0" * (-len(buffer) % 4))
+
+
+def _check_platform() -> None:
+    if array("I").itemsize != 4:
+        raise RuntimeError("policy snapshots need a 4-byte unsigned int array type")
+
+
+def _u32(values: Sequence[int]) -> bytes:
+    data = array("I", values)
+    if not _NATIVE_LITTLE_ENDIAN:
+        data.byteswap()
+    return data.tobytes()
+
+
+def _u32_view(view: memoryview) -> Sequence[int]:
+    if _NATIVE_LITTLE_ENDIAN:
+        return view.cast("I")
+    data = array("I")
+    data.frombytes(view)
+    data.byteswap()
+    return data
+
+
+def pack_policy_snapshot(
+    version: int,
+    codes: Sequence[str],
+    role_count: int,
+    masks: bytes | bytearray,
+    indptr: Sequence[int],
+    indices: Sequence[int],
+) -> bytes:
+    _check_platform()
+    encoded = [code.encode("utf-8") for code in codes]
+    offsets = [0]
+    for code in encoded:
+        offsets.append(offsets[-1] + len(code))
+
+    data = bytearray(
+        _HEADER.pack(
+            MAGIC, version, len(codes), role_count, len(indptr) - 1, len(indices)
+        )
+    )
+    data += _u32(offsets)
+    data += b"".join(encoded)
+    _pad(data)
+    data += masks
+    _pad(data)
+    data += _u32(indptr)
+    data += _u32(indices)
+    data += _FOOTER.pack(zlib.crc32(data))
+    return bytes(data)
+
+
+def read_snapshot_version(path: str | Path) -> int:
+    try:
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+    except FileNotFoundError:
+        return -1
+    if len(header) < _HEADER.size or header[:8] != MAGIC:
+        return -1
+    return _HEADER.unpack(header)[1]
+
+
+class PolicySnapshot:
+    def __init__(self, path: str | Path) -> None:
+        with open(path, "rb") as f:
+            self._parse(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), str(path))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "PolicySnapshot":
+        snapshot = cls.__new__(cls)
+        snapshot._parse(data, "buffer")
+        return snapshot
+
+    def _parse(self, buffer: mmap.mmap | bytes, source: str) -> None:
+        _check_platform()
+        self._buffer = buffer
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size + _FOOTER.size:
+            raise ValueError(f"{source} is not a policy snapshot")
+        magic, version, elements, roles, user_slots, links = _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{source} is not a policy snapshot")
+        (checksum,) = _FOOTER.unpack_from(view, len(view) - _FOOTER.size)
+        if zlib.crc32(view[: -_FOOTER.size]) != checksum:
+            raise ValueError(f"{source} is corrupted: checksum mismatch")
+        self.version = version
+        self.size = len(view)
+
+        offset = _HEADER.size
+        code_offsets = _u32_view(view[offset : offset + (elements + 1) * 4])
+        offset += (elements + 1) * 4
+        blob = bytes(view[offset : offset + code_offsets[-1]])
+        offset += code_offsets[-1] + (-code_offsets[-1] % 4)
+        self._elements = {
+            blob[code_offsets[i] : code_offsets[i + 1]].decode("utf-8"): i
+            for i in range(elements)
+        }
+        self._element_count = elements
+        self.role_count = roles
+
+        self._masks = view[offset : offset + roles * elements]
+        offset += roles * elements + (-(roles * elements) % 4)
+        self._indptr = _u32_view(view[offset : offset + (user_slots + 1) * 4])
+        offset += (user_slots + 1) * 4
+        self._indices = _u32_view(view[offset : offset + links * 4])
+        self._user_slots = user_slots
+
+    @property
+    def resources(self) -> list[str]:
+        return list(self._elements)
+
+    @property
+    def user_slots(self) -> int:
+        return self._user_slots
+
+    def mask(self, user_id: int, resource: str) -> int:
+        element = self._elements.get(resource)
+        if element is None or not 0 <= user_id < self._user_slots:
+            return 0
+
+        masks = self._masks
+        stride = self._element_count
+        mask = 0
+        for i in range(self._indptr[user_id], self._indptr[user_id + 1]):
+            mask |= masks[self._indices[i] * stride + element]
+        return mask
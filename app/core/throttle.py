@@ -0,0 +1,217 @@
+import ipaddress
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Protocol
+
+from fastapi import Request
+from sqlalchemy import Engine, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.settings import get_settings
+from app.db.session import get_engine
+from app.models.throttle_bucket import ThrottleBucket
+
+IPNetwork = ipaddress.IPv4Network | ipaddress.IPv6Network
+
+
+class ThrottleBackend(Protocol):
+    def consume(self, key: str, rate: float, burst: float, now: float) -> float: ...
+
+
+def _refill(
+    tokens: float, updated_at: float, rate: float, burst: float, now: float
+) -> float:
+    return min(burst, tokens + max(now - updated_at, 0.0) * rate)
+
+
+def _take(tokens: float, rate: float) -> tuple[float, float]:
+    if tokens >= 1.0:
+        return tokens - 1.0, 0.0
+    return tokens, (1.0 - tokens) / rate
+
+
+class InMemoryThrottleBackend:
+    def __init__(self, max_keys: int) -> None:
+        self._max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def consume(self, key: str, rate: float, burst: float, now: float) -> float:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = burst if bucket is None else _refill(*bucket, rate, burst, now)
+            tokens, retry_after = _take(tokens, rate)
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+
+class SqlThrottleBackend:
+    def __init__(self, engine: Engine) -> None:
+        self._engine = engine
+
+    def consume(self, key: str, rate: float, burst: float, now: float) -> float:
+        query = (
+            select(ThrottleBucket.tokens, ThrottleBucket.updated_at)
+            .where(ThrottleBucket.key == key)
+            .with_for_update()
+        )
+        with self._engine.begin() as conn:
+            row = conn.execute(query).first()
+            if row is None:
+                tokens, retry_after = _take(burst, rate)
+                try:
+                    with conn.begin_nested():
+                        conn.execute(
+                            insert(ThrottleBucket).values(
+                                key=key, tokens=tokens, updated_at=now
+                            )
+                        )
+                    return retry_after
+                except IntegrityError:
+                    row = conn.execute(query).one()
+
+            tokens = _refill(row.tokens, row.updated_at, rate, burst, now)
+            tokens, retry_after = _take(tokens, rate)
+            conn.execute(
+                update(ThrottleBucket)
+                .where(ThrottleBucket.key == key)
+                .values(tokens=tokens, updated_at=now)
+            )
+            return retry_after
+
+
+def parse_trusted_proxies(value: str) -> tuple[IPNetwork, ...]:
+    return tuple(
+        ipaddress.ip_network(item.strip(), strict=False)
+        for item in value.split(",")
+        if item.strip()
+    )
+
+
+def _is_trusted(address: str, trusted: Sequence[IPNetwork]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted)
+
+
+def _strip_node(node: str) -> str:
+    node = node.strip().strip('"')
+    if node.startswith("["):
+        return node[1 : node.find("]")]
+    if node.count(":") == 1:
+        return node.split(":", 1)[0]
+    return node
+
+
+def _forwarded_hops(request: Request) -> list[str]:
+    hops = [
+        _strip_node(hop)
+        for header in request.headers.getlist("x-forwarded-for")
+        for hop in header.split(",")
+    ]
+    if hops:
+        return hops
+    for header in request.headers.getlist("forwarded"):
+        for element in header.split(","):
+            for pair in element.split(";"):
+                name, _, value = pair.strip().partition("=")
+                if name.lower() == "for":
+                    hops.append(_strip_node(value))
+    return hops
+
+
+def client_address(request: Request, trusted: Sequence[IPNetwork]) -> str | None:
+    peer = request.client.host if request.client else None
+    if peer is None or not _is_trusted(peer, trusted):
+        return peer
+    hops = _forwarded_hops(request)
+    for hop in reversed(hops):
+        if not _is_trusted(hop, trusted):
+            return hop
+    return hops[0] if hops else peer
+
+
+class LoginThrottle:
+    def __init__(
+        self,
+        backend: ThrottleBackend,
+        account_rate_per_minute: float,
+        account_burst: float,
+        client_rate_per_minute: float,
+        client_burst: float,
+        trusted_proxies: Sequence[IPNetwork] = (),
+    ) -> None:
+        self.backend = backend
+        self.trusted_proxies = tuple(trusted_proxies)
+        self._account = (account_rate_per_minute / 60.0, account_burst)
+        self._client = (client_rate_per_minute / 60.0, client_burst)
+        self._lock = threading.Lock()
+        self.counters = {
+            "attempts": 0,
+            "allowed": 0,
+            "throttled_account": 0,
+            "throttled_client": 0,
+        }
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def check(self, email: str, client: str | None, now: float | None = None) -> float:
+        now = time.time() if now is None else now
+        self._count("attempts")
+
+        if client:
+            retry_after = self.backend.consume(f"client:{client}", *self._client, now)
+            if retry_after:
+                self._count("throttled_client")
+                return retry_after
+
+        retry_after = self.backend.consume(f"account:{email}", *self._account, now)
+        if retry_after:
+            self._count("throttled_account")
+            return retry_after
+
+        self._count("allowed")
+        return 0.0
+
+    def client_address(self, request: Request) -> str | None:
+        return client_address(request, self.trusted_proxies)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+
+@lru_cache(maxsize=1)
+def get_login_throttle() -> LoginThrottle | None:
+    settings = get_settings()
+    if not settings.login_throttle_enabled:
+        return None
+
+    backend: ThrottleBackend
+    if settings.login_throttle_backend == "sql":
+        backend = SqlThrottleBackend(get_engine())
+    else:
+        backend = InMemoryThrottleBackend(settings.login_throttle_max_keys)
+
+    return LoginThrottle(
+        backend,
+        account_rate_per_minute=settings.login_account_rate_per_minute,
+        account_burst=settings.login_account_burst,
+        client_rate_per_minute=settings.login_client_rate_per_minute,
+        client_burst=settings.login_client_burst,
+        trusted_proxies=parse_trusted_proxies(settings.trusted_proxies),
+    )
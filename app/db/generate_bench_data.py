@@ -0,0 +1,326 @@
+import argparse
+import bisect
+import csv
+import io
+import itertools
+import random
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Table, create_engine, func, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.password import hash_password
+from app.core.policy_version import bump_policy_version
+from app.core.settings import get_settings
+from app.db.base import Base
+from app.models.access_role_rule import AccessRoleRule  # noqa: F401
+from app.models.business_element import BusinessElement  # noqa: F401
+from app.models.role import Role  # noqa: F401
+from app.models.user import User  # noqa: F401
+from app.models.user_role import UserRole  # noqa: F401
+
+DEMO_ELEMENT_CODES = [
+    "rbac_roles",
+    "rbac_rules",
+    "rbac_user_roles",
+    "products",
+    "orders",
+]
+
+PERMISSION_COLUMNS = [
+    "read_permission",
+    "read_all_permission",
+    "create_permission",
+    "update_permission",
+    "update_all_permission",
+    "delete_permission",
+    "delete_all_permission",
+]
+
+DISTRIBUTIONS = ("uniform", "zipf")
+
+
+@dataclass(frozen=True)
+class BenchDataConfig:
+    users: int = 10_000
+    roles: int = 50
+    elements: int = 20
+    roles_per_user: int = 2
+    rules_per_role: int = 5
+    role_distribution: str = "zipf"
+    element_distribution: str = "uniform"
+    zipf_s: float = 1.1
+    grant_probability: float = 0.5
+    password: str = "123"
+    seed: int = 42
+    batch_size: int = 10_000
+
+
+class _Picker:
+    def __init__(self, size: int, distribution: str, zipf_s: float) -> None:
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"unknown distribution: {distribution}")
+        self.size = size
+        self.weights: list[float] | None = None
+        self.cum_weights: list[float] = []
+        if distribution == "zipf":
+            self.weights = [1.0 / (rank**zipf_s) for rank in range(1, size + 1)]
+            self.cum_weights = list(itertools.accumulate(self.weights))
+
+    def sample(self, rng: random.Random, k: int) -> list[int]:
+        k = min(k, self.size)
+        weights = self.weights
+        if weights is None:
+            return rng.sample(range(self.size), k)
+
+        cum_weights = self.cum_weights
+        remaining = cum_weights[-1]
+        picked: list[int] = []
+        for _ in range(k):
+            target = rng.random() * remaining
+            for idx in picked:
+                if cum_weights[idx] - weights[idx] > target:
+                    break
+                target += weights[idx]
+            idx = min(bisect.bisect_right(cum_weights, target), self.size - 1)
+            while idx in picked:
+                idx = (idx + 1) % self.size
+            bisect.insort(picked, idx)
+            remaining -= weights[idx]
+        return picked
+
+
+def _batched(rows: Iterable[dict[str, Any]], size: int) -> Iterator[list[dict]]:
+    it = iter(rows)
+    while batch := list(itertools.islice(it, size)):
+        yield batch
+
+
+def _next_id(conn: Connection, table: Table) -> int:
+    return (
+        int(conn.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar_one())
+        + 1
+    )
+
+
+def _copy_rows(conn: Connection, table: Table, rows: Sequence[dict[str, Any]]) -> None:
+    columns = list(rows[0].keys())
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow(
+            ["t" if v is True else "f" if v is False else v for v in row.values()]
+        )
+    buf.seek(0)
+
+    raw = conn.connection.dbapi_connection
+    assert raw is not None
+    cursor: Any = raw.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buf,
+        )
+    finally:
+        cursor.close()
+
+
+def _bulk_insert(
+    conn: Connection, table: Table, rows: Iterable[dict[str, Any]], batch_size: int
+) -> int:
+    use_copy = conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2"
+    count = 0
+    for batch in _batched(rows, batch_size):
+        if use_copy:
+            _copy_rows(conn, table, batch)
+        else:
+            conn.execute(insert(table), batch)
+        count += len(batch)
+    return count
+
+
+def _sync_sequences(conn: Connection, tables: Sequence[Table]) -> None:
+    if conn.dialect.name != "postgresql":
+        return
+    for table in tables:
+        conn.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                f"(SELECT coalesce(max(id), 1) FROM {table.name}))"
+            )
+        )
+
+
+def _tune_connection(conn: Connection) -> None:
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        conn.exec_driver_sql("PRAGMA journal_mode=MEMORY")
+
+
+def generate_bench_data(engine: Engine, config: BenchDataConfig) -> dict[str, int]:
+    rng = random.Random(config.seed)
+    password_hash = hash_password(config.password)
+
+    users_t = Base.metadata.tables["users"]
+    roles_t = Base.metadata.tables["roles"]
+    elements_t = Base.metadata.tables["business_elements"]
+    rules_t = Base.metadata.tables["access_roles_rules"]
+    user_roles_t = Base.metadata.tables["user_roles"]
+
+    Base.metadata.create_all(bind=engine)
+
+    counts: dict[str, int] = {}
+    with engine.begin() as conn:
+        _tune_connection(conn)
+
+        first_element_id = _next_id(conn, elements_t)
+        first_role_id = _next_id(conn, roles_t)
+        first_user_id = _next_id(conn, users_t)
+        first_rule_id = _next_id(conn, rules_t)
+        run_tag = f"s{config.seed}_{first_user_id}"
+
+        existing_codes = set(conn.execute(select(elements_t.c.code)).scalars())
+        element_codes = [c for c in DEMO_ELEMENT_CODES if c not in existing_codes]
+        element_codes = element_codes[: config.elements]
+        element_codes += [
+            f"bench_{run_tag}_el_{i}"
+            for i in range(max(config.elements - len(element_codes), 0))
+        ]
+        counts["elements"] = _bulk_insert(
+            conn,
+            elements_t,
+            (
+                {"id": first_element_id + i, "code": code, "title": code}
+                for i, code in enumerate(element_codes)
+            ),
+            config.batch_size,
+        )
+
+        counts["roles"] = _bulk_insert(
+            conn,
+            roles_t,
+            (
+                {"id": first_role_id + i, "name": f"bench_{run_tag}_role_{i}"}
+                for i in range(config.roles)
+            ),
+            config.batch_size,
+        )
+
+        element_picker = _Picker(
+            counts["elements"], config.element_distribution, config.zipf_s
+        )
+
+        def rule_rows() -> Iterator[dict[str, Any]]:
+            rule_id = first_rule_id
+            for role_idx in range(config.roles):
+                for element_idx in element_picker.sample(rng, config.rules_per_role):
+                    row: dict[str, Any] = {
+                        "id": rule_id,
+                        "role_id": first_role_id + role_idx,
+                        "element_id": first_element_id + element_idx,
+                    }
+                    for column in PERMISSION_COLUMNS:
+                        row[column] = rng.random() < config.grant_probability
+                    rule_id += 1
+                    yield row
+
+        counts["rules"] = _bulk_insert(conn, rules_t, rule_rows(), config.batch_size)
+
+        counts["users"] = _bulk_insert(
+            conn,
+            users_t,
+            (
+                {
+                    "id": first_user_id + i,
+                    "email": f"bench_{run_tag}_{i}@bench.local",
+                    "full_name": f"Bench User {i}",
+                    "password_hash": password_hash,
+                    "is_active": True,
+                }
+                for i in range(config.users)
+            ),
+            config.batch_size,
+        )
+
+        role_picker = _Picker(config.roles, config.role_distribution, config.zipf_s)
+
+        def user_role_rows() -> Iterator[dict[str, Any]]:
+            for user_idx in range(config.users):
+                for role_idx in role_picker.sample(rng, config.roles_per_user):
+                    yield {
+                        "user_id": first_user_id + user_idx,
+                        "role_id": first_role_id + role_idx,
+                    }
+
+        counts["user_roles"] = _bulk_insert(
+            conn, user_roles_t, user_role_rows(), config.batch_size
+        )
+
+        _sync_sequences(conn, [users_t, roles_t, elements_t, rules_t])
+        bump_policy_version(conn)
+
+    return counts
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Bulk-generate a synthetic RBAC dataset for benchmarks"
+    )
+    defaults = BenchDataConfig()
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--roles", type=int, default=defaults.roles)
+    parser.add_argument("--elements", type=int, default=defaults.elements)
+    parser.add_argument("--roles-per-user", type=int, default=defaults.roles_per_user)
+    parser.add_argument("--rules-per-role", type=int, default=defaults.rules_per_role)
+    parser.add_argument(
+        "--role-distribution", choices=DISTRIBUTIONS, default=defaults.role_distribution
+    )
+    parser.add_argument(
+        "--element-distribution",
+        choices=DISTRIBUTIONS,
+        default=defaults.element_distribution,
+    )
+    parser.add_argument("--zipf-s", type=float, default=defaults.zipf_s)
+    parser.add_argument(
+        "--grant-probability", type=float, default=defaults.grant_probability
+    )
+    parser.add_argument("--password", default=defaults.password)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    args = parser.parse_args(argv)
+
+    config = BenchDataConfig(
+        users=args.users,
+        roles=args.roles,
+        elements=args.elements,
+        roles_per_user=args.roles_per_user,
+        rules_per_role=args.rules_per_role,
+        role_distribution=args.role_distribution,
+        element_distribution=args.element_distribution,
+        zipf_s=args.zipf_s,
+        grant_probability=args.grant_probability,
+        password=args.password,
+        seed=args.seed,
+        batch_size=args.batch_size,
+    )
+
+    db_url = args.database_url or get_settings().database_url
+    if not db_url:
+        parser.error("DATABASE_URL is not set")
+    engine = create_engine(db_url)
+
+    started = time.perf_counter()
+    counts = generate_bench_data(engine, config)
+    elapsed = time.perf_counter() - started
+
+    for name, count in counts.items():
+        print(f"{name}: {count}")
+    print(f"Done in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,16 @@
 from sqlalchemy.orm import Session
 
+from app.core.effective_permissions import refresh_effective_permissions
 from app.core.password import hash_password
+from app.core.policy_version import bump_policy_version
 from app.db.init_db import init_db
-from app.db.session import SessionLocal
+from app.db.session import get_sessionmaker
 from app.models.access_role_rule import AccessRoleRule
 from app.models.business_element import BusinessElement
 from app.models.role import Role
 from app.models.user import User
 from app.models.user_role import UserRole
 
-
 ADMIN_EMAIL = "admin"
 ADMIN_PASSWORD = "123"
 ADMIN_FULL_NAME = "Admin"
@@ -33,6 +34,7 @@ def get_or_create_user(db: Session, email: str, full_name: str, password: str) -
     user = db.query(User).filter(User.email == email).first()
     if user:
         user.is_active = True
+        user.version_id = User.version_id + 1
         if user.full_name is None:
             user.full_name = full_name
             db.flush()
@@ -119,7 +121,7 @@ def get_or_create_user_role(db: Session, user_id: int, role_id: int) -> None:
 def seed_demo_data() -> None:
     init_db()
 
-    with SessionLocal.begin() as db:
+    with get_sessionmaker().begin() as db:
         admin_role = get_or_create_role(db, "admin")
         user_role = get_or_create_role(db, "user")
 
@@ -135,6 +137,7 @@ def seed_demo_data() -> None:
             ("rbac_user_roles", "Роли пользователей"),
             ("products", "Товары"),
             ("orders", "Заказы"),
+            ("auth_introspection", "Интроспекция токенов"),
         ]
 
         element_objs = []
@@ -174,6 +177,9 @@ def seed_demo_data() -> None:
                 delete_all=False,
             )
 
+        refresh_effective_permissions(db)
+        bump_policy_version(db)
+
         print("Seed done!")
         print(f"Admin: {ADMIN_EMAIL} / {ADMIN_PASSWORD}")
         print(f"User:  {USER_EMAIL} / {USER_PASSWORD}")
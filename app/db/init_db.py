@@ -1,12 +1,78 @@
-from app.db.session import engine
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Connection, Engine, inspect, text
+
+from app.core.settings import get_settings
 from app.db.base import Base
-from app.models.user import User  # noqa: F401
+from app.db.session import get_engine
+from app.models.access_role_rule import AccessRoleRule  # noqa: F401
+from app.models.authz_decision import AuthzDecision  # noqa: F401
+from app.models.business_element import BusinessElement  # noqa: F401
+from app.models.effective_permission import EffectivePermission  # noqa: F401
+from app.models.mock_order import MockOrder  # noqa: F401
+from app.models.mock_product import MockProduct  # noqa: F401
+from app.models.policy_change import PolicyChange  # noqa: F401
+from app.models.policy_version import PolicyVersion  # noqa: F401
+from app.models.refresh_token import RefreshToken  # noqa: F401
 from app.models.revoked_token import RevokedToken  # noqa: F401
 from app.models.role import Role  # noqa: F401
+from app.models.throttle_bucket import ThrottleBucket  # noqa: F401
+from app.models.user import User  # noqa: F401
 from app.models.user_role import UserRole  # noqa: F401
-from app.models.business_element import BusinessElement  # noqa: F401
-from app.models.access_role_rule import AccessRoleRule  # noqa: F401
 
+if TYPE_CHECKING:
+    from alembic.config import Config
+
+__all__ = ["BASELINE_REVISION", "SCHEMA_REVISION", "Base", "init_db", "migrate_db"]
+
+SCHEMA_REVISION = "0007"
+BASELINE_REVISION = "0001"
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def alembic_config() -> "Config":
+    from alembic.config import Config
+
+    return Config(str(ALEMBIC_INI))
+
+
+def get_schema_revision(connection: Connection) -> str | None:
+    if not inspect(connection).has_table("alembic_version"):
+        return None
+    return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def is_legacy_schema(connection: Connection) -> bool:
+    tables = inspect(connection).get_table_names()
+    return "alembic_version" not in tables and "users" in tables
+
+
+def migrate_db(engine: Engine | None = None) -> None:
+    from alembic import command
+
+    config = alembic_config()
+    with (engine or get_engine()).begin() as connection:
+        config.attributes["connection"] = connection
+        if is_legacy_schema(connection):
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
+
+
+def init_db(engine: Engine | None = None) -> None:
+    engine = engine or get_engine()
+    with engine.connect() as connection:
+        revision = get_schema_revision(connection)
+        legacy = revision is None and is_legacy_schema(connection)
+    if revision == SCHEMA_REVISION:
+        return
 
-def init_db() -> None:
-    Base.metadata.create_all(bind=engine)
+    if not get_settings().db_auto_migrate:
+        command = "alembic upgrade head"
+        if legacy:
+            command = f"alembic stamp {BASELINE_REVISION} && {command}"
+        raise RuntimeError(
+            f"database schema is at revision {revision}, expected {SCHEMA_REVISION}; "
+            f"run `{command}`"
+        )
+    migrate_db(engine)
@@ -0,0 +1,298 @@
+import argparse
+import re
+import sys
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import (
+    ClauseElement,
+    MetaData,
+    Table,
+    UniqueConstraint,
+    create_engine,
+    exists,
+    func,
+    insert,
+    select,
+)
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.effective_permissions import refresh_effective_permissions
+from app.core.permissions import DELETE_ALL
+from app.core.rbac import (
+    permission_map_query,
+    permission_rules_query,
+    permitted_users_count_query,
+    permitted_users_query,
+)
+from app.core.settings import get_settings
+from app.db.generate_bench_data import BenchDataConfig, generate_bench_data
+from app.db.init_db import Base
+from app.models.access_role_rule import AccessRoleRule
+from app.models.business_element import BusinessElement
+from app.models.effective_permission import EffectivePermission
+from app.models.refresh_token import RefreshToken
+from app.models.revoked_token import RevokedToken
+from app.models.user import User
+from app.models.user_role import UserRole
+
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)")
+_POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    name: str
+    statement: ClauseElement
+    indexed_tables: tuple[str, ...]
+
+
+def hot_queries() -> list[HotQuery]:
+    return [
+        HotQuery(
+            "login/register: user by email",
+            select(User).where(User.email == "bench_s42_1_7@bench.local"),
+            ("users",),
+        ),
+        HotQuery(
+            "auth: revoked jti lookup",
+            select(RevokedToken.id).where(RevokedToken.jti == "jti-7"),
+            ("revoked_tokens",),
+        ),
+        HotQuery(
+            "introspect: revoked jti batch",
+            select(RevokedToken.jti).where(
+                RevokedToken.jti.in_(["jti-1", "jti-2", "jti-3"])
+            ),
+            ("revoked_tokens",),
+        ),
+        HotQuery(
+            "refresh: token by hash",
+            select(RefreshToken).where(RefreshToken.token_hash == "hash-7"),
+            ("refresh_tokens",),
+        ),
+        HotQuery(
+            "logout: refresh family",
+            select(RefreshToken.id).where(RefreshToken.family_id == "family-7"),
+            ("refresh_tokens",),
+        ),
+        HotQuery(
+            "rbac: roles of user",
+            select(UserRole.role_id).where(UserRole.user_id == 7),
+            ("user_roles",),
+        ),
+        HotQuery(
+            "rbac: users of role",
+            select(UserRole.user_id).where(UserRole.role_id == 3),
+            ("user_roles",),
+        ),
+        HotQuery(
+            "rbac: rules by role ids",
+            select(AccessRoleRule).where(AccessRoleRule.role_id.in_([1, 2, 3])),
+            ("access_roles_rules",),
+        ),
+        HotQuery(
+            "rbac: rules by element",
+            select(AccessRoleRule).where(AccessRoleRule.element_id == 3),
+            ("access_roles_rules",),
+        ),
+        HotQuery(
+            "rbac: permission mask",
+            permission_rules_query(7, "products"),
+            ("user_roles", "access_roles_rules", "business_elements"),
+        ),
+        HotQuery(
+            "users/me: permission map",
+            permission_map_query(7),
+            ("user_roles", "access_roles_rules"),
+        ),
+        HotQuery(
+            "rbac: materialized mask",
+            select(EffectivePermission.mask)
+            .join(BusinessElement, BusinessElement.id == EffectivePermission.element_id)
+            .where(
+                EffectivePermission.user_id == 7, BusinessElement.code == "products"
+            ),
+            ("effective_permissions", "business_elements"),
+        ),
+        HotQuery(
+            "admin: users with permission",
+            permitted_users_query(3, "delete", "all", 0, 100),
+            ("users", "user_roles", "access_roles_rules"),
+        ),
+        HotQuery(
+            "admin: users with permission count",
+            permitted_users_count_query(3, "delete", "all"),
+            ("access_roles_rules", "user_roles"),
+        ),
+        HotQuery(
+            "admin: materialized users with permission",
+            select(User.id, User.email, User.is_active)
+            .where(
+                User.id > 0,
+                exists().where(
+                    EffectivePermission.user_id == User.id,
+                    EffectivePermission.element_id == 3,
+                    EffectivePermission.mask.op("&")(DELETE_ALL) != 0,
+                ),
+            )
+            .order_by(User.id)
+            .limit(100),
+            ("users", "effective_permissions"),
+        ),
+        HotQuery(
+            "admin: materialized users with permission count",
+            select(func.count())
+            .select_from(EffectivePermission)
+            .where(
+                EffectivePermission.element_id == 3,
+                EffectivePermission.mask.op("&")(DELETE_ALL) != 0,
+            ),
+            ("effective_permissions",),
+        ),
+    ]
+
+
+def explain(conn: Connection, statement: ClauseElement) -> list[str]:
+    sql = str(
+        statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    )
+    if conn.dialect.name == "sqlite":
+        return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    return [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {sql}")]
+
+
+def full_scans(conn: Connection, plan: Sequence[str]) -> set[str]:
+    pattern = _SQLITE_SCAN if conn.dialect.name == "sqlite" else _POSTGRES_SCAN
+    scans = set()
+    for line in plan:
+        match = pattern.search(line.strip())
+        if match:
+            scans.add(match.group(1))
+    return scans
+
+
+def _index_keys(table: Table) -> list[tuple[str, tuple[str, ...], bool]]:
+    keys = [("primary key", tuple(c.name for c in table.primary_key.columns), True)]
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            columns = tuple(c.name for c in constraint.columns)
+            keys.append((str(constraint.name or columns), columns, True))
+    for index in sorted(table.indexes, key=lambda i: str(i.name)):
+        columns = tuple(c.name for c in index.columns)
+        keys.append((str(index.name), columns, bool(index.unique)))
+    return keys
+
+
+def redundant_indexes(metadata: MetaData) -> list[str]:
+    issues = []
+    for table in metadata.sorted_tables:
+        keys = _index_keys(table)
+        for index in sorted(table.indexes, key=lambda i: str(i.name)):
+            columns = tuple(c.name for c in index.columns)
+            for name, other, unique in keys:
+                if name == index.name or len(other) < len(columns):
+                    continue
+                if other[: len(columns)] == columns and (unique or not index.unique):
+                    issues.append(
+                        f"{table.name}.{index.name} {columns} is covered by {name}"
+                    )
+                    break
+    return issues
+
+
+def unindexed_foreign_keys(metadata: MetaData) -> list[str]:
+    issues = []
+    for table in metadata.sorted_tables:
+        leading = {columns[0] for _, columns, _ in _index_keys(table) if columns}
+        for fk in table.foreign_keys:
+            if fk.parent.name not in leading:
+                column = f"{table.name}.{fk.parent.name}"
+                issues.append(f"{column} -> {fk.target_fullname} has no index")
+    return issues
+
+
+def seed_plan_data(engine: Engine, users: int) -> None:
+    generate_bench_data(
+        engine,
+        BenchDataConfig(
+            users=users, roles=50, elements=40, roles_per_user=2, rules_per_role=15
+        ),
+    )
+    expires = datetime.now(UTC) + timedelta(days=1)
+    with engine.begin() as conn:
+        refresh_effective_permissions(conn)
+        user_ids = list(conn.execute(select(User.id)).scalars())
+        conn.execute(
+            insert(RevokedToken),
+            [
+                {"jti": f"jti-{user_id}", "user_id": user_id, "expire_at": expires}
+                for user_id in user_ids
+            ],
+        )
+        conn.execute(
+            insert(RefreshToken),
+            [
+                {
+                    "token_hash": f"hash-{user_id}",
+                    "user_id": user_id,
+                    "family_id": f"family-{user_id}",
+                    "expires_at": expires,
+                }
+                for user_id in user_ids
+            ],
+        )
+        conn.exec_driver_sql("ANALYZE")
+
+
+def check_query_plans(conn: Connection) -> dict[str, Any]:
+    report: dict[str, Any] = {}
+    for query in hot_queries():
+        plan = explain(conn, query.statement)
+        scanned = sorted(full_scans(conn, plan) & set(query.indexed_tables))
+        report[query.name] = {"plan": plan, "full_scans": scanned}
+    return report
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Print EXPLAIN plans of hot statements and flag index problems"
+    )
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument(
+        "--seed-users",
+        type=int,
+        default=0,
+        help="first fill the database with this many synthetic users",
+    )
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or get_settings().database_url
+    if not database_url:
+        parser.error("DATABASE_URL is not set")
+    engine = create_engine(database_url)
+    if args.seed_users:
+        seed_plan_data(engine, args.seed_users)
+
+    failed = False
+    with engine.connect() as conn:
+        for name, result in check_query_plans(conn).items():
+            status = "FULL SCAN " + ", ".join(result["full_scans"])
+            print(f"\n== {name}: {status if result['full_scans'] else 'ok'}")
+            for line in result["plan"]:
+                print(f"   {line}")
+            failed = failed or bool(result["full_scans"])
+
+    for issue in redundant_indexes(Base.metadata) + unindexed_foreign_keys(
+        Base.metadata
+    ):
+        print(f"\nindex: {issue}")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from collections.abc import Generator
+from functools import lru_cache
 
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
@@ -7,6 +8,7 @@ from sqlalchemy.orm import Session, sessionmaker
 from app.core.settings import get_settings
 
 
+@lru_cache(maxsize=1)
 def get_engine() -> Engine:
     settings = get_settings()
 
@@ -17,13 +19,13 @@ def get_engine() -> Engine:
     return create_engine(db_url)
 
 
-engine: Engine = get_engine()
-
-SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+@lru_cache(maxsize=1)
+def get_sessionmaker() -> sessionmaker[Session]:
+    return sessionmaker(bind=get_engine(), expire_on_commit=False)
 
 
 def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
         db.commit()
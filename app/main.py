@@ -1,21 +1,41 @@
 from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 
+from app.api.admin import admin_router
+from app.api.auth import auth_router
 from app.api.health import health_router
+from app.api.jwks import jwks_router
+from app.api.mock import mock_router
+from app.api.users import users_router
+from app.core.audit import get_decision_auditor
+from app.core.invalidation import get_invalidation_bus
+from app.core.jwt import evict_cached_tokens
+from app.core.keys import get_key_ring
+from app.core.policy_journal import get_policy_change_notifier
+from app.core.policy_snapshot import get_policy_snapshot_store
 from app.core.settings import get_settings
 from app.db.init_db import init_db
-from app.api.auth import auth_router
-from app.api.users import users_router
-from app.api.admin import admin_router
-from app.api.mock import mock_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     get_settings()
+    get_key_ring()
     init_db()
+    bus = get_invalidation_bus()
+    bus.subscribe(evict_cached_tokens)
+    bus.subscribe(get_policy_change_notifier().handle_event)
+    snapshot_store = get_policy_snapshot_store()
+    if snapshot_store is not None:
+        bus.subscribe(snapshot_store.handle_event)
+    bus.start()
     yield
+    bus.close()
+    auditor = get_decision_auditor()
+    if auditor is not None:
+        auditor.close()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -25,6 +45,7 @@ app.include_router(auth_router)
 app.include_router(users_router)
 app.include_router(admin_router)
 app.include_router(mock_router)
+app.include_router(jwks_router)
 
 
 if __name__ == "__main__":
@@ -26,7 +26,7 @@ class AccessRoleRule(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
     role_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("roles.id"), nullable=False, index=True
+        Integer, ForeignKey("roles.id"), nullable=False
     )
     element_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("business_elements.id"), nullable=False, index=True
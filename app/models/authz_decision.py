@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class AuthzDecision(Base):
+    __tablename__ = "authz_decisions"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    resource: Mapped[str] = mapped_column(String, nullable=False)
+    action: Mapped[str] = mapped_column(String, nullable=False)
+    allowed: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    owner_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
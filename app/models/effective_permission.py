@@ -0,0 +1,21 @@
+from sqlalchemy import Index, Integer, SmallInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class EffectivePermission(Base):
+    __tablename__ = "effective_permissions"
+
+    __table_args__ = (
+        Index(
+            "ix_effective_permissions_element_id_user_id_mask",
+            "element_id",
+            "user_id",
+            "mask",
+        ),
+    )
+
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    element_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    mask: Mapped[int] = mapped_column(SmallInteger, nullable=False)
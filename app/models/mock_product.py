@@ -0,0 +1,18 @@
+from sqlalchemy import Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class MockProduct(Base):
+    __tablename__ = "mock_products"
+
+    __table_args__ = (
+        Index("ix_mock_products_partition_owner", "partition_id", "owner_id"),
+    )
+
+    partition_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+
+    title: Mapped[str] = mapped_column(String, nullable=False)
+    owner_id: Mapped[int] = mapped_column(Integer, nullable=False)
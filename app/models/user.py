@@ -1,6 +1,8 @@
+from datetime import datetime
+
 from sqlalchemy import Boolean, DateTime, Integer, String, func, text
 from sqlalchemy.orm import Mapped, mapped_column
-from datetime import datetime
+
 from app.db.base import Base
 
 
@@ -25,3 +27,11 @@ class User(Base):
         server_default=func.now(),
         onupdate=func.now(),
     )
+
+    token_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
+
+    version_id: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default=text("1")
+    )
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -9,6 +9,8 @@ from app.db.base import Base
 class UserRole(Base):
     __tablename__ = "user_roles"
 
+    __table_args__ = (Index("ix_user_roles_role_id_user_id", "role_id", "user_id"),)
+
     user_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey("users.id"),
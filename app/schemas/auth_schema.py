@@ -1,4 +1,5 @@
 from datetime import datetime
+
 from pydantic import BaseModel, Field
 
 
@@ -32,3 +33,28 @@ class LoginRequest(BaseModel):
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    expires_in: int
+    refresh_token: str
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str = Field(min_length=1)
+
+
+class IntrospectRequest(BaseModel):
+    tokens: list[str] = Field(min_length=1, max_length=100)
+
+
+class IntrospectionResult(BaseModel):
+    active: bool
+    sub: str | None = None
+    email: str | None = None
+    token_type: str | None = None
+    jti: str | None = None
+    iat: int | None = None
+    exp: int | None = None
+    roles: list[str] | None = None
+
+
+class IntrospectResponse(BaseModel):
+    results: list[IntrospectionResult]
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field
 
+from app.core.permissions import Action, ScopeKind
+
 
 class RoleCreate(BaseModel):
     name: str = Field(min_length=1)
@@ -66,3 +68,46 @@ class RuleOut(BaseModel):
     delete_all_permission: bool
 
     model_config = {"from_attributes": True}
+
+
+class PermissionMapOut(BaseModel):
+    version: int
+    permissions: dict[str, dict[Action, ScopeKind]]
+
+
+class UserRoleLink(BaseModel):
+    user_id: int
+    role_id: int
+
+
+class PolicySimulationRequest(BaseModel):
+    rules: list[RuleUpsert] = Field(default_factory=list)
+    add_user_roles: list[UserRoleLink] = Field(default_factory=list)
+    remove_user_roles: list[UserRoleLink] = Field(default_factory=list)
+    sample_size: int = Field(default=10, ge=0, le=1000)
+
+
+class PolicySimulationChange(BaseModel):
+    resource: str
+    action: Action
+    gained: int
+    lost: int
+    gained_sample: list[int]
+    lost_sample: list[int]
+
+
+class PolicySimulationOut(BaseModel):
+    users: int
+    changes: list[PolicySimulationChange]
+
+
+class PermittedUserOut(BaseModel):
+    id: int
+    email: str
+    is_active: bool
+
+
+class PermittedUsersOut(BaseModel):
+    total: int | None
+    next_after: int | None
+    users: list[PermittedUserOut]
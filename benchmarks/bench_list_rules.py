@@ -0,0 +1,98 @@
+import argparse
+import json
+import os
+import statistics
+import time
+from collections.abc import Callable, Sequence
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.admin import _RULE_COLUMNS, _rows_response
+from app.db.base import Base
+from app.db.generate_bench_data import BenchDataConfig, generate_bench_data
+from app.models.access_role_rule import AccessRoleRule
+from app.schemas.rbac_schema import RuleOut
+
+RULES_ADAPTER = TypeAdapter(list[RuleOut])
+
+
+def orm_pydantic_stdlib(db: Session) -> bytes:
+    rules = db.query(AccessRoleRule).order_by(AccessRoleRule.id).all()
+    validated = RULES_ADAPTER.validate_python(rules, from_attributes=True)
+    return json.dumps(RULES_ADAPTER.dump_python(validated)).encode("utf-8")
+
+
+def orm_pydantic_json(db: Session) -> bytes:
+    rules = db.query(AccessRoleRule).order_by(AccessRoleRule.id).all()
+    return RULES_ADAPTER.dump_json(
+        RULES_ADAPTER.validate_python(rules, from_attributes=True)
+    )
+
+
+def projected_orjson(db: Session) -> bytes:
+    query = select(*_RULE_COLUMNS).order_by(AccessRoleRule.id)
+    return bytes(_rows_response(db, query, etag='"bench"').body)
+
+
+PATHS: dict[str, Callable[[Session], bytes]] = {
+    "orm + pydantic + json": orm_pydantic_stdlib,
+    "orm + pydantic dump_json": orm_pydantic_json,
+    "projected + orjson": projected_orjson,
+}
+
+
+def _time(fn: Callable[[Session], bytes], db: Session, repeat: int) -> float:
+    fn(db)
+    timings = []
+    for _ in range(repeat):
+        db.expunge_all()
+        started = time.perf_counter()
+        fn(db)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare list_rules serialization paths"
+    )
+    parser.add_argument("--rules", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print(f"{'rules':>8} {'path':<26} {'median ms':>10} {'speedup':>8}")
+    for rules in args.rules:
+        engine = create_engine(
+            "sqlite+pysqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=engine)
+        roles = max(rules // 100, 1)
+        generate_bench_data(
+            engine,
+            BenchDataConfig(
+                users=1, roles=roles, elements=100, rules_per_role=rules // roles
+            ),
+        )
+
+        with sessionmaker(bind=engine)() as db:
+            assert orjson.loads(projected_orjson(db)) == json.loads(
+                orm_pydantic_stdlib(db)
+            )
+            results = {name: _time(fn, db, args.repeat) for name, fn in PATHS.items()}
+
+        baseline = results["orm + pydantic + json"]
+        for name, ms in results.items():
+            print(f"{rules:>8} {name:<26} {ms:>10.2f} {baseline / ms:>7.1f}x")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.effective_permissions import (
+    materialized_permission_mask,
+    refresh_effective_permissions,
+)
+from app.core.permissions import mask_allows
+from app.core.policy_snapshot import PolicySnapshot, write_policy_snapshot
+from app.core.rbac import Action, has_all_permission, has_permission
+from app.db.base import Base
+from app.db.generate_bench_data import BenchDataConfig, generate_bench_data
+from app.models.access_role_rule import AccessRoleRule
+from app.models.business_element import BusinessElement
+from app.models.user import User
+
+ACTIONS: tuple[Action, ...] = ("read", "create", "update", "delete")
+
+
+@dataclass(frozen=True)
+class Scenario:
+    users: int
+    roles: int
+    roles_per_user: int
+    elements: int
+    rules_per_role: int
+
+    @property
+    def label(self) -> str:
+        return (
+            f"u={self.users} r={self.roles} rpu={self.roles_per_user} "
+            f"e={self.elements} rpr={self.rules_per_role}"
+        )
+
+
+SCENARIOS = [
+    Scenario(users=1_000, roles=10, roles_per_user=1, elements=10, rules_per_role=5),
+    Scenario(users=10_000, roles=50, roles_per_user=2, elements=50, rules_per_role=20),
+    Scenario(users=10_000, roles=50, roles_per_user=8, elements=50, rules_per_role=20),
+    Scenario(
+        users=50_000, roles=500, roles_per_user=3, elements=200, rules_per_role=100
+    ),
+    Scenario(
+        users=100_000, roles=2_000, roles_per_user=3, elements=1_000, rules_per_role=250
+    ),
+]
+
+QUICK_SCENARIOS = SCENARIOS[:2]
+
+Check = Callable[[Session, User, str, Action], bool]
+
+PATHS: dict[str, Check] = {
+    "db:has_permission": lambda db, user, code, action: has_permission(
+        db,
+        user,
+        code,
+        action,
+        owner_id=user.id,
+    ),
+    "db:has_all_permission": lambda db, user, code, action: has_all_permission(
+        db,
+        user,
+        code,
+        action,
+    ),
+}
+
+
+@dataclass(frozen=True)
+class Result:
+    scenario: Scenario
+    rules: int
+    path: str
+    p50_us: float
+    p95_us: float
+    alloc_kib: float
+
+
+def _prepare(engine: Engine, scenario: Scenario, seed: int) -> None:
+    Base.metadata.drop_all(bind=engine)
+    generate_bench_data(
+        engine,
+        BenchDataConfig(
+            users=scenario.users,
+            roles=scenario.roles,
+            elements=scenario.elements,
+            roles_per_user=scenario.roles_per_user,
+            rules_per_role=scenario.rules_per_role,
+            seed=seed,
+        ),
+    )
+
+
+def _sample_checks(
+    db: Session, count: int, seed: int
+) -> list[tuple[User, str, Action]]:
+    rng = random.Random(seed)
+    user_ids = list(db.execute(select(User.id)).scalars())
+    codes = list(db.execute(select(BusinessElement.code)).scalars())
+    return [
+        (User(id=rng.choice(user_ids)), rng.choice(codes), rng.choice(ACTIONS))
+        for _ in range(count)
+    ]
+
+
+def _measure(
+    db: Session, check: Check, samples: Sequence[tuple[User, str, Action]]
+) -> tuple[float, float, float]:
+    for user, code, action in samples[:20]:
+        check(db, user, code, action)
+
+    timings = []
+    for user, code, action in samples:
+        started = time.perf_counter()
+        check(db, user, code, action)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for user, code, action in samples[:200]:
+        check(db, user, code, action)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    return statistics.median(timings), p95, (peak - before) / 1024
+
+
+def _snapshot_check(db: Session, directory: str) -> Check:
+    path = os.path.join(directory, "policy.snapshot")
+    write_policy_snapshot(db, path)
+    snapshot = PolicySnapshot(path)
+    return lambda db, user, code, action: mask_allows(
+        snapshot.mask(user.id, code), action, True
+    )
+
+
+def _materialized_check(db: Session) -> Check:
+    refresh_effective_permissions(db)
+    db.commit()
+    return lambda db, user, code, action: mask_allows(
+        materialized_permission_mask(db, user.id, code), action, True
+    )
+
+
+def run(
+    engine: Engine, scenarios: Sequence[Scenario], checks: int, seed: int
+) -> list[Result]:
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    results = []
+    for scenario in scenarios:
+        _prepare(engine, scenario, seed)
+        with session_factory() as db, tempfile.TemporaryDirectory() as tmp:
+            rules = db.execute(
+                select(func.count()).select_from(AccessRoleRule)
+            ).scalar_one()
+            samples = _sample_checks(db, checks, seed)
+            paths = {
+                **PATHS,
+                "materialized:has_permission": _materialized_check(db),
+                "snapshot:has_permission": _snapshot_check(db, tmp),
+            }
+            for path, check in paths.items():
+                p50, p95, alloc = _measure(db, check, samples)
+                results.append(Result(scenario, rules, path, p50, p95, alloc))
+    return results
+
+
+def print_table(title: str, results: Sequence[Result]) -> None:
+    print(f"\n{title}")
+    header = (
+        f"{'scenario':<48} {'rules':>8} {'path':<28} "
+        f"{'p50 us':>9} {'p95 us':>9} {'peak KiB':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r.scenario.label:<48} {r.rules:>8} {r.path:<28} "
+            f"{r.p50_us:>9.1f} {r.p95_us:>9.1f} {r.alloc_kib:>9.1f}"
+        )
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Microbenchmark has_permission / has_all_permission vs policy size"
+    )
+    parser.add_argument("--checks", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument(
+        "--postgres-url",
+        default=None,
+        help="also run against this database (its tables are dropped and recreated)",
+    )
+    args = parser.parse_args(argv)
+
+    scenarios = QUICK_SCENARIOS if args.quick else SCENARIOS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_engine = create_engine(f"sqlite+pysqlite:///{tmp}/bench.db")
+        print_table("sqlite", run(sqlite_engine, scenarios, args.checks, args.seed))
+        sqlite_engine.dispose()
+
+    if args.postgres_url:
+        pg_engine = create_engine(args.postgres_url)
+        print_table("postgres", run(pg_engine, scenarios, args.checks, args.seed))
+        pg_engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
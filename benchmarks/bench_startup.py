@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Sequence
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+PROBE = """
+import asyncio
+import json
+import time
+
+started = time.perf_counter()
+from app.main import app
+
+imported = time.perf_counter()
+
+
+async def startup():
+    async with app.router.lifespan_context(app):
+        pass
+
+
+asyncio.run(startup())
+ready = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+}))
+"""
+
+
+def probe(database_url: str) -> dict[str, float]:
+    env = {**os.environ, "DATABASE_URL": database_url, "DB_AUTO_MIGRATE": "true"}
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["process_ms"] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def summarize(label: str, runs: Sequence[dict[str, float]]) -> None:
+    cells = "".join(
+        f" {statistics.median(run[key] for run in runs):>12.1f}"
+        for key in ("import_ms", "startup_ms", "process_ms")
+    )
+    print(f"{label:<32}{cells}")
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure cold start: app import, lifespan and whole process"
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="also measure startup against this already migrated database",
+    )
+    args = parser.parse_args(argv)
+
+    print(f"{'scenario':<32} {'import ms':>12} {'startup ms':>12} {'process ms':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        empty = [
+            probe(f"sqlite+pysqlite:///{tmp}/empty-{i}.db") for i in range(args.runs)
+        ]
+        summarize("sqlite, empty db (migrate)", empty)
+
+        current = [
+            probe(f"sqlite+pysqlite:///{tmp}/empty-0.db") for _ in range(args.runs)
+        ]
+        summarize("sqlite, schema current", current)
+
+    if args.database_url:
+        summarize(
+            "database-url, schema current",
+            [probe(args.database_url) for _ in range(args.runs)],
+        )
+
+
+if __name__ == "__main__":
+    main()
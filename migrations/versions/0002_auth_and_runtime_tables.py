@@ -0,0 +1,122 @@
+"""auth and runtime tables
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 12:57:22.431141
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: str | Sequence[str] | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "token_version", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+    )
+    op.add_column(
+        "users",
+        sa.Column(
+            "version_id", sa.Integer(), server_default=sa.text("1"), nullable=False
+        ),
+    )
+
+    op.create_table(
+        "mock_orders",
+        sa.Column("partition_id", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("partition_id", "id"),
+    )
+    op.create_index(
+        "ix_mock_orders_partition_owner",
+        "mock_orders",
+        ["partition_id", "owner_id"],
+        unique=False,
+    )
+
+    op.create_table(
+        "mock_products",
+        sa.Column("partition_id", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("partition_id", "id"),
+    )
+    op.create_index(
+        "ix_mock_products_partition_owner",
+        "mock_products",
+        ["partition_id", "owner_id"],
+        unique=False,
+    )
+
+    op.create_table(
+        "policy_versions",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "throttle_buckets",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("tokens", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_table(
+        "refresh_tokens",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("token_hash", sa.String(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("family_id", sa.String(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("token_hash"),
+    )
+    op.create_index(
+        op.f("ix_refresh_tokens_family_id"),
+        "refresh_tokens",
+        ["family_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_refresh_tokens_user_id"), "refresh_tokens", ["user_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_refresh_tokens_user_id"), table_name="refresh_tokens")
+    op.drop_index(op.f("ix_refresh_tokens_family_id"), table_name="refresh_tokens")
+    op.drop_table("refresh_tokens")
+    op.drop_table("throttle_buckets")
+    op.drop_table("policy_versions")
+    op.drop_index("ix_mock_products_partition_owner", table_name="mock_products")
+    op.drop_table("mock_products")
+    op.drop_index("ix_mock_orders_partition_owner", table_name="mock_orders")
+    op.drop_table("mock_orders")
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("version_id")
+        batch_op.drop_column("token_version")
@@ -0,0 +1,39 @@
+"""hot query indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 13:00:33.165845
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: str | Sequence[str] | None = "0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.drop_index(
+        op.f("ix_access_roles_rules_role_id"), table_name="access_roles_rules"
+    )
+    op.create_index(
+        "ix_user_roles_role_id_user_id",
+        "user_roles",
+        ["role_id", "user_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_roles_role_id_user_id", table_name="user_roles")
+    op.create_index(
+        op.f("ix_access_roles_rules_role_id"),
+        "access_roles_rules",
+        ["role_id"],
+        unique=False,
+    )
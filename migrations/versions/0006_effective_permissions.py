@@ -0,0 +1,53 @@
+"""effective permissions
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 13:19:12.709248
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: str | Sequence[str] | None = "0005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_BITS = {
+    "read_permission": 1,
+    "read_all_permission": 2,
+    "create_permission": 4,
+    "update_permission": 8,
+    "update_all_permission": 16,
+    "delete_permission": 32,
+    "delete_all_permission": 64,
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "effective_permissions",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("element_id", sa.Integer(), nullable=False),
+        sa.Column("mask", sa.SmallInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "element_id"),
+    )
+
+    mask = " + ".join(
+        f"MAX(CASE WHEN r.{column} THEN {bit} ELSE 0 END)"
+        for column, bit in _BITS.items()
+    )
+    op.execute(
+        "INSERT INTO effective_permissions (user_id, element_id, mask) "
+        f"SELECT ur.user_id, r.element_id, {mask} "
+        "FROM user_roles ur JOIN access_roles_rules r ON r.role_id = ur.role_id "
+        f"GROUP BY ur.user_id, r.element_id HAVING {mask} > 0"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("effective_permissions")
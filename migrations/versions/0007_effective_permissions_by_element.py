@@ -0,0 +1,33 @@
+"""effective permissions by element
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 13:30:53.194054
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: str | Sequence[str] | None = "0006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_effective_permissions_element_id_user_id_mask",
+        "effective_permissions",
+        ["element_id", "user_id", "mask"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_effective_permissions_element_id_user_id_mask",
+        table_name="effective_permissions",
+    )
@@ -1,25 +1,40 @@
 import os
 
+os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///./test.db")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-TEST_DB_URL = "sqlite+pysqlite:///./test.db"
-
-os.environ.setdefault("DATABASE_URL", TEST_DB_URL)
-
-import app.main as main_module  # noqa: E402
-from app.main import app  # noqa: E402
-from app.db.base import Base  # noqa: E402
-from app.db.session import get_db  # noqa: E402
-from app.models.user import User  # noqa: F401, E402
-from app.models.revoked_token import RevokedToken  # noqa: F401, E402
-from app.models.role import Role  # noqa: F401, E402
-from app.models.user_role import UserRole  # noqa: F401, E402
-from app.models.business_element import BusinessElement  # noqa: F401, E402
-from app.models.access_role_rule import AccessRoleRule  # noqa: F401, E402
+import app.api.mock as mock_module
+import app.main as main_module
+from app.core.audit import get_decision_auditor
+from app.core.effective_permissions import materialized_permissions_enabled
+from app.core.invalidation import get_invalidation_bus
+from app.core.policy_journal import get_policy_change_notifier
+from app.core.policy_snapshot import get_policy_snapshot_store
+from app.core.settings import get_settings
+from app.core.throttle import get_login_throttle
+from app.db.base import Base
+from app.db.session import get_db
+from app.main import app
+from app.models.access_role_rule import AccessRoleRule  # noqa: F401
+from app.models.authz_decision import AuthzDecision  # noqa: F401
+from app.models.business_element import BusinessElement  # noqa: F401
+from app.models.effective_permission import EffectivePermission  # noqa: F401
+from app.models.mock_order import MockOrder  # noqa: F401
+from app.models.mock_product import MockProduct  # noqa: F401
+from app.models.policy_change import PolicyChange  # noqa: F401
+from app.models.policy_version import PolicyVersion  # noqa: F401
+from app.models.refresh_token import RefreshToken  # noqa: F401
+from app.models.revoked_token import RevokedToken  # noqa: F401
+from app.models.role import Role  # noqa: F401
+from app.models.throttle_bucket import ThrottleBucket  # noqa: F401
+from app.models.user import User  # noqa: F401
+from app.models.user_role import UserRole  # noqa: F401
 
+TEST_DB_URL = "sqlite+pysqlite:///./test.db"
 
 engine = create_engine(
     TEST_DB_URL,
@@ -44,6 +59,15 @@ def override_get_db():
 def _prepare_db():
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    mock_module._MEMORY_STORES.clear()
+    mock_module.mock_store_backend.cache_clear()
+    get_settings.cache_clear()
+    get_login_throttle.cache_clear()
+    get_invalidation_bus.cache_clear()
+    get_policy_snapshot_store.cache_clear()
+    get_decision_auditor.cache_clear()
+    get_policy_change_notifier.cache_clear()
+    materialized_permissions_enabled.cache_clear()
     yield
 
 
@@ -1,7 +1,20 @@
-from fastapi import status
+import threading
+import time
 
+import pytest
+from fastapi import status
+from sqlalchemy import select
+
+from app.core.effective_permissions import (
+    materialized_permissions_enabled,
+    refresh_effective_permissions,
+)
+from app.core.policy_journal import get_policy_change_notifier
+from app.core.policy_version import bump_policy_version
+from app.core.settings import get_settings
 from app.models.access_role_rule import AccessRoleRule
 from app.models.business_element import BusinessElement
+from app.models.policy_change import PolicyChange
 from app.models.role import Role
 from app.models.user_role import UserRole
 
@@ -274,3 +287,299 @@ def test_admin_user_roles_assign_remove_as_admin(client, db_session):
     resp = client.get(f"/admin/users/{target['id']}/roles", headers=h)
     assert resp.status_code == status.HTTP_200_OK
     assert resp.json() == []
+
+
+def test_admin_list_etag_changes_after_policy_write(client, db_session):
+    admin = _register_user(client, "admin_etag@test.com")
+    _grant_admin_permissions(db_session, admin["id"])
+    h = _auth_headers(_login_token(client, "admin_etag@test.com"))
+
+    resp = client.get("/admin/roles", headers=h)
+    assert resp.status_code == status.HTTP_200_OK
+    etag = resp.headers["etag"]
+
+    for path in ["/admin/roles", "/admin/elements", "/admin/rules"]:
+        first = client.get(path, headers=h)
+        resp = client.get(path, headers={**h, "If-None-Match": first.headers["etag"]})
+        assert resp.status_code == status.HTTP_304_NOT_MODIFIED, path
+
+    resp = client.post("/admin/roles", json={"name": "auditor"}, headers=h)
+    assert resp.status_code == status.HTTP_201_CREATED
+
+    resp = client.get("/admin/roles", headers={**h, "If-None-Match": etag})
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.headers["etag"] != etag
+    assert "auditor" in [role["name"] for role in resp.json()]
+
+
+def test_admin_user_roles_etag_changes_after_assignment(client, db_session):
+    admin = _register_user(client, "admin_etag2@test.com")
+    _grant_admin_permissions(db_session, admin["id"])
+    h = _auth_headers(_login_token(client, "admin_etag2@test.com"))
+    target = _register_user(client, "etag_target@test.com")
+    role_id = client.post("/admin/roles", json={"name": "qa"}, headers=h).json()["id"]
+
+    resp = client.get(f"/admin/users/{target['id']}/roles", headers=h)
+    etag = resp.headers["etag"]
+    resp = client.get(
+        f"/admin/users/{target['id']}/roles", headers={**h, "If-None-Match": etag}
+    )
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+
+    client.post(f"/admin/users/{target['id']}/roles/{role_id}", headers=h)
+
+    resp = client.get(
+        f"/admin/users/{target['id']}/roles", headers={**h, "If-None-Match": etag}
+    )
+    assert resp.status_code == status.HTTP_200_OK
+    assert [role["name"] for role in resp.json()] == ["qa"]
+
+
+def test_admin_logout_user_everywhere(client, db_session):
+    admin = _register_user(client, "admin_sessions@test.com")
+    _grant_admin_permissions(db_session, admin["id"])
+    h = _auth_headers(_login_token(client, "admin_sessions@test.com"))
+
+    target = _register_user(client, "compromised@test.com")
+    target_headers = _auth_headers(_login_token(client, "compromised@test.com"))
+    assert client.get("/users/me", headers=target_headers).status_code == 200
+
+    resp = client.post(f"/admin/users/{target['id']}/logout-all", headers=h)
+    assert resp.status_code == status.HTTP_204_NO_CONTENT
+
+    resp = client.get("/users/me", headers=target_headers)
+    assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+    resp = client.post("/admin/users/9999/logout-all", headers=h)
+    assert resp.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_admin_changes_are_journaled_with_policy_sequence(client, db_session):
+    admin = _register_user(client, "admin_journal@test.com")
+    _grant_admin_permissions(db_session, admin["id"])
+    h = _auth_headers(_login_token(client, "admin_journal@test.com"))
+    target = _register_user(client, "journal_target@test.com")
+
+    role_id = client.post("/admin/roles", json={"name": "ops"}, headers=h).json()["id"]
+    resp = client.post("/admin/roles", json={"name": "ops"}, headers=h)
+    assert resp.status_code == status.HTTP_409_CONFLICT
+    client.patch(f"/admin/roles/{role_id}", json={"name": "ops2"}, headers=h)
+    client.post(f"/admin/users/{target['id']}/roles/{role_id}", headers=h)
+    client.delete(f"/admin/users/{target['id']}/roles/{role_id}", headers=h)
+
+    version = client.get("/admin/policy/version", headers=h).json()["version"]
+    changes = db_session.execute(select(PolicyChange).order_by(PolicyChange.seq))
+    journal = [
+        (c.seq, c.entity, c.op, c.payload, c.actor_id) for c in changes.scalars()
+    ]
+    link = {"user_id": target["id"], "role_id": role_id}
+    assert journal == [
+        (1, "role", "upsert", {"id": role_id, "name": "ops"}, admin["id"]),
+        (2, "role", "upsert", {"id": role_id, "name": "ops2"}, admin["id"]),
+        (3, "user_role", "upsert", link, admin["id"]),
+        (4, "user_role", "delete", link, admin["id"]),
+    ]
+    assert version == 4
+
+
+def test_admin_policy_changes_feed(client, db_session):
+    admin = _register_user(client, "admin_feed@test.com")
+    _grant_admin_permissions(db_session, admin["id"])
+    h = _auth_headers(_login_token(client, "admin_feed@test.com"))
+
+    resp = client.get("/admin/policy/changes", params={"since": 0}, headers=h)
+    assert resp.json() == {
+        "version": 0,
+        "reset": False,
+        "has_more": False,
+        "changes": [],
+    }
+
+    role_id = client.post("/admin/roles", json={"name": "a"}, headers=h).json()["id"]
+    client.post("/admin/roles", json={"name": "b"}, headers=h)
+    client.delete(f"/admin/roles/{role_id}", headers=h)
+
+    resp = client.get(
+        "/admin/policy/changes", params={"since": 0, "limit": 2}, headers=h
+    )
+    body = resp.json()
+    assert body["version"] == 2
+    assert body["has_more"] is True
+    assert [c["payload"]["name"] for c in body["changes"]] == ["a", "b"]
+
+    resp = client.get("/admin/policy/changes", params={"since": 2}, headers=h)
+    assert resp.json()["changes"] == [
+        {"seq": 3, "entity": "role", "op": "delete", "payload": {"id": role_id}}
+    ]
+
+    resp = client.get("/admin/policy/changes", params={"since": 9}, headers=h)
+    assert resp.json() == {"version": 3, "reset": True, "changes": []}
+
+
+def test_admin_policy_changes_reset_when_journal_is_behind(client, db_session):
+    admin = _register_user(client, "admin_reset@test.com")
+    _grant_admin_permissions(db_session, admin["id"])
+    h = _auth_headers(_login_token(client, "admin_reset@test.com"))
+    bump_policy_version(db_session)
+    db_session.commit()
+    client.post("/admin/roles", json={"name": "late"}, headers=h)
+
+    resp = client.get("/admin/policy/changes", params={"since": 0}, headers=h)
+    assert resp.json()["reset"] is True
+    resp = client.get("/admin/policy/changes", params={"since": 1}, headers=h)
+    assert [c["seq"] for c in resp.json()["changes"]] == [2]
+
+
+def test_admin_policy_changes_reset_on_gap_inside_journal(client, db_session):
+    admin = _register_user(client, "admin_gap@test.com")
+    _grant_admin_permissions(db_session, admin["id"])
+    h = _auth_headers(_login_token(client, "admin_gap@test.com"))
+    client.post("/admin/roles", json={"name": "first"}, headers=h)
+    client.post("/admin/roles", json={"name": "second"}, headers=h)
+    bump_policy_version(db_session)
+    db_session.commit()
+    client.post("/admin/roles", json={"name": "after_gap"}, headers=h)
+
+    resp = client.get("/admin/policy/changes", params={"since": 1}, headers=h)
+    assert resp.json() == {"version": 4, "reset": True, "changes": []}
+    resp = client.get("/admin/policy/changes", params={"since": 2}, headers=h)
+    assert resp.json()["reset"] is True
+    resp = client.get("/admin/policy/changes", params={"since": 3}, headers=h)
+    assert [c["seq"] for c in resp.json()["changes"]] == [4]
+
+
+def _wait_for_pollers(count: int) -> None:
+    notifier = get_policy_change_notifier()
+    deadline = time.monotonic() + 30
+    while len(notifier._waiters) < count:
+        assert time.monotonic() < deadline, "pollers did not start waiting"
+        time.sleep(0.01)
+
+
+def test_admin_policy_changes_long_poll(client, db_session):
+    admin = _register_user(client, "admin_poll@test.com")
+    _grant_admin_permissions(db_session, admin["id"])
+    h = _auth_headers(_login_token(client, "admin_poll@test.com"))
+
+    started = time.monotonic()
+    resp = client.get(
+        "/admin/policy/changes", params={"since": 0, "wait": 0.3}, headers=h
+    )
+    assert resp.json()["changes"] == []
+    assert time.monotonic() - started >= 0.3
+
+    results = []
+    poller = threading.Thread(
+        target=lambda: results.append(
+            client.get(
+                "/admin/policy/changes", params={"since": 0, "wait": 30}, headers=h
+            ).json()
+        )
+    )
+    poller.start()
+    _wait_for_pollers(1)
+    started = time.monotonic()
+    client.post("/admin/roles", json={"name": "x"}, headers=h)
+    poller.join(timeout=30)
+    assert [c["payload"]["name"] for c in results[0]["changes"]] == ["x"]
+    assert time.monotonic() - started < 10
+
+
+@pytest.mark.parametrize("evaluator", ["db", "materialized"])
+def test_admin_element_permitted_users(client, db_session, monkeypatch, evaluator):
+    monkeypatch.setenv("RBAC_EVALUATOR", evaluator)
+    get_settings.cache_clear()
+    materialized_permissions_enabled.cache_clear()
+    admin = _register_user(client, "admin_reverse@test.com")
+    _grant_admin_permissions(db_session, admin["id"])
+    refresh_effective_permissions(db_session)
+    db_session.commit()
+    h = _auth_headers(_login_token(client, "admin_reverse@test.com"))
+
+    element_id = client.post(
+        "/admin/elements", json={"code": "orders", "title": "Orders"}, headers=h
+    ).json()["id"]
+    grants = {
+        "deleter": {"delete_all_permission": True},
+        "owner_deleter": {"delete_permission": True},
+        "reader": {"read_all_permission": True},
+    }
+    roles = {}
+    for name, flags in grants.items():
+        roles[name] = client.post(
+            "/admin/roles", json={"name": name}, headers=h
+        ).json()["id"]
+        client.put(
+            "/admin/rules",
+            json={"role_id": roles[name], "element_id": element_id, **flags},
+            headers=h,
+        )
+    links = [["deleter"], ["deleter", "owner_deleter"], ["owner_deleter"], ["reader"]]
+    users = []
+    for i, names in enumerate(links):
+        user = _register_user(client, f"reverse{i}@test.com")
+        users.append(user["id"])
+        for name in names:
+            client.post(f"/admin/users/{user['id']}/roles/{roles[name]}", headers=h)
+
+    def permitted(**params):
+        found, total, after = [], None, 0
+        while True:
+            resp = client.get(
+                f"/admin/elements/{element_id}/users",
+                params={**params, "after": after, "limit": 1},
+                headers=h,
+            )
+            assert resp.status_code == status.HTTP_200_OK, resp.text
+            body = resp.json()
+            if after == 0:
+                total = body["total"]
+            else:
+                assert body["total"] is None
+            found += [user["id"] for user in body["users"]]
+            if body["next_after"] is None:
+                return total, found
+            after = body["next_after"]
+
+    assert permitted(action="delete") == (2, users[:2])
+    assert permitted(action="delete", scope="own") == (3, users[:3])
+    assert permitted(action="read") == (1, users[3:])
+    assert permitted(action="create") == (0, [])
+
+    resp = client.get(
+        f"/admin/elements/{element_id}/users", params={"action": "read"}, headers=h
+    )
+    assert resp.json()["users"] == [
+        {"id": users[3], "email": "reverse3@test.com", "is_active": True}
+    ]
+    resp = client.get("/admin/elements/999/users?action=read", headers=h)
+    assert resp.status_code == status.HTTP_404_NOT_FOUND
+    resp = client.get(f"/admin/elements/{element_id}/users?action=grant", headers=h)
+    assert resp.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_admin_policy_changes_long_polls_do_not_hold_worker_threads(client, db_session):
+    admin = _register_user(client, "admin_many_polls@test.com")
+    _grant_admin_permissions(db_session, admin["id"])
+    h = _auth_headers(_login_token(client, "admin_many_polls@test.com"))
+    results = []
+
+    def poll():
+        resp = client.get(
+            "/admin/policy/changes", params={"since": 0, "wait": 30}, headers=h
+        )
+        results.append([c["payload"]["name"] for c in resp.json()["changes"]])
+
+    pollers = [threading.Thread(target=poll) for _ in range(45)]
+    for poller in pollers:
+        poller.start()
+    _wait_for_pollers(len(pollers))
+
+    assert client.get("/health").status_code == status.HTTP_200_OK
+    assert client.get("/admin/policy/version", headers=h).status_code == 200
+    assert all(poller.is_alive() for poller in pollers)
+
+    client.post("/admin/roles", json={"name": "wake"}, headers=h)
+    for poller in pollers:
+        poller.join(timeout=30)
+    assert results == [["wake"]] * len(pollers)
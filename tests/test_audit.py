@@ -0,0 +1,195 @@
+import random
+import threading
+from typing import Any
+
+import orjson
+from sqlalchemy import select
+
+from app.core.audit import (
+    Decision,
+    DecisionAuditor,
+    NdjsonAuditSink,
+    SqlAuditSink,
+    get_decision_auditor,
+)
+from app.core.settings import get_settings
+from app.models.authz_decision import AuthzDecision
+from tests.conftest import TestingSessionLocal, engine
+from tests.test_mock import register_user_and_get_auth_headers
+
+
+class ListSink:
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+
+    def write(self, batch):
+        if self.fail:
+            raise RuntimeError("sink is down")
+        self.batches.append(list(batch))
+
+    @property
+    def decisions(self):
+        return [decision for batch in self.batches for decision in batch]
+
+
+def _decision(allowed: bool, user_id: int = 1) -> Decision:
+    return Decision(
+        created_at=1_700_000_000.0,
+        user_id=user_id,
+        resource="products",
+        action="read",
+        allowed=allowed,
+    )
+
+
+def _auditor(sink, **overrides) -> DecisionAuditor:
+    options: dict[str, Any] = {
+        "queue_size": 100,
+        "batch_size": 10,
+        "flush_interval_seconds": 60,
+        "allow_sample_rate": 1.0,
+        "rng": random.Random(7),
+    }
+    options.update(overrides)
+    return DecisionAuditor(sink, **options)
+
+
+def test_allows_are_sampled_and_denies_always_kept():
+    sink = ListSink()
+    auditor = _auditor(sink, allow_sample_rate=0.1)
+
+    for _ in range(1000):
+        auditor.record(_decision(True))
+    for _ in range(20):
+        auditor.record(_decision(False))
+    auditor.close()
+
+    allowed = [d for d in sink.decisions if d.allowed]
+    denied = [d for d in sink.decisions if not d.allowed]
+    assert len(denied) == 20
+    assert 50 < len(allowed) < 150
+    stats = auditor.stats()
+    assert stats["sampled_out"] + stats["recorded"] == 1020
+    assert stats["written"] == stats["recorded"] - stats["dropped"]
+    assert all(len(batch) <= 10 for batch in sink.batches)
+
+
+def test_overflow_drops_allows_and_spills_denies():
+    sink = ListSink()
+    sink.fail = True
+    spill = ListSink()
+    auditor = _auditor(sink, queue_size=5, batch_size=100, spill=spill)
+
+    for i in range(50):
+        auditor.record(_decision(True, user_id=i))
+    for i in range(12):
+        auditor.record(_decision(False, user_id=i))
+
+    stats = auditor.stats()
+    assert stats["write_errors"] == 0
+    assert stats["queued"] == 10
+    assert stats["dropped"] == 45
+    assert stats["spilled"] == 7
+    assert [d.user_id for d in spill.decisions] == list(range(7))
+
+    auditor.flush()
+    stats = auditor.stats()
+    assert stats["write_errors"] == 1
+    assert stats["queued"] == 5
+    assert stats["dropped"] == 50
+
+    sink.fail = False
+    auditor.close()
+    assert [d.user_id for d in sink.decisions] == list(range(7, 12))
+
+
+def test_every_deny_is_persisted_when_queue_fills():
+    sink = ListSink()
+    sink.fail = True
+    spill = ListSink()
+    spill.fail = True
+    auditor = _auditor(sink, queue_size=3, batch_size=4, spill=spill)
+
+    for i in range(10):
+        auditor.record(_decision(False, user_id=i))
+    auditor.flush()
+    stats = auditor.stats()
+    assert stats["spill_errors"] > 0
+    assert stats["queued"] == 10
+
+    spill.fail = False
+    for i in range(10, 20):
+        auditor.record(_decision(False, user_id=i))
+    sink.fail = False
+    auditor.close()
+
+    persisted = [d.user_id for d in sink.decisions + spill.decisions]
+    assert sorted(persisted) == list(range(20))
+    assert auditor.stats()["queued"] == 0
+
+
+def test_background_writer_flushes_full_batches():
+    sink = ListSink()
+    written = threading.Event()
+    write = sink.write
+
+    def notify(batch):
+        write(batch)
+        written.set()
+
+    sink.write = notify
+    auditor = _auditor(sink, batch_size=5)
+
+    for _ in range(5):
+        auditor.record(_decision(False))
+    assert written.wait(5)
+    auditor.close()
+    assert len(sink.decisions) == 5
+
+
+def test_sql_sink_bulk_inserts():
+    auditor = _auditor(SqlAuditSink(engine))
+    auditor.record(_decision(False, user_id=3))
+    auditor.record(_decision(True, user_id=4))
+    auditor.close()
+
+    with TestingSessionLocal() as db:
+        rows = db.execute(
+            select(AuthzDecision.user_id, AuthzDecision.allowed).order_by(
+                AuthzDecision.user_id
+            )
+        ).all()
+    assert rows == [(3, False), (4, True)]
+
+
+def test_ndjson_sink_rotates(tmp_path):
+    sink = NdjsonAuditSink(str(tmp_path), max_bytes=200)
+
+    for i in range(10):
+        sink.write([_decision(False, user_id=i)])
+
+    files = sorted(tmp_path.iterdir())
+    assert len(files) > 1
+    lines = [
+        orjson.loads(line) for path in files for line in path.read_bytes().splitlines()
+    ]
+    assert sorted(line["user_id"] for line in lines) == list(range(10))
+
+
+def test_forbidden_request_is_audited(client, monkeypatch, tmp_path):
+    monkeypatch.setenv("AUDIT_BACKEND", "ndjson")
+    monkeypatch.setenv("AUDIT_NDJSON_DIR", str(tmp_path))
+    monkeypatch.setenv("AUDIT_ALLOW_SAMPLE_RATE", "0")
+    get_settings.cache_clear()
+
+    user_id, headers = register_user_and_get_auth_headers(client, "audit@test.com")
+    assert client.get("/mock/products", headers=headers).status_code == 403
+    assert client.get("/health/audit").json()["recorded"] == 1
+
+    get_decision_auditor().flush()
+    lines = (tmp_path / "decisions.ndjson").read_bytes().splitlines()
+    record = orjson.loads(lines[0])
+    assert record["user_id"] == user_id
+    assert record["resource"] == "products"
+    assert record["allowed"] is False
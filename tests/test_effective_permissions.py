@@ -0,0 +1,117 @@
+from alembic import command
+from sqlalchemy import create_engine, insert, select, update
+
+from app.core.effective_permissions import (
+    find_inconsistencies,
+    materialized_permission_mask,
+    refresh_effective_permissions,
+)
+from app.core.rbac import query_permission_mask
+from app.core.settings import get_settings
+from app.db.generate_bench_data import BenchDataConfig, generate_bench_data
+from app.db.init_db import alembic_config
+from app.models.business_element import BusinessElement
+from app.models.effective_permission import EffectivePermission
+from app.models.user_role import UserRole
+from tests.conftest import TestingSessionLocal, engine
+from tests.test_mock import grant_access_rule, register_user_and_get_auth_headers
+
+
+def test_rebuild_matches_on_the_fly_masks():
+    generate_bench_data(
+        engine,
+        BenchDataConfig(
+            users=40, roles=10, elements=8, roles_per_user=3, rules_per_role=4
+        ),
+    )
+
+    with TestingSessionLocal() as db:
+        refresh_effective_permissions(db)
+        db.commit()
+        assert find_inconsistencies(db) == []
+
+        codes = list(db.execute(select(BusinessElement.code)).scalars())
+        for user_id in range(42):
+            for code in [*codes, "missing"]:
+                assert materialized_permission_mask(
+                    db, user_id, code
+                ) == query_permission_mask(db, user_id, code)
+
+        row = db.execute(select(EffectivePermission).limit(1)).scalar_one()
+        db.execute(
+            update(EffectivePermission)
+            .where(
+                EffectivePermission.user_id == row.user_id,
+                EffectivePermission.element_id == row.element_id,
+            )
+            .values(mask=0)
+        )
+        issues = find_inconsistencies(db)
+    assert [(u, e) for u, e, _, _ in issues] == [(row.user_id, row.element_id)]
+
+
+def test_admin_writes_keep_table_consistent(client, monkeypatch):
+    monkeypatch.setenv("RBAC_EVALUATOR", "materialized")
+    get_settings.cache_clear()
+    admin_id, admin = register_user_and_get_auth_headers(client, "mat@test.com")
+    for code in ("rbac_roles", "rbac_rules", "rbac_user_roles"):
+        grant_access_rule(
+            admin_id,
+            "admin",
+            code,
+            read_all_permission=True,
+            create_permission=True,
+            update_all_permission=True,
+            delete_all_permission=True,
+        )
+    with TestingSessionLocal() as db:
+        refresh_effective_permissions(db)
+        db.commit()
+    user_id, user = register_user_and_get_auth_headers(client, "mat-user@test.com")
+
+    def consistent():
+        with TestingSessionLocal() as db:
+            return find_inconsistencies(db) == []
+
+    role_id = client.post("/admin/roles", json={"name": "v"}, headers=admin).json()[
+        "id"
+    ]
+    element_id = client.post(
+        "/admin/elements", json={"code": "products"}, headers=admin
+    ).json()["id"]
+    rule = {"role_id": role_id, "element_id": element_id, "read_permission": True}
+    client.put("/admin/rules", json=rule, headers=admin)
+    assert consistent()
+    assert client.get("/mock/products", headers=user).status_code == 403
+
+    client.post(f"/admin/users/{user_id}/roles/{role_id}", headers=admin)
+    assert consistent()
+    assert client.get("/mock/products", headers=user).status_code == 200
+
+    client.put("/admin/rules", json={**rule, "read_permission": False}, headers=admin)
+    assert consistent()
+    assert client.get("/mock/products", headers=user).status_code == 403
+
+    client.put("/admin/rules", json=rule, headers=admin)
+    client.delete(f"/admin/users/{user_id}/roles/{role_id}", headers=admin)
+    assert consistent()
+    assert client.get("/mock/products", headers=user).status_code == 403
+
+
+def test_migration_backfills_existing_links(tmp_path):
+    db_engine = create_engine(f"sqlite+pysqlite:///{tmp_path}/backfill.db")
+    config = alembic_config()
+    with db_engine.begin() as conn:
+        config.attributes["connection"] = conn
+        command.upgrade(config, "0005")
+        conn.exec_driver_sql("INSERT INTO roles (id, name) VALUES (1, 'r')")
+        conn.exec_driver_sql("INSERT INTO business_elements (id, code) VALUES (1, 'p')")
+        conn.exec_driver_sql(
+            "INSERT INTO access_roles_rules (role_id, element_id, read_permission, "
+            "update_all_permission) VALUES (1, 1, 1, 1)"
+        )
+        conn.execute(insert(UserRole.__table__).values(user_id=5, role_id=1))
+        command.upgrade(config, "0006")
+        rows = conn.execute(select(EffectivePermission.__table__)).all()
+    db_engine.dispose()
+    assert rows == [(5, 1, 1 | 16)]
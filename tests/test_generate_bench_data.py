@@ -0,0 +1,90 @@
+import random
+
+from sqlalchemy import func, select
+
+from app.db.generate_bench_data import BenchDataConfig, _Picker, generate_bench_data
+from app.models.access_role_rule import AccessRoleRule
+from app.models.business_element import BusinessElement
+from app.models.user import User
+from app.models.user_role import UserRole
+from tests.conftest import engine
+
+
+def _count(model) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(model)).scalar_one()
+
+
+def test_generate_bench_data_inserts_requested_counts():
+    config = BenchDataConfig(
+        users=200, roles=10, elements=8, roles_per_user=3, rules_per_role=4
+    )
+
+    counts = generate_bench_data(engine, config)
+
+    assert counts == {
+        "elements": 8,
+        "roles": 10,
+        "rules": 40,
+        "users": 200,
+        "user_roles": 600,
+    }
+    assert _count(User) == 200
+    assert _count(UserRole) == 600
+    assert _count(AccessRoleRule) == 40
+
+    with engine.connect() as conn:
+        codes = set(conn.execute(select(BusinessElement.code)).scalars())
+        hashes = set(conn.execute(select(User.password_hash)).scalars())
+    assert {"products", "orders"} <= codes
+    assert len(hashes) == 1
+
+
+def test_generate_bench_data_is_deterministic_for_seed():
+    config = BenchDataConfig(users=50, roles=5, elements=6, seed=7)
+
+    generate_bench_data(engine, config)
+    with engine.connect() as conn:
+        first = conn.execute(
+            select(UserRole.user_id, UserRole.role_id).order_by(
+                UserRole.user_id, UserRole.role_id
+            )
+        ).all()
+        conn.execute(UserRole.__table__.delete())
+        conn.commit()
+
+    rules_before = _count(AccessRoleRule)
+    generate_bench_data(engine, config)
+    with engine.connect() as conn:
+        second = conn.execute(
+            select(UserRole.user_id, UserRole.role_id).order_by(
+                UserRole.user_id, UserRole.role_id
+            )
+        ).all()
+
+    assert _count(AccessRoleRule) == rules_before * 2
+    offset_users = 50
+    offset_roles = 5
+    assert [(u - offset_users, r - offset_roles) for u, r in second] == first
+
+
+def test_generate_bench_data_honors_small_element_count():
+    config = BenchDataConfig(
+        users=20, roles=6, elements=2, roles_per_user=6, rules_per_role=2
+    )
+
+    counts = generate_bench_data(engine, config)
+
+    assert counts["elements"] == 2
+    assert counts["user_roles"] == 120
+    assert _count(BusinessElement) == 2
+
+
+def test_zipf_picker_samples_distinct_items_without_rejection():
+    picker = _Picker(30, "zipf", 1.1)
+    rng = random.Random(1)
+
+    for k in (1, 15, 30, 40):
+        picked = picker.sample(rng, k)
+        assert picked == sorted(set(picked))
+        assert len(picked) == min(k, 30)
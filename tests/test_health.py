@@ -1,4 +1,5 @@
 import os
+
 from fastapi.testclient import TestClient
 
 from app.main import app
@@ -0,0 +1,70 @@
+from tests.test_mock import grant_access_rule, register_user_and_get_auth_headers
+
+
+def _token(headers: dict[str, str]) -> str:
+    return headers["Authorization"].removeprefix("Bearer ")
+
+
+def test_introspect_requires_permission(client):
+    _, headers = register_user_and_get_auth_headers(client, "svc0@test.com")
+
+    resp = client.post("/auth/introspect", headers=headers, json={"tokens": ["x"]})
+
+    assert resp.status_code == 403
+
+
+def test_introspect_batch_reports_state_of_each_token(client):
+    service_id, service_headers = register_user_and_get_auth_headers(
+        client, "svc@test.com"
+    )
+    grant_access_rule(
+        service_id, "service", "auth_introspection", read_all_permission=True
+    )
+
+    alice_id, alice_headers = register_user_and_get_auth_headers(
+        client, "alice@test.com"
+    )
+    grant_access_rule(alice_id, "user", "products", read_permission=True)
+    _, bob_headers = register_user_and_get_auth_headers(client, "bob@test.com")
+    _, carol_headers = register_user_and_get_auth_headers(client, "carol@test.com")
+
+    assert client.post("/auth/logout", headers=bob_headers).status_code == 204
+    assert client.delete("/users/me", headers=carol_headers).status_code == 200
+
+    tokens = [
+        _token(alice_headers),
+        _token(bob_headers),
+        _token(carol_headers),
+        "not.a.token",
+    ]
+    resp = client.post(
+        "/auth/introspect", headers=service_headers, json={"tokens": tokens}
+    )
+
+    assert resp.status_code == 200
+    alice, bob, carol, garbage = resp.json()["results"]
+    assert alice["active"] is True
+    assert alice["sub"] == str(alice_id)
+    assert alice["email"] == "alice@test.com"
+    assert alice["roles"] == ["user"]
+    assert alice["token_type"] == "access"
+    assert bob == {"active": False}
+    assert carol == {"active": False}
+    assert garbage == {"active": False}
+
+    cache_control = resp.headers["cache-control"]
+    assert cache_control.startswith("private, max-age=")
+    assert 0 < int(cache_control.rsplit("=", 1)[1]) <= 30
+
+
+def test_introspect_rejects_empty_batch(client):
+    service_id, service_headers = register_user_and_get_auth_headers(
+        client, "svc2@test.com"
+    )
+    grant_access_rule(
+        service_id, "service", "auth_introspection", read_all_permission=True
+    )
+
+    resp = client.post("/auth/introspect", headers=service_headers, json={"tokens": []})
+
+    assert resp.status_code == 422
@@ -0,0 +1,293 @@
+import socket
+import threading
+
+import orjson
+import pytest
+
+from app.core.invalidation import (
+    InvalidationBus,
+    InvalidationEvent,
+    LocalInvalidationBackend,
+    PostgresInvalidationBackend,
+    UnixSocketInvalidationBackend,
+    get_invalidation_bus,
+    publish_after_commit,
+)
+from app.core.jwt import evict_cached_tokens, get_token_cache
+from app.core.policy_version import bump_policy_version
+from app.core.token_cache import token_digest
+from tests.conftest import TestingSessionLocal
+from tests.test_mock import grant_access_rule, register_user_and_get_auth_headers
+
+
+@pytest.fixture()
+def received():
+    events: list[InvalidationEvent] = []
+    get_invalidation_bus().subscribe(events.append)
+    return events
+
+
+def test_events_are_published_only_after_commit(received):
+    db = TestingSessionLocal()
+    try:
+        bump_policy_version(db)
+        publish_after_commit(db, InvalidationEvent("user_roles_changed", user_id=1))
+        db.rollback()
+        assert received == []
+
+        bump_policy_version(db)
+        publish_after_commit(db, InvalidationEvent("user_roles_changed", user_id=2))
+        assert received == []
+        db.commit()
+    finally:
+        db.close()
+
+    assert received == [InvalidationEvent("user_roles_changed", user_id=2)]
+
+
+def test_bus_isolates_failing_handlers():
+    bus = InvalidationBus(LocalInvalidationBackend())
+    received: list[InvalidationEvent] = []
+
+    def broken(event):
+        raise RuntimeError("boom")
+
+    bus.subscribe(broken)
+    bus.subscribe(received.append)
+    bus.publish(InvalidationEvent("role_changed", policy_version=3))
+
+    assert received == [InvalidationEvent("role_changed", policy_version=3)]
+
+
+def test_unix_socket_backend_reaches_other_workers(tmp_path):
+    first = InvalidationBus(UnixSocketInvalidationBackend(str(tmp_path), "a"), "a")
+    second = InvalidationBus(UnixSocketInvalidationBackend(str(tmp_path), "b"), "b")
+    delivered = threading.Event()
+    received: list[InvalidationEvent] = []
+
+    def handler(event):
+        received.append(event)
+        delivered.set()
+
+    second.subscribe(handler)
+    first.start()
+    second.start()
+    try:
+        first.publish(InvalidationEvent("token_revoked", user_id=7, token_digest="ab"))
+        assert delivered.wait(timeout=5)
+    finally:
+        first.close()
+        second.close()
+
+    assert received == [
+        InvalidationEvent("token_revoked", user_id=7, token_digest="ab")
+    ]
+
+
+def test_unix_socket_dir_is_private(tmp_path):
+    backend = UnixSocketInvalidationBackend(str(tmp_path / "sockets"), "a")
+    backend.start(lambda payload: None)
+    backend.close()
+    assert (tmp_path / "sockets").stat().st_mode & 0o777 == 0o700
+
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    with pytest.raises(RuntimeError, match="accessible to other users"):
+        UnixSocketInvalidationBackend(str(shared), "a").start(lambda payload: None)
+
+
+def test_bus_drops_policy_versions_ahead_of_database():
+    current = [5]
+
+    def current_version():
+        if current[0] is None:
+            raise RuntimeError("database is down")
+        return current[0]
+
+    bus = InvalidationBus(LocalInvalidationBackend(), "a", current_version)
+    received: list[InvalidationEvent] = []
+    bus.subscribe(received.append)
+
+    def deliver(policy_version):
+        payload = {
+            "origin": "b",
+            "kind": "role_changed",
+            "policy_version": policy_version,
+        }
+        bus._receive(orjson.dumps(payload))
+
+    deliver(10**9)
+    deliver(5)
+    current[0] = None
+    deliver(6)
+
+    assert received == [
+        InvalidationEvent("role_changed", policy_version=5),
+        InvalidationEvent("role_changed"),
+    ]
+
+
+def test_token_cache_evicts_on_events():
+    cache = get_token_cache()
+    cache.clear()
+    cache.put("t1", {"sub": "1"})
+    cache.put("t2", {"sub": "1"})
+    cache.put("t3", {"sub": "2"})
+
+    evict_cached_tokens(
+        InvalidationEvent("token_revoked", token_digest=token_digest("t3").hex())
+    )
+    assert cache.get("t3") is None
+    assert cache.get("t1") is not None
+
+    evict_cached_tokens(InvalidationEvent("user_sessions_revoked", user_id=1))
+    assert len(cache) == 0
+
+
+def test_logout_publishes_token_revoked(client, received):
+    user_id, headers = register_user_and_get_auth_headers(client, "bus1@test.com")
+    token = headers["Authorization"].removeprefix("Bearer ")
+
+    assert client.post("/auth/logout", headers=headers).status_code == 204
+
+    assert received == [
+        InvalidationEvent(
+            "token_revoked", user_id=user_id, token_digest=token_digest(token).hex()
+        )
+    ]
+
+
+def test_logout_all_publishes_user_sessions_revoked(client, received):
+    user_id, headers = register_user_and_get_auth_headers(client, "bus2@test.com")
+
+    assert client.post("/auth/logout-all", headers=headers).status_code == 204
+
+    assert received == [InvalidationEvent("user_sessions_revoked", user_id=user_id)]
+
+
+def test_admin_writes_publish_policy_events(client, received):
+    admin_id, headers = register_user_and_get_auth_headers(client, "bus3@test.com")
+    for code in ("rbac_roles", "rbac_user_roles"):
+        grant_access_rule(
+            admin_id,
+            "admin",
+            code,
+            read_permission=True,
+            create_permission=True,
+        )
+
+    resp = client.post("/admin/roles", headers=headers, json={"name": "editor"})
+    assert resp.status_code == 201
+    role_id = resp.json()["id"]
+    resp = client.post(f"/admin/users/{admin_id}/roles/{role_id}", headers=headers)
+    assert resp.status_code == 204
+
+    assert [(e.kind, e.user_id) for e in received] == [
+        ("role_changed", None),
+        ("user_roles_changed", admin_id),
+    ]
+    assert received[0].policy_version < received[1].policy_version
+
+
+def test_failed_request_publishes_nothing(client, received):
+    _, headers = register_user_and_get_auth_headers(client, "bus4@test.com")
+
+    resp = client.post("/admin/roles", headers=headers, json={"name": "x"})
+
+    assert resp.status_code == 403
+    assert received == []
+
+
+class _FakeListenConnection:
+    def __init__(self, sock):
+        self._sock = sock
+        self.autocommit = False
+        self.notifies = []
+        self.executed = []
+
+    def fileno(self):
+        return self._sock.fileno()
+
+    def cursor(self):
+        connection = self
+
+        class _Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return None
+
+            def execute(self, sql):
+                connection.executed.append(sql)
+
+        return _Cursor()
+
+    def poll(self):
+        raise OSError("server closed the connection")
+
+
+class _FakeRaw:
+    def __init__(self, conn):
+        self.driver_connection = conn
+        self.invalidated = False
+
+    def invalidate(self):
+        self.invalidated = True
+
+
+class _FlakyEngine:
+    def __init__(self):
+        self.attempts = 0
+        self.raws = []
+        self._sockets = []
+
+    def raw_connection(self):
+        self.attempts += 1
+        if self.attempts == 1:
+            raise OSError("connection refused")
+        left, right = socket.socketpair()
+        self._sockets += [left, right]
+        if self.attempts == 2:
+            right.send(b"x")
+        self.raws.append(_FakeRaw(_FakeListenConnection(left)))
+        return self.raws[-1]
+
+
+def test_postgres_listener_reconnects_and_flushes(caplog):
+    engine = _FlakyEngine()
+    backend = PostgresInvalidationBackend(
+        engine, "rbac_test", reconnect_delay_seconds=0.01
+    )
+    bus = InvalidationBus(backend)
+    received: list[InvalidationEvent] = []
+    flushed = threading.Event()
+
+    def handler(event):
+        received.append(event)
+        if len(received) == 2:
+            flushed.set()
+
+    bus.subscribe(handler)
+    bus.start()
+    try:
+        assert flushed.wait(5)
+    finally:
+        bus.close()
+
+    assert received == [InvalidationEvent("flush_all")] * 2
+    assert engine.attempts == 3
+    assert engine.raws[0].invalidated
+    assert engine.raws[0].driver_connection.executed == ["LISTEN rbac_test"]
+    assert "reconnected" in caplog.text
+
+
+def test_flush_all_clears_token_cache():
+    cache = get_token_cache()
+    cache.put("token", {"sub": "1"})
+    assert cache.get("token") == {"sub": "1"}
+
+    evict_cached_tokens(InvalidationEvent("flush_all"))
+
+    assert cache.get("token") is None
@@ -0,0 +1,116 @@
+import jwt as pyjwt
+import pytest
+
+from app.core.jwt import create_access_token, decode_access_token, get_token_cache
+from app.core.keys import generate_private_key_pem, get_key_ring
+from app.core.settings import get_settings
+
+
+@pytest.fixture()
+def eddsa_keys(tmp_path, monkeypatch):
+    (tmp_path / "2026-01.pem").write_bytes(generate_private_key_pem("EdDSA"))
+    monkeypatch.setenv("JWT_ALGORITHM", "EdDSA")
+    monkeypatch.setenv("JWT_KEYS_DIR", str(tmp_path))
+    get_settings.cache_clear()
+    get_key_ring.cache_clear()
+    get_token_cache.cache_clear()
+    yield tmp_path
+    get_key_ring.cache_clear()
+    get_token_cache.cache_clear()
+
+
+def _rotate(monkeypatch, keys_dir, kid: str) -> None:
+    (keys_dir / f"{kid}.pem").write_bytes(generate_private_key_pem("EdDSA"))
+    monkeypatch.setenv("JWT_ACTIVE_KID", kid)
+    get_settings.cache_clear()
+    get_key_ring.cache_clear()
+    get_token_cache.cache_clear()
+
+
+def test_jwks_is_empty_for_hs256(client):
+    get_key_ring.cache_clear()
+    resp = client.get("/.well-known/jwks.json")
+
+    assert resp.status_code == 200
+    assert resp.json() == {"keys": []}
+
+
+def test_eddsa_token_carries_kid_and_is_published(client, eddsa_keys):
+    token = create_access_token(7)
+
+    assert pyjwt.get_unverified_header(token) == {
+        "alg": "EdDSA",
+        "typ": "JWT",
+        "kid": "2026-01",
+    }
+    assert decode_access_token(token)["sub"] == "7"
+
+    resp = client.get("/.well-known/jwks.json")
+    assert resp.status_code == 200
+    assert resp.headers["cache-control"] == "public, max-age=300"
+    [jwk] = resp.json()["keys"]
+    assert jwk["kid"] == "2026-01"
+    assert jwk["kty"] == "OKP"
+    assert "d" not in jwk
+
+    public_key = pyjwt.PyJWK(jwk).key
+    claims = pyjwt.decode(token, public_key, algorithms=["EdDSA"])
+    assert claims["sub"] == "7"
+
+    resp = client.get(
+        "/.well-known/jwks.json", headers={"If-None-Match": resp.headers["etag"]}
+    )
+    assert resp.status_code == 304
+
+
+def test_rotation_keeps_old_tokens_valid(client, eddsa_keys, monkeypatch):
+    old_token = create_access_token(1)
+
+    _rotate(monkeypatch, eddsa_keys, "2026-02")
+    new_token = create_access_token(2)
+
+    assert pyjwt.get_unverified_header(new_token)["kid"] == "2026-02"
+    assert decode_access_token(old_token)["sub"] == "1"
+    assert decode_access_token(new_token)["sub"] == "2"
+
+    kids = [key["kid"] for key in client.get("/.well-known/jwks.json").json()["keys"]]
+    assert kids == ["2026-01", "2026-02"]
+
+    (eddsa_keys / "2026-01.pem").unlink()
+    get_key_ring.cache_clear()
+    get_token_cache.cache_clear()
+    with pytest.raises(ValueError):
+        decode_access_token(old_token)
+
+
+def test_hs256_token_rejected_when_asymmetric(eddsa_keys, monkeypatch):
+    monkeypatch.setenv("JWT_ALGORITHM", "HS256")
+    get_settings.cache_clear()
+    get_key_ring.cache_clear()
+    hs_token = create_access_token(1)
+
+    monkeypatch.setenv("JWT_ALGORITHM", "EdDSA")
+    get_settings.cache_clear()
+    get_key_ring.cache_clear()
+    get_token_cache.cache_clear()
+    with pytest.raises(ValueError):
+        decode_access_token(hs_token)
+
+
+def test_login_flow_with_eddsa(client, eddsa_keys):
+    client.post(
+        "/auth/register",
+        json={
+            "full_name": "Ed",
+            "email": "ed@test.com",
+            "password": "123",
+            "password_confirm": "123",
+        },
+    )
+    token = client.post(
+        "/auth/login", json={"email": "ed@test.com", "password": "123"}
+    ).json()["access_token"]
+
+    resp = client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 200
+    assert resp.json()["email"] == "ed@test.com"
@@ -0,0 +1,93 @@
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine
+
+from app.core.settings import get_settings
+from app.db.init_db import (
+    BASELINE_REVISION,
+    SCHEMA_REVISION,
+    Base,
+    alembic_config,
+    get_schema_revision,
+    init_db,
+    migrate_db,
+)
+
+
+@pytest.fixture()
+def empty_engine(tmp_path):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path}/migrations.db")
+    yield engine
+    engine.dispose()
+
+
+def test_schema_revision_is_migrations_head():
+    script = ScriptDirectory.from_config(alembic_config())
+
+    assert script.get_current_head() == SCHEMA_REVISION
+
+
+def test_migrations_match_models(empty_engine):
+    migrate_db(empty_engine)
+
+    with empty_engine.connect() as connection:
+        assert get_schema_revision(connection) == SCHEMA_REVISION
+        diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+
+    assert diff == []
+
+
+def test_init_db_migrates_empty_database_once(empty_engine):
+    init_db(empty_engine)
+    init_db(empty_engine)
+
+    with empty_engine.connect() as connection:
+        assert get_schema_revision(connection) == SCHEMA_REVISION
+
+
+def test_init_db_refuses_outdated_schema_without_auto_migrate(
+    empty_engine, monkeypatch
+):
+    monkeypatch.setenv("DB_AUTO_MIGRATE", "false")
+    get_settings.cache_clear()
+
+    with pytest.raises(RuntimeError, match="alembic upgrade head"):
+        init_db(empty_engine)
+
+
+def _create_legacy_schema(engine):
+    config = alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, BASELINE_REVISION)
+        connection.exec_driver_sql("DROP TABLE alembic_version")
+        connection.exec_driver_sql(
+            "INSERT INTO users (email, password_hash) VALUES ('old@test.com', 'x')"
+        )
+
+
+def test_init_db_upgrades_legacy_create_all_schema(empty_engine):
+    _create_legacy_schema(empty_engine)
+
+    init_db(empty_engine)
+
+    with empty_engine.connect() as connection:
+        assert get_schema_revision(connection) == SCHEMA_REVISION
+        diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+        user = connection.exec_driver_sql(
+            "SELECT email, token_version, version_id FROM users"
+        ).one()
+    assert diff == []
+    assert tuple(user) == ("old@test.com", 0, 1)
+
+
+def test_init_db_explains_how_to_adopt_legacy_schema(empty_engine, monkeypatch):
+    _create_legacy_schema(empty_engine)
+    monkeypatch.setenv("DB_AUTO_MIGRATE", "false")
+    get_settings.cache_clear()
+
+    with pytest.raises(RuntimeError, match="alembic stamp 0001"):
+        init_db(empty_engine)
@@ -0,0 +1,85 @@
+from app.api.mock import _build_products, mock_store_backend
+from app.core.mock_store import MemoryResourceStore, SqlResourceStore
+from app.core.rbac import AccessScope
+from app.core.settings import get_settings
+from app.models.mock_product import MockProduct
+from tests.test_mock import grant_access_rule, register_user_and_get_auth_headers
+
+PRODUCT_COLUMNS = ["id", "title", "owner_id"]
+
+
+def test_memory_store_lists_by_owner_index():
+    store = MemoryResourceStore(_build_products, max_partitions=10)
+
+    assert len(store.list_items(5, AccessScope("all", 5))) == 3
+    own = store.list_items(5, AccessScope("own", 5))
+    assert [item["id"] for item in own] == [1, 3]
+    assert store.list_items(5, AccessScope("own", 42)) == []
+    assert store.list_items(5, AccessScope("none", 5)) == []
+
+
+def test_memory_store_get_and_update_by_id():
+    store = MemoryResourceStore(_build_products, max_partitions=10)
+
+    assert store.get_item(1, 999) is None
+    assert store.update_item(1, 999, {"title": "x"}) is None
+
+    updated = store.update_item(1, 2, {"title": "Changed"})
+    assert updated == {"id": 2, "title": "Changed", "owner_id": 2}
+    assert store.get_item(1, 2)["title"] == "Changed"
+    assert store.list_items(1, AccessScope("own", 2))[0]["title"] == "Changed"
+
+
+def test_memory_store_evicts_least_recently_used_partition():
+    store = MemoryResourceStore(_build_products, max_partitions=2)
+
+    store.update_item(1, 1, {"title": "kept"})
+    store.get_item(2, 1)
+    store.get_item(1, 1)
+    store.get_item(3, 1)
+
+    assert len(store) == 2
+    assert store.evictions == 1
+    assert store.get_item(1, 1)["title"] == "kept"
+    assert store.evictions == 1
+
+    store.get_item(2, 1)
+    assert store.evictions == 2
+
+
+def test_sql_store_seeds_partition_once_and_filters_by_owner(db_session):
+    store = SqlResourceStore(db_session, MockProduct, PRODUCT_COLUMNS, _build_products)
+
+    assert len(store.list_items(7, AccessScope("all", 7))) == 3
+    assert len(store.list_items(7, AccessScope("all", 7))) == 3
+    own = store.list_items(7, AccessScope("own", 7))
+    assert [item["id"] for item in own] == [1, 3]
+    assert store.list_items(7, AccessScope("none", 7)) == []
+
+    updated = store.update_item(7, 3, {"title": "Renamed"})
+    assert updated == {"id": 3, "title": "Renamed", "owner_id": 7}
+    assert store.get_item(7, 3)["title"] == "Renamed"
+    assert store.get_item(7, 404) is None
+    assert db_session.query(MockProduct).count() == 3
+
+
+def test_mock_products_with_sql_backend(client, monkeypatch):
+    monkeypatch.setenv("MOCK_STORE_BACKEND", "sql")
+    get_settings.cache_clear()
+    mock_store_backend.cache_clear()
+    user_id, auth_headers = register_user_and_get_auth_headers(
+        client, "sql_store@test.com"
+    )
+    grant_access_rule(
+        user_id, "user", "products", read_permission=True, update_permission=True
+    )
+
+    response = client.patch(
+        "/mock/products/3", headers=auth_headers, json={"title": "Persisted"}
+    )
+    assert response.status_code == 200
+
+    response = client.get("/mock/products", headers=auth_headers)
+    assert response.status_code == 200
+    titles = {item["id"]: item["title"] for item in response.json()}
+    assert titles == {1: "My product 1", 3: "Persisted"}
@@ -0,0 +1,210 @@
+import json
+import time
+import urllib.error
+import urllib.parse
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import policy_client as policy_client_module
+from app.core.jwt import create_access_token
+from app.core.policy_client import (
+    FileSnapshotSource,
+    HttpSnapshotSource,
+    PolicyClient,
+    RefreshTokenProvider,
+)
+from app.core.policy_snapshot import write_policy_snapshot
+from app.core.rbac import get_access_scope, has_all_permission, has_permission
+from app.core.settings import get_settings
+from app.models.user import User
+from tests.conftest import TestingSessionLocal
+from tests.test_mock import grant_access_rule, register_user_and_get_auth_headers
+
+VECTORS = json.loads((Path(__file__).parent / "policy_vectors.json").read_text())
+ACTIONS = ("read", "create", "update", "delete")
+
+
+def _load_policy() -> None:
+    for user_id, roles in VECTORS["users"].items():
+        for role in roles:
+            for code, permissions in VECTORS["roles"][role].items():
+                grant_access_rule(int(user_id), role, code, **permissions)
+
+
+class ClientSource:
+    def __init__(self, client, headers):
+        self.client = client
+        self.headers = headers
+        self.fetches = 0
+
+    def fetch(self, etag):
+        self.fetches += 1
+        headers = dict(self.headers)
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        resp = self.client.get("/admin/policy/snapshot", headers=headers)
+        if resp.status_code == 304:
+            return etag, None
+        resp.raise_for_status()
+        return resp.headers["etag"], resp.content
+
+
+@pytest.fixture()
+def policy_client(tmp_path):
+    _load_policy()
+    path = tmp_path / "policy.snapshot"
+    with TestingSessionLocal() as db:
+        write_policy_snapshot(db, path)
+    with PolicyClient(FileSnapshotSource(path)) as client:
+        yield client
+
+
+@pytest.mark.parametrize(
+    "user_id, resource, action, owner_id, expected", VECTORS["vectors"]
+)
+def test_vectors_on_server(user_id, resource, action, owner_id, expected):
+    _load_policy()
+    with TestingSessionLocal() as db:
+        user = User(id=user_id)
+        assert has_permission(db, user, resource, action, owner_id) is expected
+
+
+@pytest.mark.parametrize(
+    "user_id, resource, action, owner_id, expected", VECTORS["vectors"]
+)
+def test_vectors_on_client(
+    policy_client, user_id, resource, action, owner_id, expected
+):
+    assert policy_client.has_permission(user_id, resource, action, owner_id) is expected
+
+
+def test_client_matches_server_for_every_pair(policy_client):
+    with TestingSessionLocal() as db:
+        for user_id in range(7):
+            user = User(id=user_id)
+            for resource in ("products", "orders", "missing"):
+                for action in ACTIONS:
+                    assert (
+                        policy_client.access_scope(user_id, resource, action)
+                        == get_access_scope(db, user, resource, action).kind
+                    )
+                    assert policy_client.has_all_permission(
+                        user_id, resource, action
+                    ) == has_all_permission(db, user, resource, action)
+
+
+def test_client_follows_admin_api(client):
+    admin_id, headers = register_user_and_get_auth_headers(client, "sidecar@test.com")
+    for code in ("rbac_roles", "rbac_rules", "rbac_user_roles"):
+        grant_access_rule(
+            admin_id,
+            "sidecar",
+            code,
+            read_all_permission=True,
+            create_permission=True,
+            update_all_permission=True,
+        )
+    source = ClientSource(client, headers)
+    policy = PolicyClient(source, refresh_interval_seconds=60).start()
+
+    assert policy.refresh() is False
+    assert not policy.has_permission(admin_id, "products", "read", admin_id)
+
+    role_id = client.post("/admin/roles", json={"name": "r"}, headers=headers).json()[
+        "id"
+    ]
+    element_id = client.post(
+        "/admin/elements", json={"code": "products"}, headers=headers
+    ).json()["id"]
+    client.put(
+        "/admin/rules",
+        json={"role_id": role_id, "element_id": element_id, "read_permission": True},
+        headers=headers,
+    )
+    client.post(f"/admin/users/{admin_id}/roles/{role_id}", headers=headers)
+
+    assert policy.refresh() is True
+    assert policy.has_permission(admin_id, "products", "read", admin_id)
+    assert (
+        policy.version
+        == client.get("/admin/policy/version", headers=headers).json()["version"]
+    )
+    policy.close()
+
+
+def test_client_refuses_stale_or_missing_snapshot(tmp_path):
+    policy = PolicyClient(FileSnapshotSource(tmp_path / "p"), max_age_seconds=0)
+    with pytest.raises(RuntimeError, match="not loaded"):
+        policy.has_permission(1, "products", "read")
+
+    with TestingSessionLocal() as db:
+        write_policy_snapshot(db, tmp_path / "p")
+    policy.refresh()
+    with pytest.raises(RuntimeError, match="stale"):
+        policy.has_permission(1, "products", "read")
+
+
+def _route_urlopen_to(monkeypatch, client):
+    calls = []
+
+    @contextmanager
+    def urlopen(request, timeout):
+        path = urllib.parse.urlsplit(request.full_url).path
+        calls.append(path)
+        resp = client.request(
+            request.get_method(),
+            path,
+            content=request.data,
+            headers=dict(request.header_items()),
+        )
+        if resp.status_code >= 300:
+            raise urllib.error.HTTPError(
+                request.full_url,
+                resp.status_code,
+                resp.reason_phrase,
+                resp.headers,
+                None,
+            )
+        yield SimpleNamespace(headers=resp.headers, read=lambda: resp.content)
+
+    monkeypatch.setattr(policy_client_module.urllib.request, "urlopen", urlopen)
+    return calls
+
+
+def test_http_source_refreshes_expired_credentials(client, monkeypatch):
+    admin_id, _ = register_user_and_get_auth_headers(client, "http_sidecar@test.com")
+    for code in ("rbac_rules", "rbac_user_roles"):
+        grant_access_rule(admin_id, "http_sidecar", code, read_all_permission=True)
+    refresh_token = client.post(
+        "/auth/login", json={"email": "http_sidecar@test.com", "password": "123"}
+    ).json()["refresh_token"]
+    calls = _route_urlopen_to(monkeypatch, client)
+
+    monkeypatch.setenv("JWT_ACCESS_TTL_MINUTES", "-1")
+    get_settings.cache_clear()
+    expired = create_access_token(admin_id)
+    monkeypatch.delenv("JWT_ACCESS_TTL_MINUTES")
+    get_settings.cache_clear()
+    with pytest.raises(urllib.error.HTTPError) as exc_info:
+        HttpSnapshotSource("http://rbac", token=expired).fetch(None)
+    assert exc_info.value.code == 401
+
+    provider = RefreshTokenProvider("http://rbac", refresh_token)
+    policy = PolicyClient(HttpSnapshotSource("http://rbac", token=provider))
+    assert policy.refresh() is True
+    first = provider()
+    assert calls == [
+        "/admin/policy/snapshot",
+        "/auth/refresh",
+        "/admin/policy/snapshot",
+    ]
+
+    later = time.time() + 24 * 3600
+    clock = SimpleNamespace(time=lambda: later, monotonic=time.monotonic)
+    monkeypatch.setattr(policy_client_module, "time", clock)
+    assert policy.refresh() is False
+    assert provider() != first
+    assert calls[3:] == ["/auth/refresh", "/admin/policy/snapshot", "/auth/refresh"]
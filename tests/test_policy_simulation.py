@@ -0,0 +1,156 @@
+import random
+
+from sqlalchemy import delete, select
+
+from app.core.permissions import ACTIONS, mask_scope
+from app.core.policy_simulation import simulate_policy_change
+from app.core.rbac import query_permission_mask
+from app.db.generate_bench_data import BenchDataConfig, generate_bench_data
+from app.models.access_role_rule import AccessRoleRule
+from app.models.business_element import BusinessElement
+from app.models.role import Role
+from app.models.user import User
+from app.models.user_role import UserRole
+from app.schemas.rbac_schema import RuleUpsert
+from tests.conftest import TestingSessionLocal, engine
+from tests.test_mock import grant_access_rule, register_user_and_get_auth_headers
+
+_RANK = {"none": 0, "own": 1, "all": 2}
+
+
+def _scopes(db, user_ids, codes):
+    return {
+        (user_id, code, action): mask_scope(
+            query_permission_mask(db, user_id, code), action
+        )
+        for user_id in user_ids
+        for code in codes
+        for action in ACTIONS
+    }
+
+
+def _apply(db, rules, added, removed):
+    for rule in rules:
+        db.execute(
+            delete(AccessRoleRule).where(
+                AccessRoleRule.role_id == rule.role_id,
+                AccessRoleRule.element_id == rule.element_id,
+            )
+        )
+        db.add(AccessRoleRule(**rule.model_dump()))
+    for user_id, role_id in removed:
+        db.execute(
+            delete(UserRole).where(
+                UserRole.user_id == user_id, UserRole.role_id == role_id
+            )
+        )
+    for user_id, role_id in added:
+        if db.get(UserRole, (user_id, role_id)) is None:
+            db.add(UserRole(user_id=user_id, role_id=role_id))
+    db.flush()
+
+
+def test_simulation_matches_applying_the_change():
+    generate_bench_data(
+        engine,
+        BenchDataConfig(
+            users=50, roles=8, elements=6, roles_per_user=2, rules_per_role=3
+        ),
+    )
+    rng = random.Random(3)
+    with TestingSessionLocal() as db:
+        user_ids = list(db.execute(select(User.id)).scalars())
+        role_ids = list(db.execute(select(Role.id)).scalars())
+        element_ids = list(db.execute(select(BusinessElement.id)).scalars())
+        codes = list(db.execute(select(BusinessElement.code)).scalars())
+        links = db.execute(select(UserRole.user_id, UserRole.role_id)).all()
+
+        rules = [
+            RuleUpsert(
+                role_id=rng.choice(role_ids),
+                element_id=element_id,
+                read_permission=True,
+                update_all_permission=rng.random() < 0.5,
+            )
+            for element_id in rng.sample(element_ids, 2)
+        ]
+        rules.append(RuleUpsert(role_id=links[0].role_id, element_id=element_ids[0]))
+        added = [(user_id, rng.choice(role_ids)) for user_id in user_ids[:4]]
+        removed = [tuple(link) for link in links[10:14]]
+
+        result = simulate_policy_change(db, rules, added, removed, sample_size=1000)
+
+        before = _scopes(db, user_ids, codes)
+        _apply(db, rules, added, removed)
+        after = _scopes(db, user_ids, codes)
+        db.rollback()
+
+    expected = {}
+    for key, was in before.items():
+        now = after[key]
+        if now == was:
+            continue
+        user_id, code, action = key
+        entry = expected.setdefault((code, action), {"gained": [], "lost": []})
+        entry["gained" if _RANK[now] > _RANK[was] else "lost"].append(user_id)
+
+    assert expected
+    assert {
+        (c["resource"], c["action"]): {
+            "gained": sorted(c["gained_sample"]),
+            "lost": sorted(c["lost_sample"]),
+        }
+        for c in result["changes"]
+    } == {
+        key: {k: sorted(v) for k, v in value.items()} for key, value in expected.items()
+    }
+    for change in result["changes"]:
+        assert change["gained"] == len(change["gained_sample"])
+        assert change["lost"] == len(change["lost_sample"])
+
+
+def test_simulate_endpoint(client):
+    admin_id, headers = register_user_and_get_auth_headers(client, "sim@test.com")
+    for code in ("rbac_rules", "rbac_user_roles"):
+        grant_access_rule(admin_id, "simulator", code, read_all_permission=True)
+    user_id, _ = register_user_and_get_auth_headers(client, "sim-user@test.com")
+    grant_access_rule(user_id, "viewer", "products", read_permission=True)
+
+    with TestingSessionLocal() as db:
+        viewer = db.execute(select(Role.id).where(Role.name == "viewer")).scalar_one()
+        products = db.execute(
+            select(BusinessElement.id).where(BusinessElement.code == "products")
+        ).scalar_one()
+
+    resp = client.post(
+        "/admin/policy/simulate",
+        json={
+            "rules": [
+                {"role_id": viewer, "element_id": products, "read_all_permission": True}
+            ],
+            "add_user_roles": [{"user_id": admin_id, "role_id": viewer}],
+            "sample_size": 5,
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.json() == {
+        "users": 2,
+        "changes": [
+            {
+                "resource": "products",
+                "action": "read",
+                "gained": 2,
+                "lost": 0,
+                "gained_sample": [admin_id, user_id],
+                "lost_sample": [],
+            }
+        ],
+    }
+
+    resp = client.post(
+        "/admin/policy/simulate",
+        json={"add_user_roles": [{"user_id": admin_id, "role_id": 999}]},
+        headers=headers,
+    )
+    assert resp.status_code == 404
@@ -0,0 +1,203 @@
+import struct
+
+import pytest
+from sqlalchemy import select
+
+from app.core.invalidation import InvalidationEvent
+from app.core.permissions import READ_ALL
+from app.core.policy_snapshot import (
+    PolicySnapshot,
+    PolicySnapshotStore,
+    build_policy_snapshot,
+    get_policy_snapshot_store,
+    write_policy_snapshot,
+)
+from app.core.policy_version import bump_policy_version
+from app.core.rbac import query_permission_mask
+from app.core.settings import get_settings
+from app.core.snapshot_format import pack_policy_snapshot
+from app.db.generate_bench_data import BenchDataConfig, generate_bench_data
+from app.models.business_element import BusinessElement
+from tests.conftest import TestingSessionLocal, engine
+from tests.test_mock import grant_access_rule, register_user_and_get_auth_headers
+
+
+@pytest.fixture()
+def snapshot_path(monkeypatch, tmp_path):
+    path = tmp_path / "policy.snapshot"
+    monkeypatch.setenv("RBAC_EVALUATOR", "snapshot")
+    monkeypatch.setenv("POLICY_SNAPSHOT_PATH", str(path))
+    get_settings.cache_clear()
+    return path
+
+
+def test_snapshot_masks_match_database(tmp_path):
+    generate_bench_data(
+        engine,
+        BenchDataConfig(
+            users=60, roles=12, elements=9, roles_per_user=3, rules_per_role=5
+        ),
+    )
+    path = tmp_path / "policy.snapshot"
+
+    with TestingSessionLocal() as db:
+        version = write_policy_snapshot(db, path)
+        snapshot = PolicySnapshot(path)
+        codes = list(db.execute(select(BusinessElement.code)).scalars())
+
+        assert snapshot.version == version
+        for user_id in range(62):
+            for code in [*codes, "missing"]:
+                expected = query_permission_mask(db, user_id, code)
+                assert snapshot.mask(user_id, code) == expected
+
+
+def _bump_policy() -> int:
+    with TestingSessionLocal() as db:
+        version = bump_policy_version(db)
+        db.commit()
+    return version
+
+
+def test_store_swaps_snapshot_atomically(tmp_path):
+    store = PolicySnapshotStore(tmp_path / "policy.snapshot", check_interval_seconds=0)
+    with TestingSessionLocal() as db:
+        before = store.snapshot(db)
+
+    grant_access_rule(1, "viewer", "products", read_permission=True)
+    version = _bump_policy()
+    store.require(version)
+    with TestingSessionLocal() as db:
+        after = store.snapshot(db)
+
+    assert after is not before
+    assert after.version == version
+    assert after.mask(1, "products") == 1
+    assert before.mask(1, "products") == 0
+
+
+def test_snapshot_evaluator_follows_admin_changes(snapshot_path, client):
+    admin_id, admin_headers = register_user_and_get_auth_headers(
+        client, "snap-admin@test.com"
+    )
+    for code in ("rbac_roles", "rbac_rules", "rbac_user_roles"):
+        grant_access_rule(
+            admin_id,
+            "admin",
+            code,
+            read_permission=True,
+            create_permission=True,
+            update_all_permission=True,
+        )
+    store = get_policy_snapshot_store()
+    assert store is not None
+    store.require(_bump_policy())
+    user_id, user_headers = register_user_and_get_auth_headers(
+        client, "snap-user@test.com"
+    )
+
+    assert client.get("/mock/products", headers=user_headers).status_code == 403
+    assert PolicySnapshot(snapshot_path).mask(admin_id, "rbac_roles") > 0
+
+    role = client.post("/admin/roles", headers=admin_headers, json={"name": "viewer"})
+    element = client.post(
+        "/admin/elements",
+        headers=admin_headers,
+        json={"code": "products", "title": "Products"},
+    )
+    assert element.status_code == 201, element.text
+    rule = client.put(
+        "/admin/rules",
+        headers=admin_headers,
+        json={
+            "role_id": role.json()["id"],
+            "element_id": element.json()["id"],
+            "read_permission": True,
+        },
+    )
+    assert rule.status_code == 200
+    assigned = client.post(
+        f"/admin/users/{user_id}/roles/{role.json()['id']}", headers=admin_headers
+    )
+    assert assigned.status_code == 204
+
+    assert client.get("/mock/products", headers=user_headers).status_code == 200
+    with TestingSessionLocal() as db:
+        assert store.snapshot(db).mask(user_id, "products") == 1
+
+
+def test_snapshot_bytes_roundtrip_and_checksum():
+    grant_access_rule(3, "viewer", "products", read_permission=True)
+    with TestingSessionLocal() as db:
+        version, data = build_policy_snapshot(db)
+
+    snapshot = PolicySnapshot.from_bytes(data)
+    assert snapshot.version == version
+    assert snapshot.resources == ["products"]
+    assert snapshot.mask(3, "products") == 1
+
+    corrupted = bytearray(data)
+    corrupted[-8] ^= 0xFF
+    with pytest.raises(ValueError, match="checksum"):
+        PolicySnapshot.from_bytes(bytes(corrupted))
+
+
+def test_snapshot_body_is_little_endian():
+    data = pack_policy_snapshot(7, ["ab"], 1, b"\x05", [0, 0, 1], [0])
+
+    assert data[32:40] == struct.pack("<2I", 0, 2)
+    assert data[48:64] == struct.pack("<4I", 0, 0, 1, 0)
+    snapshot = PolicySnapshot.from_bytes(data)
+    assert snapshot.resources == ["ab"]
+    assert snapshot.mask(0, "ab") == 0
+    assert snapshot.mask(1, "ab") == 5
+
+
+def test_snapshot_export_endpoint(client):
+    admin_id, headers = register_user_and_get_auth_headers(client, "export@test.com")
+    for code in ("rbac_rules", "rbac_user_roles"):
+        grant_access_rule(admin_id, "exporter", code, read_all_permission=True)
+    version = _bump_policy()
+
+    resp = client.get("/admin/policy/snapshot", headers=headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/octet-stream"
+    snapshot = PolicySnapshot.from_bytes(resp.content)
+    assert snapshot.version == version
+    assert snapshot.mask(admin_id, "rbac_rules") == READ_ALL
+
+    resp = client.get(
+        "/admin/policy/snapshot",
+        headers={**headers, "If-None-Match": resp.headers["etag"]},
+    )
+    assert resp.status_code == 304
+
+
+def test_store_rebuilds_from_callers_session_after_event(tmp_path):
+    store = PolicySnapshotStore(tmp_path / "policy.snapshot", check_interval_seconds=60)
+    with TestingSessionLocal() as db:
+        before = store.snapshot(db)
+
+    grant_access_rule(1, "viewer", "products", read_permission=True)
+    version = _bump_policy()
+    store.handle_event(InvalidationEvent("role_changed", policy_version=version))
+    with TestingSessionLocal() as db:
+        after = store.snapshot(db)
+
+    assert after.version == version > before.version
+    assert after.mask(1, "products") == 1
+
+
+def test_store_refuses_writable_snapshot(tmp_path):
+    path = tmp_path / "policy.snapshot"
+    with TestingSessionLocal() as db:
+        write_policy_snapshot(db, path)
+    assert path.stat().st_mode & 0o777 == 0o644
+    path.chmod(0o666)
+
+    store = PolicySnapshotStore(path, check_interval_seconds=0)
+    with (
+        TestingSessionLocal() as db,
+        pytest.raises(RuntimeError, match="world-writable"),
+    ):
+        store.snapshot(db)
@@ -0,0 +1,86 @@
+import os
+
+import pytest
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    Table,
+    UniqueConstraint,
+    create_engine,
+)
+
+from app.db.init_db import Base
+from app.db.query_plans import (
+    check_query_plans,
+    hot_queries,
+    redundant_indexes,
+    seed_plan_data,
+    unindexed_foreign_keys,
+)
+from tests.conftest import engine
+
+POSTGRES_URL = os.getenv("QUERY_PLANS_POSTGRES_URL")
+HOT_QUERY_NAMES = [query.name for query in hot_queries()]
+
+
+@pytest.fixture()
+def sqlite_plans():
+    seed_plan_data(engine, users=2_000)
+    with engine.connect() as conn:
+        return check_query_plans(conn)
+
+
+@pytest.mark.parametrize("name", HOT_QUERY_NAMES)
+def test_hot_query_uses_indexes_on_sqlite(sqlite_plans, name):
+    result = sqlite_plans[name]
+
+    assert result["full_scans"] == [], "\n".join(result["plan"])
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(POSTGRES_URL is None, reason="QUERY_PLANS_POSTGRES_URL not set")
+def test_hot_queries_use_indexes_on_postgres():
+    pg_engine = create_engine(POSTGRES_URL or "")
+    Base.metadata.drop_all(bind=pg_engine)
+    Base.metadata.create_all(bind=pg_engine)
+    try:
+        seed_plan_data(pg_engine, users=20_000)
+        with pg_engine.connect() as conn:
+            report = check_query_plans(conn)
+    finally:
+        pg_engine.dispose()
+
+    scans = {name: r["plan"] for name, r in report.items() if r["full_scans"]}
+    assert scans == {}
+
+
+def test_models_have_no_redundant_or_missing_indexes():
+    assert redundant_indexes(Base.metadata) == []
+    assert unindexed_foreign_keys(Base.metadata) == []
+
+
+def test_index_checks_flag_problems():
+    metadata = MetaData()
+    Table("parents", metadata, Column("id", Integer, primary_key=True))
+    Table(
+        "children",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("parent_id", Integer, ForeignKey("parents.id")),
+        Column("kind", Integer, index=True),
+        Column("slot", Integer),
+        UniqueConstraint("kind", "slot"),
+        Index("ix_children_slot", "slot"),
+        Index("ix_children_slot_kind", "slot", "kind"),
+    )
+
+    assert redundant_indexes(metadata) == [
+        "children.ix_children_kind ('kind',) is covered by ('kind', 'slot')",
+        "children.ix_children_slot ('slot',) is covered by ix_children_slot_kind",
+    ]
+    assert unindexed_foreign_keys(metadata) == [
+        "children.parent_id -> parents.id has no index"
+    ]
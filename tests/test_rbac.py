@@ -0,0 +1,69 @@
+from app.core.rbac import (
+    get_access_scope,
+    get_permission_mask,
+    has_all_permission,
+    has_permission,
+)
+from app.models.mock_product import MockProduct
+from app.models.user import User
+from tests.test_mock import grant_access_rule
+
+
+def _create_user(db_session, email: str) -> User:
+    user = User(email=email, full_name="Test", password_hash="x", is_active=True)
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def test_permission_mask_combines_rules_of_all_roles(db_session):
+    user = _create_user(db_session, "mask@test.com")
+    grant_access_rule(user.id, "reader", "products", read_permission=True)
+    grant_access_rule(user.id, "editor", "products", update_all_permission=True)
+
+    assert get_permission_mask(db_session, user.id, "products") == 1 | 16
+    assert get_permission_mask(db_session, user.id, "orders") == 0
+
+    assert has_permission(db_session, user, "products", "read", owner_id=user.id)
+    assert not has_permission(db_session, user, "products", "read", owner_id=999)
+    assert has_permission(db_session, user, "products", "update", owner_id=999)
+    assert has_all_permission(db_session, user, "products", "update")
+    assert not has_all_permission(db_session, user, "products", "read")
+
+
+def test_access_scope_kinds(db_session):
+    user = _create_user(db_session, "scope@test.com")
+    grant_access_rule(
+        user.id,
+        "user",
+        "products",
+        read_permission=True,
+        delete_all_permission=True,
+    )
+
+    assert get_access_scope(db_session, user, "products", "read").kind == "own"
+    assert get_access_scope(db_session, user, "products", "delete").kind == "all"
+    assert get_access_scope(db_session, user, "products", "update").kind == "none"
+    assert get_access_scope(db_session, user, "orders", "read").kind == "none"
+
+
+def test_access_scope_applies_as_query_predicate(db_session):
+    user = _create_user(db_session, "predicate@test.com")
+    grant_access_rule(user.id, "user", "products", read_permission=True)
+    for item_id, owner_id in [(1, user.id), (2, user.id + 1), (3, user.id)]:
+        db_session.add(
+            MockProduct(partition_id=0, id=item_id, title="p", owner_id=owner_id)
+        )
+    db_session.commit()
+
+    scope = get_access_scope(db_session, user, "products", "read")
+    rows = (
+        db_session.query(MockProduct.id)
+        .filter(scope.where(MockProduct.owner_id))
+        .order_by(MockProduct.id)
+        .all()
+    )
+
+    assert [row.id for row in rows] == [1, 3]
+    assert scope.allows(user.id)
+    assert not scope.allows(user.id + 1)
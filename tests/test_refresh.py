@@ -0,0 +1,124 @@
+from app.core.settings import get_settings
+
+
+def _register_and_login(client, email: str) -> dict:
+    client.post(
+        "/auth/register",
+        json={
+            "full_name": "Refresh",
+            "email": email,
+            "password": "123",
+            "password_confirm": "123",
+        },
+    )
+    resp = client.post("/auth/login", json={"email": email, "password": "123"})
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def _refresh(client, refresh_token: str):
+    return client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+
+def test_login_returns_refresh_token(client):
+    tokens = _register_and_login(client, "r1@test.com")
+
+    assert tokens["refresh_token"]
+    assert tokens["expires_in"] == 30 * 60
+
+
+def test_refresh_rotates_tokens(client):
+    tokens = _register_and_login(client, "r2@test.com")
+
+    resp = _refresh(client, tokens["refresh_token"])
+    assert resp.status_code == 200
+    rotated = resp.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    me = client.get(
+        "/users/me", headers={"Authorization": f"Bearer {rotated['access_token']}"}
+    )
+    assert me.status_code == 200
+    assert me.json()["email"] == "r2@test.com"
+
+
+def test_refresh_token_reuse_revokes_whole_family(client):
+    tokens = _register_and_login(client, "r3@test.com")
+    rotated = _refresh(client, tokens["refresh_token"]).json()
+
+    resp = _refresh(client, tokens["refresh_token"])
+    assert resp.status_code == 401
+    assert resp.json()["detail"] == "invalid refresh token"
+
+    assert _refresh(client, rotated["refresh_token"]).status_code == 401
+
+
+def test_unknown_refresh_token_returns_401(client):
+    assert _refresh(client, "nope").status_code == 401
+
+
+def test_logout_revokes_refresh_tokens_of_session(client):
+    tokens = _register_and_login(client, "r4@test.com")
+    other_session = client.post(
+        "/auth/login", json={"email": "r4@test.com", "password": "123"}
+    ).json()
+
+    resp = client.post(
+        "/auth/logout", headers={"Authorization": f"Bearer {tokens['access_token']}"}
+    )
+    assert resp.status_code == 204
+
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+    assert _refresh(client, other_session["refresh_token"]).status_code == 200
+
+
+def test_refresh_fails_for_deactivated_user(client):
+    tokens = _register_and_login(client, "r5@test.com")
+    client.delete(
+        "/users/me", headers={"Authorization": f"Bearer {tokens['access_token']}"}
+    )
+
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_stateless_mode_skips_access_revocation(client, monkeypatch):
+    monkeypatch.setenv("JWT_REVOCATION_CHECK", "false")
+    get_settings.cache_clear()
+    tokens = _register_and_login(client, "r6@test.com")
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    assert client.post("/auth/logout", headers=headers).status_code == 204
+
+    assert client.get("/users/me", headers=headers).status_code == 200
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_logout_all_invalidates_every_session(client):
+    first = _register_and_login(client, "r7@test.com")
+    second = client.post(
+        "/auth/login", json={"email": "r7@test.com", "password": "123"}
+    ).json()
+    first_headers = {"Authorization": f"Bearer {first['access_token']}"}
+    second_headers = {"Authorization": f"Bearer {second['access_token']}"}
+
+    assert client.post("/auth/logout-all", headers=first_headers).status_code == 204
+
+    assert client.get("/users/me", headers=first_headers).status_code == 401
+    assert client.get("/users/me", headers=second_headers).status_code == 401
+    assert _refresh(client, second["refresh_token"]).status_code == 401
+
+    fresh = client.post(
+        "/auth/login", json={"email": "r7@test.com", "password": "123"}
+    ).json()
+    headers = {"Authorization": f"Bearer {fresh['access_token']}"}
+    assert client.get("/users/me", headers=headers).status_code == 200
+
+
+def test_logout_all_works_in_stateless_mode(client, monkeypatch):
+    monkeypatch.setenv("JWT_REVOCATION_CHECK", "false")
+    get_settings.cache_clear()
+    tokens = _register_and_login(client, "r8@test.com")
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    assert client.post("/auth/logout-all", headers=headers).status_code == 204
+    assert client.get("/users/me", headers=headers).status_code == 401
@@ -0,0 +1,145 @@
+import pytest
+from starlette.requests import Request
+
+from app.core.settings import get_settings
+from app.core.throttle import (
+    InMemoryThrottleBackend,
+    LoginThrottle,
+    SqlThrottleBackend,
+    client_address,
+    parse_trusted_proxies,
+)
+from tests.conftest import engine
+
+
+def _throttle(backend=None, **overrides):
+    limits = {
+        "account_rate_per_minute": 60,
+        "account_burst": 2,
+        "client_rate_per_minute": 60,
+        "client_burst": 5,
+    }
+    limits.update(overrides)
+    if backend is None:
+        backend = InMemoryThrottleBackend(100)
+    return LoginThrottle(backend, **limits)
+
+
+def _login(client, email: str, password: str = "wrong"):
+    return client.post("/auth/login", json={"email": email, "password": password})
+
+
+def test_bucket_refills_over_time():
+    throttle = _throttle()
+
+    assert throttle.check("a@test.com", None, now=0.0) == 0
+    assert throttle.check("a@test.com", None, now=0.0) == 0
+    assert throttle.check("a@test.com", None, now=0.0) == pytest.approx(1.0)
+    assert throttle.check("a@test.com", None, now=1.0) == 0
+    assert throttle.stats() == {
+        "attempts": 4,
+        "allowed": 3,
+        "throttled_account": 1,
+        "throttled_client": 0,
+    }
+
+
+def test_client_limit_spans_accounts():
+    throttle = _throttle(account_burst=100, client_burst=3)
+
+    for i in range(3):
+        assert throttle.check(f"u{i}@test.com", "10.0.0.1", now=0.0) == 0
+    assert throttle.check("u9@test.com", "10.0.0.1", now=0.0) > 0
+    assert throttle.check("u9@test.com", "10.0.0.2", now=0.0) == 0
+    assert throttle.stats()["throttled_client"] == 1
+
+
+def test_memory_backend_is_bounded():
+    backend = InMemoryThrottleBackend(max_keys=3)
+    throttle = _throttle(backend)
+
+    for i in range(10):
+        throttle.check(f"u{i}@test.com", None, now=0.0)
+    assert len(backend) == 3
+
+
+def test_sql_backend_shares_buckets():
+    first = _throttle(SqlThrottleBackend(engine))
+    second = _throttle(SqlThrottleBackend(engine))
+
+    assert first.check("s@test.com", None, now=0.0) == 0
+    assert second.check("s@test.com", None, now=0.0) == 0
+    assert first.check("s@test.com", None, now=0.0) > 0
+    assert second.check("s@test.com", None, now=1.0) == 0
+
+
+def test_login_throttled_per_account(client, monkeypatch):
+    monkeypatch.setenv("LOGIN_ACCOUNT_BURST", "3")
+    get_settings.cache_clear()
+
+    for _ in range(3):
+        assert _login(client, "victim@test.com").status_code == 401
+
+    resp = _login(client, "victim@test.com")
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) >= 1
+
+    assert _login(client, "other@test.com").status_code == 401
+
+
+def test_login_throttled_per_client(client, monkeypatch):
+    monkeypatch.setenv("LOGIN_CLIENT_BURST", "3")
+    get_settings.cache_clear()
+
+    for i in range(3):
+        assert _login(client, f"u{i}@test.com").status_code == 401
+    assert _login(client, "u9@test.com").status_code == 429
+
+
+def test_throttle_stats_endpoint(client):
+    _login(client, "x@test.com")
+
+    resp = client.get("/health/throttle")
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "enabled": True,
+        "attempts": 1,
+        "allowed": 1,
+        "throttled_account": 0,
+        "throttled_client": 0,
+    }
+
+
+def test_throttle_can_be_disabled(client, monkeypatch):
+    monkeypatch.setenv("LOGIN_THROTTLE_ENABLED", "false")
+    monkeypatch.setenv("LOGIN_ACCOUNT_BURST", "1")
+    get_settings.cache_clear()
+
+    for _ in range(3):
+        assert _login(client, "free@test.com").status_code == 401
+    assert client.get("/health/throttle").json() == {"enabled": False}
+
+
+def _request(peer: str, headers: list[tuple[str, str]]) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "client": (peer, 12345),
+            "headers": [(k.encode(), v.encode()) for k, v in headers],
+        }
+    )
+
+
+def test_client_address_uses_forwarded_for_only_from_trusted_proxies():
+    trusted = parse_trusted_proxies("10.0.0.0/8, 127.0.0.1")
+    xff = [("x-forwarded-for", "6.6.6.6, 203.0.113.7, 10.0.0.5")]
+
+    assert client_address(_request("198.51.100.1", xff), trusted) == "198.51.100.1"
+    assert client_address(_request("10.0.0.2", xff), trusted) == "203.0.113.7"
+    assert client_address(_request("10.0.0.2", []), trusted) == "10.0.0.2"
+    assert client_address(_request("10.0.0.2", xff), ()) == "10.0.0.2"
+
+    forwarded = [("forwarded", 'for="[2001:db8::1]:4711";proto=https, for=10.1.1.1')]
+    assert client_address(_request("127.0.0.1", forwarded), trusted) == "2001:db8::1"
+    only_proxies = [("x-forwarded-for", "10.3.3.3, 10.0.0.5")]
+    assert client_address(_request("10.0.0.2", only_proxies), trusted) == "10.3.3.3"
@@ -0,0 +1,76 @@
+import jwt as pyjwt
+
+from app.core import jwt as jwt_module
+from app.core.jwt import create_access_token, decode_access_token, get_token_cache
+from app.core.settings import Settings
+from app.core.token_cache import TokenCache
+
+
+def test_token_cache_returns_claims_until_ttl():
+    cache = TokenCache(max_size=10, ttl_seconds=60)
+    cache.put("a.b.c", {"sub": "1", "exp": 10_000}, now=1_000)
+
+    assert cache.get("a.b.c", now=1_030) == {"sub": "1", "exp": 10_000}
+    assert cache.get("a.b.c", now=1_061) is None
+    assert len(cache) == 0
+
+
+def test_token_cache_ttl_is_capped_at_exp():
+    cache = TokenCache(max_size=10, ttl_seconds=600)
+    cache.put("a.b.c", {"sub": "1", "exp": 1_010}, now=1_000)
+
+    assert cache.get("a.b.c", now=1_009) is not None
+    assert cache.get("a.b.c", now=1_010) is None
+
+    cache.put("x.y.z", {"sub": "1", "exp": 900}, now=1_000)
+    assert len(cache) == 0
+
+
+def test_token_cache_evicts_least_recently_used():
+    cache = TokenCache(max_size=2, ttl_seconds=60)
+    cache.put("t1", {"exp": 10_000}, now=0)
+    cache.put("t2", {"exp": 10_000}, now=0)
+    cache.get("t1", now=1)
+    cache.put("t3", {"exp": 10_000}, now=1)
+
+    assert cache.get("t2", now=2) is None
+    assert cache.get("t1", now=2) is not None
+    assert cache.get("t3", now=2) is not None
+
+
+def test_decode_access_token_verifies_signature_once(monkeypatch):
+    get_token_cache.cache_clear()
+    token = create_access_token(42)
+    calls = []
+    real_decode = pyjwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(1)
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt_module.jwt, "decode", counting_decode)
+
+    first = decode_access_token(token)
+    second = decode_access_token(token)
+
+    assert first["sub"] == "42"
+    assert second == first
+    assert len(calls) == 1
+
+
+def test_decode_cache_miss_does_not_rebuild_settings(monkeypatch):
+    tokens = [create_access_token(user_id) for user_id in range(3)]
+    get_token_cache.cache_clear()
+    built = []
+    real_init = Settings.__init__
+
+    def counting_init(self, *args, **kwargs):
+        built.append(1)
+        real_init(self, *args, **kwargs)
+
+    monkeypatch.setattr(Settings, "__init__", counting_init)
+
+    for token in tokens:
+        decode_access_token(token)
+
+    assert built == []
@@ -1,3 +1,17 @@
+import pytest
+
+from app.core.effective_permissions import (
+    materialized_permissions_enabled,
+    refresh_effective_permissions,
+)
+from app.core.policy_snapshot import get_policy_snapshot_store
+from app.core.policy_version import bump_policy_version
+from app.core.settings import get_settings
+from app.models.user import User
+from tests.conftest import TestingSessionLocal
+from tests.test_mock import grant_access_rule
+
+
 def _register_user(client, email="u@test.com", full_name="User", password="123"):
     resp = client.post(
         "/auth/register",
@@ -160,3 +174,92 @@ def test_new_login_after_logout_works(client):
 
     resp = client.get("/users/me", headers=headers2)
     assert resp.status_code == 200
+
+
+def test_users_me_etag_returns_304_until_profile_changes(client):
+    _register_user(client, email="etag@test.com", full_name="Timur")
+    headers = _auth_headers(_login(client, email="etag@test.com"))
+
+    resp = client.get("/users/me", headers=headers)
+    assert resp.status_code == 200
+    etag = resp.headers["etag"]
+
+    resp = client.get("/users/me", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == etag
+    assert resp.content == b""
+
+    resp = client.patch("/users/me", headers=headers, json={"full_name": "New"})
+    assert resp.status_code == 200
+
+    resp = client.get("/users/me", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+    assert resp.json()["full_name"] == "New"
+
+
+def test_users_me_concurrent_writes_do_not_conflict(client):
+    user_id = _register_user(client, email="race@test.com")["id"]
+    headers = _auth_headers(_login(client, email="race@test.com"))
+    etag = client.get("/users/me", headers=headers).headers["etag"]
+
+    with TestingSessionLocal() as stale:
+        user = stale.get(User, user_id)
+        resp = client.patch("/users/me", headers=headers, json={"full_name": "A"})
+        assert resp.status_code == 200
+        user.full_name = "B"
+        user.version_id = User.version_id + 1
+        stale.commit()
+
+    resp = client.get("/users/me", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()["full_name"] == "B"
+    with TestingSessionLocal() as db:
+        assert db.get(User, user_id).version_id == 3
+
+
+def _policy_written() -> None:
+    with TestingSessionLocal() as db:
+        refresh_effective_permissions(db)
+        version = bump_policy_version(db)
+        db.commit()
+    store = get_policy_snapshot_store()
+    if store is not None:
+        store.require(version)
+
+
+@pytest.mark.parametrize("evaluator", ["db", "materialized", "snapshot"])
+def test_users_me_permissions_map(client, monkeypatch, tmp_path, evaluator):
+    monkeypatch.setenv("RBAC_EVALUATOR", evaluator)
+    monkeypatch.setenv("POLICY_SNAPSHOT_PATH", str(tmp_path / "policy.snapshot"))
+    monkeypatch.setenv("POLICY_SNAPSHOT_CHECK_SECONDS", "0")
+    get_settings.cache_clear()
+    get_policy_snapshot_store.cache_clear()
+    materialized_permissions_enabled.cache_clear()
+    user_id = _register_user(client, email="perm@test.com")["id"]
+    h = _auth_headers(_login(client, "perm@test.com"))
+    grant_access_rule(user_id, "seller", "products", read_all_permission=True)
+    grant_access_rule(
+        user_id, "seller", "orders", read_permission=True, update_permission=True
+    )
+    grant_access_rule(user_id, "auditor", "orders", read_all_permission=True)
+    grant_access_rule(user_id + 1, "other", "reports", read_all_permission=True)
+    _policy_written()
+
+    resp = client.get("/users/me/permissions", headers=h)
+    assert resp.status_code == 200
+    assert resp.json()["permissions"] == {
+        "orders": {"read": "all", "update": "own"},
+        "products": {"read": "all"},
+        "reports": {},
+    }
+
+    etag = resp.headers["etag"]
+    resp = client.get("/users/me/permissions", headers={**h, "If-None-Match": etag})
+    assert resp.status_code == 304
+
+    grant_access_rule(user_id, "seller", "reports", create_permission=True)
+    _policy_written()
+    resp = client.get("/users/me/permissions", headers={**h, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()["permissions"]["reports"] == {"create": "all"}